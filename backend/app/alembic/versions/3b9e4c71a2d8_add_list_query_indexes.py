@@ -0,0 +1,37 @@
+"""add list query indexes
+
+Revision ID: 3b9e4c71a2d8
+Revises: 5f2b8bb8e6d3
+Create Date: 2026-10-18 09:12:44.318207
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = '3b9e4c71a2d8'
+down_revision = '5f2b8bb8e6d3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # List endpoints filter by owner and page on (created_at, id) descending,
+    # which a backward scan of these indexes serves without sorting
+    op.create_index(op.f('ix_item_owner_id_created_at_id'), 'item', ['owner_id', 'created_at', 'id'], unique=False)
+    op.create_index(op.f('ix_emp_emp_id_created_at_empcode'), 'emp', ['emp_id', 'created_at', 'empcode'], unique=False)
+    op.create_index(op.f('ix_dep_depuserid_created_at_dep_id'), 'dep', ['depuserid', 'created_at', 'dep_id'], unique=False)
+    op.create_index(op.f('ix_user_created_at_id'), 'user', ['created_at', 'id'], unique=False)
+    op.create_index(op.f('ix_dep_dep_code'), 'dep', ['dep_code'], unique=False)
+    op.create_index(op.f('ix_emp_depemp_id'), 'emp', ['depemp_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_emp_depemp_id'), table_name='emp')
+    op.drop_index(op.f('ix_dep_dep_code'), table_name='dep')
+    op.drop_index(op.f('ix_user_created_at_id'), table_name='user')
+    op.drop_index(op.f('ix_dep_depuserid_created_at_dep_id'), table_name='dep')
+    op.drop_index(op.f('ix_emp_emp_id_created_at_empcode'), table_name='emp')
+    op.drop_index(op.f('ix_item_owner_id_created_at_id'), table_name='item')
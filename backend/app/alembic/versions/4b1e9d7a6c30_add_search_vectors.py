@@ -0,0 +1,43 @@
+"""add search vectors to item and emp
+
+Revision ID: 4b1e9d7a6c30
+Revises: c52e8a17b9f3
+Create Date: 2026-10-18 20:04:37.218506
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '4b1e9d7a6c30'
+down_revision = 'c52e8a17b9f3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Stored generated columns, adding them rewrites both tables
+    op.add_column('item', sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed(
+        "setweight(to_tsvector('simple', coalesce(title, '')), 'A')"
+        " || setweight(to_tsvector('simple', coalesce(description, '')), 'B')",
+        persisted=True,
+    ), nullable=True))
+    op.add_column('emp', sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed(
+        "setweight(to_tsvector('simple', coalesce(name, '')), 'A')"
+        " || setweight(to_tsvector('simple',"
+        " workemail || ' ' || replace(workemail, '@', ' ')), 'B')"
+        " || setweight(to_tsvector('simple', coalesce(dep_name, '')), 'C')",
+        persisted=True,
+    ), nullable=True))
+    op.create_index(op.f('ix_item_search_vector'), 'item', ['search_vector'], unique=False, postgresql_using='gin')
+    op.create_index(op.f('ix_emp_search_vector'), 'emp', ['search_vector'], unique=False, postgresql_using='gin')
+
+
+def downgrade():
+    op.drop_index(op.f('ix_emp_search_vector'), table_name='emp', postgresql_using='gin')
+    op.drop_index(op.f('ix_item_search_vector'), table_name='item', postgresql_using='gin')
+    op.drop_column('emp', 'search_vector')
+    op.drop_column('item', 'search_vector')
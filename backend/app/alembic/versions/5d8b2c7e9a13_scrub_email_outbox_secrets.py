@@ -0,0 +1,28 @@
+"""scrub email outbox secrets
+
+Revision ID: 5d8b2c7e9a13
+Revises: e3d1f6a94c02
+Create Date: 2026-10-19 10:18:52.204916
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = '5d8b2c7e9a13'
+down_revision = 'e3d1f6a94c02'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # New account emails no longer carry the password, and emails given up on
+    # no longer keep their reset tokens
+    op.execute("UPDATE emailoutbox SET context = context - 'password' WHERE template = 'new_account'")
+    op.execute("UPDATE emailoutbox SET context = '{}' WHERE status = 'failed'")
+
+
+def downgrade():
+    pass
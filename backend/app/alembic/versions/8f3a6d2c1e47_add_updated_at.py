@@ -0,0 +1,40 @@
+"""add updated_at
+
+Revision ID: 8f3a6d2c1e47
+Revises: 3b9e4c71a2d8
+Create Date: 2026-10-18 14:05:21.904117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = '8f3a6d2c1e47'
+down_revision = '3b9e4c71a2d8'
+branch_labels = None
+depends_on = None
+
+TABLES = ('user', 'dep', 'emp', 'item')
+
+
+def upgrade():
+    for table in TABLES:
+        op.add_column(table, sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True))
+        # Existing rows have not changed since they were created
+        op.execute(f'UPDATE "{table}" SET updated_at = created_at')
+    # Collection ETags read count(*) and max(updated_at) per owner
+    op.create_index(op.f('ix_user_updated_at'), 'user', ['updated_at'], unique=False)
+    op.create_index(op.f('ix_dep_depuserid_updated_at'), 'dep', ['depuserid', 'updated_at'], unique=False)
+    op.create_index(op.f('ix_emp_emp_id_updated_at'), 'emp', ['emp_id', 'updated_at'], unique=False)
+    op.create_index(op.f('ix_item_owner_id_updated_at'), 'item', ['owner_id', 'updated_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_item_owner_id_updated_at'), table_name='item')
+    op.drop_index(op.f('ix_emp_emp_id_updated_at'), table_name='emp')
+    op.drop_index(op.f('ix_dep_depuserid_updated_at'), table_name='dep')
+    op.drop_index(op.f('ix_user_updated_at'), table_name='user')
+    for table in reversed(TABLES):
+        op.drop_column(table, 'updated_at')
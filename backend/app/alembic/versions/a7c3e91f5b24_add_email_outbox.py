@@ -0,0 +1,40 @@
+"""add email outbox
+
+Revision ID: a7c3e91f5b24
+Revises: 4b1e9d7a6c30
+Create Date: 2026-10-18 21:12:45.302117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7c3e91f5b24'
+down_revision = '4b1e9d7a6c30'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('emailoutbox',
+    sa.Column('id', sa.Uuid(), nullable=False),
+    sa.Column('email_to', sqlmodel.sql.sqltypes.AutoString(length=255), nullable=False),
+    sa.Column('template', sqlmodel.sql.sqltypes.AutoString(length=50), nullable=False),
+    sa.Column('context', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('status', sqlmodel.sql.sqltypes.AutoString(length=20), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('last_error', sqlmodel.sql.sqltypes.AutoString(length=1000), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('available_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('sent_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_emailoutbox_pending_available_at', 'emailoutbox', ['available_at'], unique=False, postgresql_where=sa.text("status = 'pending'"))
+
+
+def downgrade():
+    op.drop_index('ix_emailoutbox_pending_available_at', table_name='emailoutbox', postgresql_where=sa.text("status = 'pending'"))
+    op.drop_table('emailoutbox')
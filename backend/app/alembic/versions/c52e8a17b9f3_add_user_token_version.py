@@ -0,0 +1,25 @@
+"""add user token_version
+
+Revision ID: c52e8a17b9f3
+Revises: 8f3a6d2c1e47
+Create Date: 2026-10-18 16:22:09.513874
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = 'c52e8a17b9f3'
+down_revision = '8f3a6d2c1e47'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('user', sa.Column('token_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade():
+    op.drop_column('user', 'token_version')
@@ -0,0 +1,51 @@
+"""created_at not null
+
+Revision ID: e3d1f6a94c02
+Revises: a7c3e91f5b24
+Create Date: 2026-10-19 09:41:27.615320
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = 'e3d1f6a94c02'
+down_revision = 'a7c3e91f5b24'
+branch_labels = None
+depends_on = None
+
+TABLES = ('user', 'dep', 'emp', 'item')
+
+
+def upgrade():
+    for table in TABLES:
+        # Rows without created_at predate the column, so they are older than
+        # every dated row and keep sorting last on the list endpoints
+        op.execute(
+            f'UPDATE "{table}" SET created_at = COALESCE('
+            f'(SELECT min(created_at) FROM "{table}"), now()) '
+            'WHERE created_at IS NULL'
+        )
+        op.execute(
+            f'UPDATE "{table}" SET updated_at = created_at WHERE updated_at IS NULL'
+        )
+        op.alter_column(
+            table,
+            'created_at',
+            existing_type=sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.text('now()'),
+        )
+
+
+def downgrade():
+    for table in reversed(TABLES):
+        op.alter_column(
+            table,
+            'created_at',
+            existing_type=sa.DateTime(timezone=True),
+            nullable=True,
+            server_default=None,
+        )
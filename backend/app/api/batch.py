@@ -0,0 +1,120 @@
+import uuid
+from collections.abc import Sequence
+from typing import Any, TypeVar
+
+from fastapi import HTTPException
+from sqlalchemy import ColumnElement, Uuid, any_, literal, true
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm.interfaces import ORMOption
+from sqlmodel import Session, SQLModel, col, delete, select
+
+from app.api.deps import Principal
+from app.core.config import settings
+from app.models import BatchError
+
+T = TypeVar("T", bound=SQLModel)
+
+
+def batch_ids(ids: Sequence[uuid.UUID]) -> list[uuid.UUID]:
+    """
+    Requested IDs without duplicates, in request order.
+    """
+    unique = list(dict.fromkeys(ids))
+    if len(unique) > settings.BATCH_MAX_IDS:
+        raise HTTPException(
+            status_code=422,
+            detail=f"At most {settings.BATCH_MAX_IDS} ids per request",
+        )
+    return unique
+
+
+def id_in(id: Any, ids: Sequence[uuid.UUID]) -> ColumnElement[bool]:
+    """
+    `id = ANY(:ids)`, one array parameter however many IDs are passed, so every
+    batch runs the same statement text.
+    """
+    return col(id) == any_(literal(list(ids), ARRAY(Uuid())))
+
+
+def _allowed(owner_id: Any, principal: Principal) -> ColumnElement[bool]:
+    if principal.is_superuser:
+        return true()
+    return col(owner_id) == principal.id
+
+
+def _errors(
+    ids: Sequence[uuid.UUID], forbidden: set[uuid.UUID], *, not_found: str
+) -> list[BatchError]:
+    return [
+        BatchError(id=id, status=403, detail="Not enough permissions")
+        if id in forbidden
+        else BatchError(id=id, status=404, detail=not_found)
+        for id in ids
+    ]
+
+
+def get_batch(
+    session: Session,
+    model: type[T],
+    *,
+    id: Any,
+    owner_id: Any,
+    ids: list[uuid.UUID],
+    principal: Principal,
+    not_found: str,
+    options: Sequence[ORMOption] = (),
+) -> tuple[list[T], list[BatchError]]:
+    """
+    Rows with the given IDs the principal may read, in request order, and an
+    error for each of the other IDs.
+
+    One statement, the permission check is evaluated by the database next to
+    each row so a row owned by someone else is told apart from a missing one.
+    """
+    statement = (
+        select(model, _allowed(owner_id, principal).label("allowed"))
+        .where(id_in(id, ids))
+        .options(*options)
+    )
+    readable: dict[uuid.UUID, T | None] = {}
+    for row, allowed in session.exec(statement):
+        readable[getattr(row, id.key)] = row if allowed else None
+    found = [visible for key in ids if (visible := readable.get(key)) is not None]
+    forbidden = {key for key, visible in readable.items() if visible is None}
+    missing = [key for key in ids if readable.get(key) is None]
+    return found, _errors(missing, forbidden, not_found=not_found)
+
+
+def delete_batch(
+    session: Session,
+    model: type[SQLModel],
+    *,
+    id: Any,
+    owner_id: Any,
+    ids: list[uuid.UUID],
+    principal: Principal,
+    not_found: str,
+) -> tuple[dict[uuid.UUID, uuid.UUID], list[BatchError]]:
+    """
+    Delete the rows with the given IDs the principal owns, returning the owner
+    of each deleted row and an error for each of the other IDs.
+
+    Deletes in one statement, a second one only runs when some IDs were not
+    deleted, to tell rows owned by someone else apart from missing ones. The
+    caller commits.
+    """
+    statement = delete(model).where(id_in(id, ids))
+    if not principal.is_superuser:
+        statement = statement.where(col(owner_id) == principal.id)
+    deleted: dict[uuid.UUID, uuid.UUID] = dict(
+        session.exec(
+            statement.returning(col(id), col(owner_id)).execution_options(
+                synchronize_session=False
+            )
+        ).all()
+    )
+    missing = [key for key in ids if key not in deleted]
+    if not missing:
+        return deleted, []
+    forbidden = set(session.exec(select(col(id)).where(id_in(id, missing))).all())
+    return deleted, _errors(missing, forbidden, not_found=not_found)
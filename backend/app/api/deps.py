@@ -1,16 +1,30 @@
-from collections.abc import Generator
+import math
+import uuid
+from collections.abc import AsyncGenerator, Generator
+from dataclasses import dataclass
 from typing import Annotated
 
 import jwt
-from fastapi import Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordBearer
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from jwt.exceptions import InvalidTokenError
 from pydantic import ValidationError
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.core import security
 from app.core.config import settings
-from app.core.db import engine
+from app.core.db import async_engine, engine, recent_writes, replicas
+from app.core.principals import principal_cache
+from app.core.ratelimit import (
+    RateLimiter,
+    login_ip_limiter,
+    login_username_limiter,
+    recovery_email_limiter,
+    recovery_ip_limiter,
+)
+from app.core.replicas import RoutingSession
+from app.core.revocation import token_revocations
 from app.models import TokenPayload, User
 
 reusable_oauth2 = OAuth2PasswordBearer(
@@ -18,35 +32,130 @@ reusable_oauth2 = OAuth2PasswordBearer(
 )
 
 
-def get_db() -> Generator[Session, None, None]:
-    with Session(engine) as session:
+def get_db(request: Request) -> Generator[Session, None, None]:
+    if not replicas.engines:
+        with Session(engine) as session:
+            yield session
+        return
+    with RoutingSession(
+        engine,
+        replicas=replicas,
+        recent_writes=recent_writes,
+        read_only=request.method in ("GET", "HEAD"),
+        # Set by get_current_user(_async) / get_current_principal
+        user_id=lambda: getattr(request.state, "user_id", None),
+    ) as session:
+        yield session
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    # Expired attributes would need IO on access, refresh explicitly instead
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
         yield session
 
 
 SessionDep = Annotated[Session, Depends(get_db)]
+AsyncSessionDep = Annotated[AsyncSession, Depends(get_async_db)]
 TokenDep = Annotated[str, Depends(reusable_oauth2)]
 
 
-def get_current_user(session: SessionDep, token: TokenDep) -> User:
+def _invalid_credentials() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_403_FORBIDDEN,
+        detail="Could not validate credentials",
+    )
+
+
+def decode_token(token: str, *, token_type: str = "access") -> TokenPayload:
+    """
+    Verify a token of the given type and that it was not revoked since it was
+    issued, without loading the user.
+    """
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[security.ALGORITHM]
         )
         token_data = TokenPayload(**payload)
     except (InvalidTokenError, ValidationError):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Could not validate credentials",
-        )
-    user = session.get(User, token_data.sub)
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
+        raise _invalid_credentials()
+    if token_data.typ != token_type or not token_data.sub:
+        raise _invalid_credentials()
+    if token_revocations.is_revoked(token_data.sub, token_data.ver):
+        raise _invalid_credentials()
+    return token_data
+
+
+def _check_user(user: User, token_data: TokenPayload) -> User:
+    # The principal may come from the cache or the database, either knows
+    # about revocations other workers have not seen
+    if user.token_version > token_data.ver:
+        raise _invalid_credentials()
     if not user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     return user
 
 
+def _user_id(request: Request, token_data: TokenPayload) -> uuid.UUID:
+    try:
+        user_id = uuid.UUID(token_data.sub)
+    except (TypeError, ValueError):
+        raise _invalid_credentials()
+    # Lets the session send reads of a user who just wrote to the primary
+    request.state.user_id = user_id
+    return user_id
+
+
+def get_current_user(request: Request, session: SessionDep, token: TokenDep) -> User:
+    token_data = decode_token(token)
+    _user_id(request, token_data)
+    user = principal_cache.get(session, str(token_data.sub))
+    if not user:
+        user = session.get(User, token_data.sub)
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+        principal_cache.set(user)
+    return _check_user(user, token_data)
+
+
+async def get_current_user_async(
+    request: Request, session: AsyncSessionDep, token: TokenDep
+) -> User:
+    token_data = decode_token(token)
+    _user_id(request, token_data)
+    user = principal_cache.get(session.sync_session, str(token_data.sub))
+    if not user:
+        user = await session.get(User, token_data.sub)
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+        principal_cache.set(user)
+    return _check_user(user, token_data)
+
+
+@dataclass(frozen=True)
+class Principal:
+    """
+    The authenticated user as described by the signed access token claims.
+    """
+
+    id: uuid.UUID
+    is_superuser: bool
+
+
+def get_current_principal(request: Request, token: TokenDep) -> Principal:
+    """
+    Authorize from the token claims alone, for handlers that only need the
+    user id and superuser flag. No session or cache lookup is involved.
+    """
+    token_data = decode_token(token)
+    user_id = _user_id(request, token_data)
+    if not token_data.act:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    return Principal(id=user_id, is_superuser=token_data.su)
+
+
 CurrentUser = Annotated[User, Depends(get_current_user)]
+AsyncCurrentUser = Annotated[User, Depends(get_current_user_async)]
+CurrentPrincipal = Annotated[Principal, Depends(get_current_principal)]
 
 
 def get_current_active_superuser(current_user: CurrentUser) -> User:
@@ -55,3 +164,49 @@ def get_current_active_superuser(current_user: CurrentUser) -> User:
             status_code=403, detail="The user doesn't have enough privileges"
         )
     return current_user
+
+
+async def get_current_active_superuser_async(current_user: AsyncCurrentUser) -> User:
+    if not current_user.is_superuser:
+        raise HTTPException(
+            status_code=403, detail="The user doesn't have enough privileges"
+        )
+    return current_user
+
+
+def _check_rate(limiter: RateLimiter, key: str) -> None:
+    retry_after = limiter.hit(key)
+    if retry_after is not None:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many requests, please retry later",
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
+
+
+def _client_ip(request: Request) -> str:
+    # The proxy's address unless its X-Forwarded-For is trusted, see
+    # FORWARDED_ALLOW_IPS of uvicorn
+    return request.client.host if request.client else "unknown"
+
+
+def limit_login(
+    request: Request, form_data: Annotated[OAuth2PasswordRequestForm, Depends()]
+) -> None:
+    """
+    Reject login attempts over the per-IP or per-username rate before the
+    password is verified.
+    """
+    if settings.RATE_LIMIT_ENABLED:
+        _check_rate(login_ip_limiter, _client_ip(request))
+        _check_rate(login_username_limiter, form_data.username.lower())
+
+
+def limit_password_recovery(request: Request, email: str) -> None:
+    """
+    Reject password recovery requests over the per-IP or per-email rate
+    before the user is looked up.
+    """
+    if settings.RATE_LIMIT_ENABLED:
+        _check_rate(recovery_ip_limiter, _client_ip(request))
+        _check_rate(recovery_email_limiter, email.lower())
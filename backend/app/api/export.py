@@ -0,0 +1,83 @@
+import csv
+import io
+import json
+import uuid
+from collections.abc import Iterator
+from datetime import datetime
+from typing import Any, Literal
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select
+from sqlmodel import Session
+from typing_extensions import Unpack
+
+from app.core.config import settings
+from app.core.db import engine
+
+ExportFormat = Literal["ndjson", "csv"]
+
+MEDIA_TYPES: dict[ExportFormat, str] = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def _json_default(value: Any) -> str:
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def _iter_export(
+    statement: Select[Unpack[tuple[Any, ...]]], columns: list[str], format: ExportFormat
+) -> Iterator[str]:
+    # The request session is closed once the handler returns, the stream needs
+    # its own for as long as the client keeps reading
+    with Session(engine) as session:
+        result = session.connection().execute(
+            statement.execution_options(yield_per=settings.EXPORT_BATCH_SIZE)
+        )
+        if format == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(columns)
+            for partition in result.partitions():
+                writer.writerows(
+                    [
+                        value.isoformat() if isinstance(value, datetime) else value
+                        for value in row
+                    ]
+                    for row in partition
+                )
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+            yield buffer.getvalue()
+        else:
+            for partition in result.partitions():
+                yield "".join(
+                    json.dumps(
+                        dict(zip(columns, row, strict=True)), default=_json_default
+                    )
+                    + "\n"
+                    for row in partition
+                )
+
+
+def export_response(
+    statement: Select[Unpack[tuple[Any, ...]]], *, format: ExportFormat, filename: str
+) -> StreamingResponse:
+    """
+    Stream the rows of a column select as NDJSON or CSV.
+
+    Rows are fetched `EXPORT_BATCH_SIZE` at a time from a server-side cursor
+    and written without building ORM objects, so memory use is constant.
+    """
+    columns = list(statement.selected_columns.keys())
+    return StreamingResponse(
+        _iter_export(statement, columns, format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{format}"'},
+    )
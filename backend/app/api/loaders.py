@@ -0,0 +1,39 @@
+import uuid
+
+from sqlalchemy.orm import joinedload
+from sqlalchemy.orm.interfaces import ORMOption
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlmodel.sql.expression import SelectOfScalar
+
+from app.models import Emp
+
+# Relationships serialized by EmpPublic. Every employee read goes through these
+# so a page costs the same number of statements whatever its size.
+EMP_LOAD_OPTIONS: list[ORMOption] = [
+    joinedload(Emp.ownerdep),  # type: ignore[arg-type]
+]
+
+
+def select_emps() -> SelectOfScalar[Emp]:
+    return select(Emp).options(*EMP_LOAD_OPTIONS)
+
+
+def get_emp(
+    session: Session, empcode: uuid.UUID, *, reload: bool = False
+) -> Emp | None:
+    """
+    Employee by primary key with its relationships loaded.
+
+    With `reload` an instance already in the session is refreshed as well, in
+    the same statement, which is what handlers want after a commit.
+    """
+    return session.get(Emp, empcode, options=EMP_LOAD_OPTIONS, populate_existing=reload)
+
+
+async def get_emp_async(
+    session: AsyncSession, empcode: uuid.UUID, *, reload: bool = False
+) -> Emp | None:
+    return await session.get(
+        Emp, empcode, options=EMP_LOAD_OPTIONS, populate_existing=reload
+    )
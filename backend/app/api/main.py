@@ -1,15 +1,59 @@
 from fastapi import APIRouter
+from fastapi.datastructures import Default
+from fastapi.routing import APIRoute
 
+from app.api.responses import FastJSONResponse
 from app.api.routes import items, login, private, users, utils,Emp,dep
+from app.api.routes import async_deps, async_emps, async_items, async_users
 from app.core.config import settings
 
-api_router = APIRouter()
+
+def with_async_overrides(sync_router: APIRouter, async_router: APIRouter) -> APIRouter:
+    """
+    `sync_router` with each route replaced by the `async_router` handler for the
+    same path and method, keeping the original order for path matching.
+    """
+    overrides = {
+        (route.path, method): route
+        for route in async_router.routes
+        if isinstance(route, APIRoute)
+        for method in route.methods or ()
+    }
+    router = APIRouter()
+    for route in sync_router.routes:
+        if isinstance(route, APIRoute):
+            route = next(
+                (
+                    overrides[(route.path, method)]
+                    for method in route.methods or ()
+                    if (route.path, method) in overrides
+                ),
+                route,
+            )
+        router.routes.append(route)
+    return router
+
+
+if settings.DB_MODE == "async":
+    users_router = with_async_overrides(users.router, async_users.router)
+    emps_router = with_async_overrides(Emp.router, async_emps.router)
+    deps_router = with_async_overrides(dep.router, async_deps.router)
+    items_router = with_async_overrides(items.router, async_items.router)
+else:
+    users_router = users.router
+    emps_router = Emp.router
+    deps_router = dep.router
+    items_router = items.router
+
+# Wrapped in Default so routes with a response_model keep FastAPI's own
+# validate-and-dump-to-JSON path, a plain class would turn it off
+api_router = APIRouter(default_response_class=Default(FastJSONResponse))
 api_router.include_router(login.router)
-api_router.include_router(users.router)
-api_router.include_router(Emp.router)
-api_router.include_router(dep.router, prefix="/deps", tags=["deps"])
+api_router.include_router(users_router)
+api_router.include_router(emps_router)
+api_router.include_router(deps_router, prefix="/deps")
 api_router.include_router(utils.router)
-api_router.include_router(items.router)
+api_router.include_router(items_router)
 
 
 if settings.ENVIRONMENT == "local":
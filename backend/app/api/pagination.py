@@ -0,0 +1,149 @@
+import base64
+import json
+import uuid
+from collections.abc import Sequence
+from datetime import datetime
+from typing import Any, Literal, TypeVar
+
+from fastapi import HTTPException
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Session
+from sqlmodel import SQLModel, col, func, text
+from sqlmodel.sql.expression import SelectOfScalar
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+T = TypeVar("T")
+
+CountStrategy = Literal["exact", "estimated", "cached", "none"]
+
+count_cache: TTLCache[tuple[str, uuid.UUID | None], int] = TTLCache(
+    maxsize=settings.COUNT_CACHE_MAX_SIZE, ttl=settings.COUNT_CACHE_TTL_SECONDS
+)
+
+
+def encode_cursor(created_at: datetime, id: uuid.UUID) -> str:
+    """
+    Build an opaque cursor pointing right after the row with the given sort key.
+    """
+    raw = json.dumps([created_at.isoformat(), str(id)]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), uuid.UUID(id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def paginate(
+    statement: SelectOfScalar[T],
+    *,
+    created_at: Any,
+    id: Any,
+    skip: int,
+    limit: int,
+    cursor: str | None,
+) -> SelectOfScalar[T]:
+    """
+    Order a list statement newest first and apply either offset or keyset paging.
+
+    With a cursor the page is found with a seek predicate on
+    `(created_at, id)`, so its cost does not grow with the page depth.
+    """
+    statement = statement.order_by(col(created_at).desc(), col(id).desc())
+    if cursor is None:
+        return statement.offset(skip).limit(limit)
+    cursor_created_at, cursor_id = decode_cursor(cursor)
+    return statement.where(
+        tuple_(col(created_at), col(id)) < tuple_(cursor_created_at, cursor_id)
+    ).limit(limit)
+
+
+def next_cursor(rows: Sequence[Any], *, id: Any, limit: int) -> str | None:
+    """
+    Cursor for the page following `rows`, or None when this is the last page.
+    """
+    if not rows or len(rows) < limit:
+        return None
+    last = rows[-1]
+    return encode_cursor(last.created_at, getattr(last, id.key))
+
+
+def _exact_count(session: Session, statement: SelectOfScalar[Any]) -> int:
+    count_statement = statement.with_only_columns(
+        func.count(), maintain_column_froms=True
+    ).order_by(None)
+    return int(session.scalar(count_statement) or 0)
+
+
+def _estimated_count(
+    session: Session, statement: SelectOfScalar[Any], *, table: str, filtered: bool
+) -> int:
+    connection = session.connection()
+    if not filtered:
+        # Statistics kept by VACUUM / ANALYZE, -1 when never analyzed
+        reltuples = connection.execute(
+            text(
+                "SELECT reltuples::bigint FROM pg_class"
+                " WHERE oid = CAST(:table AS regclass)"
+            ),
+            {"table": table},
+        ).scalar_one()
+        if reltuples >= 0:
+            return int(reltuples)
+    compiled = statement.compile(dialect=connection.dialect)
+    plan = connection.exec_driver_sql(
+        f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params
+    ).scalar_one()
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def count_rows(
+    session: Session,
+    /,
+    statement: SelectOfScalar[Any],
+    *,
+    model: type[SQLModel],
+    owner_id: uuid.UUID | None,
+    strategy: CountStrategy,
+) -> int | None:
+    """
+    Count the rows matched by a list statement using the requested strategy.
+
+    `statement` is the unpaginated select, `owner_id` the value it is filtered
+    by, or None when it lists the whole table.
+    """
+    table = str(model.__tablename__)
+    if strategy == "none":
+        return None
+    if strategy == "estimated":
+        return _estimated_count(
+            session, statement, table=table, filtered=owner_id is not None
+        )
+    if strategy == "cached":
+        count = count_cache.get((table, owner_id))
+        if count is None:
+            count = _exact_count(session, statement)
+            count_cache.set((table, owner_id), count)
+        return count
+    return _exact_count(session, statement)
+
+
+def invalidate_counts(model: type[SQLModel], owner_id: uuid.UUID | None = None) -> None:
+    """
+    Drop cached counts after rows of `model` were created or deleted.
+
+    With an `owner_id` only that owner's count and the table-wide count are
+    dropped, otherwise every cached count of the table is.
+    """
+    table = str(model.__tablename__)
+    if owner_id is None:
+        count_cache.delete_where(lambda key: key[0] == table)
+    else:
+        count_cache.delete((table, owner_id))
+        count_cache.delete((table, None))
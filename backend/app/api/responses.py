@@ -0,0 +1,19 @@
+from typing import Any
+
+import pydantic_core
+from fastapi.responses import JSONResponse
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse rendered by pydantic-core instead of the stdlib encoder.
+
+    pydantic-core serializes models, UUIDs and datetimes itself, so handlers
+    can return an already validated `*Public` envelope in this response and
+    skip the second validation and the intermediate dict of `response_model`.
+    The envelope classes' validators and serializers are built once, when the
+    models are defined.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return pydantic_core.to_json(content)
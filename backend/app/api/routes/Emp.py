@@ -1,59 +1,156 @@
+import csv
+import json
 import uuid
-from typing import Any
+from collections.abc import AsyncIterator
+from typing import Annotated, Any
 
-from fastapi import APIRouter, HTTPException
-from sqlmodel import col, func, select
-from sqlalchemy.orm import selectinload 
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from pydantic import ValidationError
+from sqlalchemy import select as select_columns
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import Session, col, select
+from starlette.concurrency import run_in_threadpool
 
-from app.api.deps import CurrentUser, SessionDep
-from app.models import Emp, EmpCreate, EmpPublic, EmpsPublic, EmpUpdate, Message,Dep
+from app.api.batch import batch_ids, delete_batch, get_batch
+from app.api.deps import CurrentPrincipal, SessionDep
+from app.api.etags import (
+    collection_etag,
+    etag_matches,
+    not_modified,
+    row_etag,
+)
+from app.api.export import ExportFormat, export_response
+from app.api.loaders import EMP_LOAD_OPTIONS, get_emp, select_emps
+from app.api.pagination import (
+    CountStrategy,
+    count_rows,
+    invalidate_counts,
+    next_cursor,
+    paginate,
+)
+from app.api.responses import FastJSONResponse
+from app.api.search import next_search_cursor, search_statement
+from app.core.config import settings
+from app.models import (
+    BatchDeleteResult,
+    BatchIds,
+    Dep,
+    Emp,
+    EmpBulkError,
+    EmpBulkResult,
+    EmpCreate,
+    EmpPublic,
+    EmpsBatch,
+    EmpsPublic,
+    EmpUpdate,
+    Message,
+    get_datetime_utc,
+)
 
 router = APIRouter(prefix="/emps",tags=["emps"])
 
 @router.get("/", response_model=EmpsPublic)
-def read_emps(session: SessionDep, current_user: CurrentUser,skip: int = 0,limit: int = 10) -> Any:
+def read_emps(session: SessionDep, current_user: CurrentPrincipal, request: Request,skip: int = 0,limit: int = 10,cursor: str | None = None,count_strategy: CountStrategy = "exact") -> Any:
     """
     Retrieve Employees.
     """
-    if current_user.is_superuser:
-        count_statement = select(func.count()).select_from(Emp)
-        count = session.exec(count_statement).one()
-        statement = (
-            select(Emp).options(selectinload(Emp.ownerdep)).order_by(col(Emp.created_at).desc()).offset(skip).limit(limit)
-        )
-        emp = session.exec(statement).all()
-    else:
-        count_statement = (
-            select(func.count())
-            .select_from(Emp)
-            .where(Emp.emp_id == current_user.id)
-        )
-        count = session.exec(count_statement).one()
-        statement = (
-            select(Emp)
-            .where(Emp.emp_id == current_user.id)
-            .order_by(col(Emp.created_at).desc())
-            .offset(skip)
-            .limit(limit)
+    owner_id = None if current_user.is_superuser else current_user.id
+    statement = select_emps()
+    if owner_id:
+        statement = statement.where(Emp.emp_id == owner_id)
+    count = count_rows(
+        session, statement, model=Emp, owner_id=owner_id, strategy=count_strategy
+    )
+    statement = paginate(
+        statement,
+        created_at=Emp.created_at,
+        id=Emp.empcode,
+        skip=skip,
+        limit=limit,
+        cursor=cursor,
+    )
+    emp = session.exec(statement).all()
+    etag = collection_etag(request, emp, id=Emp.empcode, count=count, owner_id=owner_id)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    return FastJSONResponse(
+        EmpsPublic(
+            data=[EmpPublic.model_validate(row) for row in emp],
+            count=count,
+            count_strategy=count_strategy,
+            next_cursor=next_cursor(emp, id=Emp.empcode, limit=limit),
+        ),
+        headers={"ETag": etag},
+    )
+
+@router.get("/search", response_model=EmpsPublic)
+def search_emps(session: SessionDep, current_user: CurrentPrincipal, q: Annotated[str, Query(min_length=1, max_length=255)], limit: int = 10, cursor: str | None = None) -> Any:
+    """
+    Search Employees by words or word prefixes of their name, work email and
+    department name.
+
+    Best matches come first, pass the `next_cursor` of a page as `cursor` to
+    get the following one.
+    """
+    statement = search_statement(
+        Emp,
+        q=q,
+        id=Emp.empcode,
+        owner_id=Emp.emp_id,
+        owner=None if current_user.is_superuser else current_user.id,
+        limit=limit,
+        cursor=cursor,
+        options=EMP_LOAD_OPTIONS,
+    )
+    rows = session.exec(statement).all()
+    return FastJSONResponse(
+        EmpsPublic(
+            data=[EmpPublic.model_validate(emp) for emp, _ in rows],
+            count=None,
+            count_strategy="none",
+            next_cursor=next_search_cursor(rows, id=Emp.empcode, limit=limit),
         )
-        emp = session.exec(statement).all()
+    )
 
-    return EmpsPublic(data=emp, count=count)
+@router.get("/export")
+def export_emps(current_user: CurrentPrincipal, format: ExportFormat = "ndjson") -> Any:
+    """
+    Stream all visible Employees as NDJSON or CSV.
+    """
+    statement = select_columns(
+        col(Emp.empcode),
+        col(Emp.emp_id),
+        col(Emp.workemail),
+        col(Emp.name),
+        col(Emp.address),
+        col(Emp.mobile_number),
+        col(Emp.depemp_id),
+        col(Emp.dep_name),
+        col(Emp.created_at),
+    ).order_by(col(Emp.created_at).desc())
+    if not current_user.is_superuser:
+        statement = statement.where(col(Emp.emp_id) == current_user.id)
+    return export_response(statement, format=format, filename="emps")
 
 @router.get("/{empcode}", response_model=EmpPublic)
-def read_emp(session: SessionDep, current_user: CurrentUser, empcode: uuid.UUID) -> Any:
+def read_emp(session: SessionDep, current_user: CurrentPrincipal, request: Request, response: Response, empcode: uuid.UUID) -> Any:
     """
     Get Employee by Empcode.
     """
-    emps = session.get(Emp, empcode)
+    emps = get_emp(session, empcode)
     if not emps:
         raise HTTPException(status_code=404, detail="Employee not found")
-    if not current_user.is_superuser and (emps.empcode != current_user.id):
+    if not current_user.is_superuser and (emps.emp_id != current_user.id):
         raise HTTPException(status_code=403, detail="Not enough permissions")
+    etag = row_etag(emps.empcode, emps.updated_at)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
     return emps
 
 @router.post("/", response_model=EmpPublic)
-def create_emp(session: SessionDep, current_user: CurrentUser, emp_in: EmpCreate) -> Any:
+def create_emp(session: SessionDep, current_user: CurrentPrincipal, emp_in: EmpCreate) -> Any:
     """
     Create new Employee.
     """
@@ -73,15 +170,240 @@ def create_emp(session: SessionDep, current_user: CurrentUser, emp_in: EmpCreate
     emps.dep_name = dep_name_value
     session.add(emps)
     session.commit()
-    session.refresh(emps)
+    invalidate_counts(Emp, current_user.id)
+    emps = get_emp(session, emps.empcode, reload=True)
     return EmpPublic.model_validate(emps)
 
+BULK_CONTENT_TYPES = {
+    "text/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+}
+
+
+async def _iter_lines(request: Request) -> AsyncIterator[str]:
+    buffer = b""
+    try:
+        async for chunk in request.stream():
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                yield line.decode().rstrip("\r")
+        if buffer:
+            yield buffer.decode().rstrip("\r")
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="Request body must be UTF-8")
+
+
+async def _iter_csv_records(
+    request: Request,
+) -> AsyncIterator[dict[str, Any] | str]:
+    header: list[str] | None = None
+    pending = ""
+    async for line in _iter_lines(request):
+        pending = f"{pending}\n{line}" if pending else line
+        # A quoted field spans lines until its quotes are balanced
+        if pending.count('"') % 2:
+            continue
+        record, pending = pending, ""
+        if not record.strip():
+            continue
+        values = next(csv.reader([record]))
+        if header is None:
+            header = [name.strip().lstrip("\ufeff") for name in values]
+        elif len(values) != len(header):
+            yield f"Expected {len(header)} columns, got {len(values)}"
+        else:
+            # Empty CSV cells mean "not set", as missing NDJSON keys do
+            yield {key: value for key, value in zip(header, values, strict=True) if value != ""}
+    if pending:
+        yield "Unterminated quoted field"
+
+
+async def _iter_ndjson_records(
+    request: Request,
+) -> AsyncIterator[dict[str, Any] | str]:
+    async for line in _iter_lines(request):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            yield "Invalid JSON"
+            continue
+        yield record if isinstance(record, dict) else "Expected a JSON object"
+
+
+def _import_emp_batch(
+    session: Session,
+    batch: list[tuple[int, dict[str, Any] | str]],
+    *,
+    owner_id: uuid.UUID,
+    seen_emails: set[str],
+) -> tuple[int, list[EmpBulkError]]:
+    errors: list[EmpBulkError] = []
+    valid: list[tuple[int, EmpCreate]] = []
+    for row, record in batch:
+        if isinstance(record, str):
+            errors.append(EmpBulkError(row=row, detail=record))
+            continue
+        try:
+            emp_in = EmpCreate.model_validate(record)
+        except ValidationError as e:
+            detail = "; ".join(
+                f"{'.'.join(str(loc) for loc in err['loc'])}: {err['msg']}"
+                for err in e.errors()
+            )
+            errors.append(EmpBulkError(row=row, detail=detail))
+            continue
+        email = emp_in.workemail.lower()
+        if email in seen_emails:
+            errors.append(EmpBulkError(row=row, detail="Duplicate workemail in upload"))
+            continue
+        seen_emails.add(email)
+        valid.append((row, emp_in))
+
+    dep_ids = {emp_in.depemp_id for _, emp_in in valid if emp_in.depemp_id}
+    dep_names: dict[uuid.UUID, str] = {}
+    if dep_ids:
+        dep_names = dict(
+            session.exec(
+                select(Dep.dep_id, Dep.dep_name).where(col(Dep.dep_id).in_(dep_ids))
+            ).all()
+        )
+    rows: dict[str, tuple[int, dict[str, Any]]] = {}
+    for row, emp_in in valid:
+        if emp_in.depemp_id and emp_in.depemp_id not in dep_names:
+            errors.append(EmpBulkError(row=row, detail="Department not found"))
+            continue
+        values = emp_in.model_dump()
+        values.update(
+            empcode=uuid.uuid4(),
+            created_at=get_datetime_utc(),
+            emp_id=owner_id,
+            dep_name=dep_names.get(emp_in.depemp_id) if emp_in.depemp_id else None,
+        )
+        rows[values["workemail"]] = (row, values)
+    if not rows:
+        return 0, errors
+
+    # Emails already stored are skipped by the unique index instead of a
+    # SELECT per row, the returned emails are the rows actually inserted
+    statement = (
+        insert(Emp)
+        .on_conflict_do_nothing(index_elements=["workemail"])
+        .returning(col(Emp.workemail))
+    )
+    inserted = set(
+        session.execute(
+            statement, [values for _, values in rows.values()]
+        ).scalars()
+    )
+    session.commit()
+    for email, (row, _) in rows.items():
+        if email not in inserted:
+            errors.append(
+                EmpBulkError(row=row, detail="Employee with this email already exists")
+            )
+    return len(inserted), errors
+
+
+@router.post("/bulk", response_model=EmpBulkResult)
+async def bulk_create_emps(
+    request: Request, session: SessionDep, current_user: CurrentPrincipal
+) -> Any:
+    """
+    Create Employees from a streamed CSV (text/csv, header row first) or
+    NDJSON (application/x-ndjson) body.
+
+    Rows are validated and inserted in batches, invalid rows are reported
+    with their 1-based row number without aborting the others.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    if content_type not in BULK_CONTENT_TYPES:
+        raise HTTPException(
+            status_code=415, detail="Upload text/csv or application/x-ndjson"
+        )
+    if BULK_CONTENT_TYPES[content_type] == "csv":
+        records = _iter_csv_records(request)
+    else:
+        records = _iter_ndjson_records(request)
+
+    result = EmpBulkResult(created=0, errors=[])
+    seen_emails: set[str] = set()
+
+    async def import_batch(batch: list[tuple[int, dict[str, Any] | str]]) -> None:
+        created, errors = await run_in_threadpool(
+            _import_emp_batch,
+            session,
+            batch,
+            owner_id=current_user.id,
+            seen_emails=seen_emails,
+        )
+        result.created += created
+        result.errors += errors
+
+    batch: list[tuple[int, dict[str, Any] | str]] = []
+    row = 0
+    async for record in records:
+        row += 1
+        batch.append((row, record))
+        if len(batch) >= settings.EMP_BULK_BATCH_SIZE:
+            await import_batch(batch)
+            batch = []
+    if batch:
+        await import_batch(batch)
+    if result.created:
+        invalidate_counts(Emp, current_user.id)
+    result.errors.sort(key=lambda error: error.row)
+    return result
+
+@router.post("/batch-get", response_model=EmpsBatch)
+def batch_get_emps(session: SessionDep, current_user: CurrentPrincipal, body: BatchIds) -> Any:
+    """
+    Get Employees by Empcode in one request.
+
+    IDs that are missing or belong to someone else are listed in `errors`.
+    """
+    emps, errors = get_batch(
+        session,
+        Emp,
+        id=Emp.empcode,
+        owner_id=Emp.emp_id,
+        ids=batch_ids(body.ids),
+        principal=current_user,
+        not_found="Employee not found",
+        options=EMP_LOAD_OPTIONS,
+    )
+    return EmpsBatch(data=[EmpPublic.model_validate(emp) for emp in emps], errors=errors)
+
+@router.post("/batch-delete", response_model=BatchDeleteResult)
+def batch_delete_emps(session: SessionDep, current_user: CurrentPrincipal, body: BatchIds) -> Any:
+    """
+    Delete Employees by Empcode in one transaction.
+
+    IDs that are missing or belong to someone else are listed in `errors`.
+    """
+    deleted, errors = delete_batch(
+        session,
+        Emp,
+        id=Emp.empcode,
+        owner_id=Emp.emp_id,
+        ids=batch_ids(body.ids),
+        principal=current_user,
+        not_found="Employee not found",
+    )
+    session.commit()
+    for owner_id in set(deleted.values()):
+        invalidate_counts(Emp, owner_id)
+    return BatchDeleteResult(deleted=list(deleted), errors=errors)
+
 @router.patch("/{emp_id}", response_model=EmpPublic)
-def update_emp(*,session: SessionDep, current_user: CurrentUser, emp_id: uuid.UUID, emp_in: EmpUpdate) -> Any:
+def update_emp(*,session: SessionDep, current_user: CurrentPrincipal, emp_id: uuid.UUID, emp_in: EmpUpdate) -> Any:
     """
     Update Employee.
     """
-    emps = session.get(Emp, emp_id)
+    emps = get_emp(session, emp_id)
     if not emps:
         raise HTTPException(status_code=404, detail="Employee not found")
     if not current_user.is_superuser and (emps.emp_id != current_user.id):
@@ -98,22 +420,11 @@ def update_emp(*,session: SessionDep, current_user: CurrentUser, emp_id: uuid.UU
     emps.sqlmodel_update(update_data)
     session.add(emps)
     session.commit()
-    session.refresh(emps)
-    session.refresh(emps, attribute_names=["ownerdep"])
-    return EmpPublic(
-        empcode=emps.empcode,
-        emp_id=emps.emp_id,
-        workemail=emps.workemail,
-        name=emps.name,
-        address=emps.address,
-        mobile_number=emps.mobile_number,
-        depemp_id=emps.depemp_id,
-        dep_name=emps.ownerdep.dep_name if emps.ownerdep else None,
-        created_at=emps.created_at,
-    )
+    emps = get_emp(session, emp_id, reload=True)
+    return EmpPublic.model_validate(emps)
 
 @router.delete("/{emp_id}", response_model=Message)
-def delete_emp(session: SessionDep, current_user: CurrentUser, emp_id: uuid.UUID) -> Any:
+def delete_emp(session: SessionDep, current_user: CurrentPrincipal, emp_id: uuid.UUID) -> Any:
     """
     Delete Employee.
     """
@@ -124,4 +435,5 @@ def delete_emp(session: SessionDep, current_user: CurrentUser, emp_id: uuid.UUID
         raise HTTPException(status_code=403, detail="Not enough permissions")
     session.delete(emps)
     session.commit()
+    invalidate_counts(Emp, emps.emp_id)
     return Message(message="Employee deleted successfully")
@@ -0,0 +1,166 @@
+import uuid
+from typing import Any
+
+from fastapi import APIRouter, HTTPException, Request, Response
+from sqlmodel import col, select, update
+
+from app.api.deps import AsyncSessionDep, CurrentPrincipal
+from app.api.etags import (
+    collection_etag,
+    etag_matches,
+    not_modified,
+    row_etag,
+)
+from app.api.pagination import (
+    CountStrategy,
+    count_rows,
+    invalidate_counts,
+    next_cursor,
+    paginate,
+)
+from app.api.responses import FastJSONResponse
+from app.models import Dep, DepCreate, DepPublic, DepsPublic, DepUpdate, Emp, Message
+
+router = APIRouter(tags=["deps"])
+
+
+@router.get("/", response_model=DepsPublic)
+async def read_deps(
+    session: AsyncSessionDep,
+    current_user: CurrentPrincipal,
+    request: Request,
+    skip: int = 0,
+    limit: int = 10,
+    cursor: str | None = None,
+    count_strategy: CountStrategy = "exact",
+) -> Any:
+    """
+    Retrieve Departments.
+    """
+    owner_id = None if current_user.is_superuser else current_user.id
+    statement = select(Dep)
+    if owner_id:
+        statement = statement.where(Dep.depuserid == owner_id)
+    count = await session.run_sync(
+        count_rows, statement, model=Dep, owner_id=owner_id, strategy=count_strategy
+    )
+    statement = paginate(
+        statement,
+        created_at=Dep.created_at,
+        id=Dep.dep_id,
+        skip=skip,
+        limit=limit,
+        cursor=cursor,
+    )
+    deps = (await session.exec(statement)).all()
+    etag = collection_etag(request, deps, id=Dep.dep_id, count=count, owner_id=owner_id)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    return FastJSONResponse(
+        DepsPublic(
+            data=[DepPublic.model_validate(dep) for dep in deps],
+            count=count,
+            count_strategy=count_strategy,
+            next_cursor=next_cursor(deps, id=Dep.dep_id, limit=limit),
+        ),
+        headers={"ETag": etag},
+    )
+
+
+@router.get("/{dep_id}", response_model=DepPublic)
+async def read_dep(
+    session: AsyncSessionDep,
+    current_user: CurrentPrincipal,
+    request: Request,
+    response: Response,
+    dep_id: uuid.UUID,
+) -> Any:
+    """
+    Get Department by Depid.
+    """
+    deps = await session.get(Dep, dep_id)
+    if not deps:
+        raise HTTPException(status_code=404, detail="Department not found")
+    if not current_user.is_superuser and (deps.depuserid != current_user.id):
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    etag = row_etag(deps.dep_id, deps.updated_at)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+    return deps
+
+
+@router.post("/", response_model=DepPublic)
+async def create_dep(
+    session: AsyncSessionDep, current_user: CurrentPrincipal, dep_in: DepCreate
+) -> Any:
+    """
+    Create new Department.
+    """
+    deps = (
+        await session.exec(select(Dep).where(Dep.dep_code == dep_in.dep_code))
+    ).first()
+    if deps:
+        raise HTTPException(
+            status_code=400, detail="Department with this code already exists"
+        )
+    deps = Dep.model_validate(dep_in)
+    deps.depuserid = current_user.id
+    session.add(deps)
+    await session.commit()
+    invalidate_counts(Dep, current_user.id)
+    await session.refresh(deps)
+    return deps
+
+
+@router.patch("/{dep_id}", response_model=DepPublic)
+async def update_dep(
+    *,
+    session: AsyncSessionDep,
+    current_user: CurrentPrincipal,
+    dep_id: uuid.UUID,
+    dep_in: DepUpdate,
+) -> Any:
+    """
+    Update Department.
+    """
+    deps = await session.get(Dep, dep_id)
+    if not deps:
+        raise HTTPException(status_code=404, detail="Department not found")
+    if not current_user.is_superuser and (deps.depuserid != current_user.id):
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    update_dep = dep_in.model_dump(exclude_unset=True)
+    deps.sqlmodel_update(update_dep)
+    session.add(deps)
+    if session.is_modified(deps):
+        # Employees keep a copy of the name and embed the department, rewrite
+        # them in the same transaction, which also moves their updated_at
+        await session.exec(
+            update(Emp)
+            .where(col(Emp.depemp_id) == dep_id)
+            .values(dep_name=deps.dep_name)
+        )
+    await session.commit()
+    await session.refresh(deps)
+    return deps
+
+
+@router.delete("/{dep_id}", response_model=Message)
+async def delete_dep(
+    session: AsyncSessionDep, current_user: CurrentPrincipal, dep_id: uuid.UUID
+) -> Any:
+    """
+    Delete Department.
+    """
+    deps = await session.get(Dep, dep_id)
+    if not deps:
+        raise HTTPException(status_code=404, detail="Department not found")
+    if not current_user.is_superuser and (deps.depuserid != current_user.id):
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    await session.delete(deps)
+    await session.commit()
+    invalidate_counts(Dep, deps.depuserid)
+    # Employees of the department are removed by the database cascade
+    invalidate_counts(Emp)
+    return Message(message="Department deleted successfully")
@@ -0,0 +1,173 @@
+import uuid
+from typing import Any
+
+from fastapi import APIRouter, HTTPException, Request, Response
+from sqlmodel import select
+
+from app.api.deps import AsyncSessionDep, CurrentPrincipal
+from app.api.etags import (
+    collection_etag,
+    etag_matches,
+    not_modified,
+    row_etag,
+)
+from app.api.loaders import get_emp_async, select_emps
+from app.api.pagination import (
+    CountStrategy,
+    count_rows,
+    invalidate_counts,
+    next_cursor,
+    paginate,
+)
+from app.api.responses import FastJSONResponse
+from app.models import Dep, Emp, EmpCreate, EmpPublic, EmpsPublic, EmpUpdate, Message
+
+router = APIRouter(prefix="/emps", tags=["emps"])
+
+
+@router.get("/", response_model=EmpsPublic)
+async def read_emps(
+    session: AsyncSessionDep,
+    current_user: CurrentPrincipal,
+    request: Request,
+    skip: int = 0,
+    limit: int = 10,
+    cursor: str | None = None,
+    count_strategy: CountStrategy = "exact",
+) -> Any:
+    """
+    Retrieve Employees.
+    """
+    owner_id = None if current_user.is_superuser else current_user.id
+    statement = select_emps()
+    if owner_id:
+        statement = statement.where(Emp.emp_id == owner_id)
+    count = await session.run_sync(
+        count_rows, statement, model=Emp, owner_id=owner_id, strategy=count_strategy
+    )
+    statement = paginate(
+        statement,
+        created_at=Emp.created_at,
+        id=Emp.empcode,
+        skip=skip,
+        limit=limit,
+        cursor=cursor,
+    )
+    emps = (await session.exec(statement)).all()
+    etag = collection_etag(
+        request, emps, id=Emp.empcode, count=count, owner_id=owner_id
+    )
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    return FastJSONResponse(
+        EmpsPublic(
+            data=[EmpPublic.model_validate(emp) for emp in emps],
+            count=count,
+            count_strategy=count_strategy,
+            next_cursor=next_cursor(emps, id=Emp.empcode, limit=limit),
+        ),
+        headers={"ETag": etag},
+    )
+
+
+@router.get("/{empcode}", response_model=EmpPublic)
+async def read_emp(
+    session: AsyncSessionDep,
+    current_user: CurrentPrincipal,
+    request: Request,
+    response: Response,
+    empcode: uuid.UUID,
+) -> Any:
+    """
+    Get Employee by Empcode.
+    """
+    emps = await get_emp_async(session, empcode)
+    if not emps:
+        raise HTTPException(status_code=404, detail="Employee not found")
+    if not current_user.is_superuser and (emps.emp_id != current_user.id):
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    etag = row_etag(emps.empcode, emps.updated_at)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+    return emps
+
+
+@router.post("/", response_model=EmpPublic)
+async def create_emp(
+    session: AsyncSessionDep, current_user: CurrentPrincipal, emp_in: EmpCreate
+) -> Any:
+    """
+    Create new Employee.
+    """
+    emps = (
+        await session.exec(select(Emp).where(Emp.workemail == emp_in.workemail))
+    ).first()
+    if emps:
+        raise HTTPException(
+            status_code=400, detail="Employee with this email already exists"
+        )
+    if emp_in.depemp_id:
+        department = await session.get(Dep, emp_in.depemp_id)
+        if not department:
+            raise HTTPException(status_code=404, detail="Department not found")
+        dep_name_value = department.dep_name
+    else:
+        dep_name_value = None
+
+    emps = Emp.model_validate(emp_in)
+    emps.emp_id = current_user.id
+    emps.dep_name = dep_name_value
+    session.add(emps)
+    await session.commit()
+    invalidate_counts(Emp, current_user.id)
+    emps = await get_emp_async(session, emps.empcode, reload=True)
+    return EmpPublic.model_validate(emps)
+
+
+@router.patch("/{emp_id}", response_model=EmpPublic)
+async def update_emp(
+    *,
+    session: AsyncSessionDep,
+    current_user: CurrentPrincipal,
+    emp_id: uuid.UUID,
+    emp_in: EmpUpdate,
+) -> Any:
+    """
+    Update Employee.
+    """
+    emps = await get_emp_async(session, emp_id)
+    if not emps:
+        raise HTTPException(status_code=404, detail="Employee not found")
+    if not current_user.is_superuser and (emps.emp_id != current_user.id):
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    update_data = emp_in.model_dump(exclude_unset=True)
+    if emp_in.depemp_id is not None:
+        department = await session.get(Dep, emp_in.depemp_id)
+        if not department:
+            raise HTTPException(status_code=404, detail="Department not found")
+        update_data["dep_name"] = department.dep_name
+    emps.sqlmodel_update(update_data)
+    session.add(emps)
+    await session.commit()
+    emps = await get_emp_async(session, emp_id, reload=True)
+    return EmpPublic.model_validate(emps)
+
+
+@router.delete("/{emp_id}", response_model=Message)
+async def delete_emp(
+    session: AsyncSessionDep, current_user: CurrentPrincipal, emp_id: uuid.UUID
+) -> Any:
+    """
+    Delete Employee.
+    """
+    emps = await session.get(Emp, emp_id)
+    if not emps:
+        raise HTTPException(status_code=404, detail="Employee not found")
+    if not current_user.is_superuser and (emps.emp_id != current_user.id):
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    await session.delete(emps)
+    await session.commit()
+    invalidate_counts(Emp, emps.emp_id)
+    return Message(message="Employee deleted successfully")
@@ -0,0 +1,153 @@
+import uuid
+from typing import Any
+
+from fastapi import APIRouter, HTTPException, Request, Response
+from sqlmodel import select
+
+from app.api.deps import AsyncSessionDep, CurrentPrincipal
+from app.api.etags import (
+    collection_etag,
+    etag_matches,
+    not_modified,
+    row_etag,
+)
+from app.api.pagination import (
+    CountStrategy,
+    count_rows,
+    invalidate_counts,
+    next_cursor,
+    paginate,
+)
+from app.api.responses import FastJSONResponse
+from app.models import Item, ItemCreate, ItemPublic, ItemsPublic, ItemUpdate, Message
+
+router = APIRouter(prefix="/items", tags=["items"])
+
+
+@router.get("/", response_model=ItemsPublic)
+async def read_items(
+    session: AsyncSessionDep,
+    current_user: CurrentPrincipal,
+    request: Request,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str | None = None,
+    count_strategy: CountStrategy = "exact",
+) -> Any:
+    """
+    Retrieve items.
+
+    Pass the `next_cursor` of a previous page as `cursor` to page by keyset
+    instead of by offset. `count_strategy` picks how `count` is computed.
+    Responds 304 when `If-None-Match` holds the ETag of an unchanged page.
+    """
+
+    owner_id = None if current_user.is_superuser else current_user.id
+    statement = select(Item)
+    if owner_id:
+        statement = statement.where(Item.owner_id == owner_id)
+    count = await session.run_sync(
+        count_rows, statement, model=Item, owner_id=owner_id, strategy=count_strategy
+    )
+    statement = paginate(
+        statement,
+        created_at=Item.created_at,
+        id=Item.id,
+        skip=skip,
+        limit=limit,
+        cursor=cursor,
+    )
+    items = (await session.exec(statement)).all()
+    etag = collection_etag(request, items, id=Item.id, count=count, owner_id=owner_id)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    return FastJSONResponse(
+        ItemsPublic(
+            data=[ItemPublic.model_validate(item) for item in items],
+            count=count,
+            count_strategy=count_strategy,
+            next_cursor=next_cursor(items, id=Item.id, limit=limit),
+        ),
+        headers={"ETag": etag},
+    )
+
+
+@router.get("/{id}", response_model=ItemPublic)
+async def read_item(
+    session: AsyncSessionDep,
+    current_user: CurrentPrincipal,
+    request: Request,
+    response: Response,
+    id: uuid.UUID,
+) -> Any:
+    """
+    Get item by ID.
+    """
+    item = await session.get(Item, id)
+    if not item:
+        raise HTTPException(status_code=404, detail="Item not found")
+    if not current_user.is_superuser and (item.owner_id != current_user.id):
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    etag = row_etag(item.id, item.updated_at)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+    return item
+
+
+@router.post("/", response_model=ItemPublic)
+async def create_item(
+    *, session: AsyncSessionDep, current_user: CurrentPrincipal, item_in: ItemCreate
+) -> Any:
+    """
+    Create new item.
+    """
+    item = Item.model_validate(item_in, update={"owner_id": current_user.id})
+    session.add(item)
+    await session.commit()
+    invalidate_counts(Item, current_user.id)
+    await session.refresh(item)
+    return item
+
+
+@router.put("/{id}", response_model=ItemPublic)
+async def update_item(
+    *,
+    session: AsyncSessionDep,
+    current_user: CurrentPrincipal,
+    id: uuid.UUID,
+    item_in: ItemUpdate,
+) -> Any:
+    """
+    Update an item.
+    """
+    item = await session.get(Item, id)
+    if not item:
+        raise HTTPException(status_code=404, detail="Item not found")
+    if not current_user.is_superuser and (item.owner_id != current_user.id):
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    update_dict = item_in.model_dump(exclude_unset=True)
+    item.sqlmodel_update(update_dict)
+    session.add(item)
+    await session.commit()
+    await session.refresh(item)
+    return item
+
+
+@router.delete("/{id}")
+async def delete_item(
+    session: AsyncSessionDep, current_user: CurrentPrincipal, id: uuid.UUID
+) -> Message:
+    """
+    Delete an item.
+    """
+    item = await session.get(Item, id)
+    if not item:
+        raise HTTPException(status_code=404, detail="Item not found")
+    if not current_user.is_superuser and (item.owner_id != current_user.id):
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    await session.delete(item)
+    await session.commit()
+    invalidate_counts(Item, item.owner_id)
+    return Message(message="Item deleted successfully")
@@ -0,0 +1,208 @@
+import uuid
+from typing import Any
+
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    HTTPException,
+    Request,
+    Response,
+)
+from sqlmodel import select
+from starlette.concurrency import run_in_threadpool
+
+from app import crud
+from app.api.deps import (
+    AsyncCurrentUser,
+    AsyncSessionDep,
+    get_current_active_superuser_async,
+)
+from app.api.etags import (
+    collection_etag,
+    etag_matches,
+    not_modified,
+    row_etag,
+)
+from app.api.pagination import CountStrategy, count_rows, next_cursor, paginate
+from app.api.responses import FastJSONResponse
+from app.api.routes.users import invalidate_owned_counts, purge_user
+from app.core.security import get_password_hash
+from app.models import (
+    Message,
+    User,
+    UserPublic,
+    UsersPublic,
+    UserUpdate,
+)
+
+router = APIRouter(prefix="/users", tags=["users"])
+
+
+@router.get(
+    "/",
+    dependencies=[Depends(get_current_active_superuser_async)],
+    response_model=UsersPublic,
+)
+async def read_users(
+    session: AsyncSessionDep,
+    request: Request,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str | None = None,
+    count_strategy: CountStrategy = "exact",
+) -> Any:
+    """
+    Retrieve users.
+    """
+
+    statement = select(User)
+    count = await session.run_sync(
+        count_rows, statement, model=User, owner_id=None, strategy=count_strategy
+    )
+
+    statement = paginate(
+        statement,
+        created_at=User.created_at,
+        id=User.id,
+        skip=skip,
+        limit=limit,
+        cursor=cursor,
+    )
+    users = (await session.exec(statement)).all()
+    etag = collection_etag(request, users, id=User.id, count=count, owner_id=None)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    return FastJSONResponse(
+        UsersPublic(
+            data=[UserPublic.model_validate(user) for user in users],
+            count=count,
+            count_strategy=count_strategy,
+            next_cursor=next_cursor(users, id=User.id, limit=limit),
+        ),
+        headers={"ETag": etag},
+    )
+
+
+@router.get("/me", response_model=UserPublic)
+async def read_user_me(
+    current_user: AsyncCurrentUser, request: Request, response: Response
+) -> Any:
+    """
+    Get current user.
+    """
+    etag = row_etag(current_user.id, current_user.updated_at)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+    return current_user
+
+
+@router.get("/{user_id}", response_model=UserPublic)
+async def read_user_by_id(
+    user_id: uuid.UUID, session: AsyncSessionDep, current_user: AsyncCurrentUser
+) -> Any:
+    """
+    Get a specific user by id.
+    """
+    user = await session.get(User, user_id)
+    if user == current_user:
+        return user
+    if not current_user.is_superuser:
+        raise HTTPException(
+            status_code=403,
+            detail="The user doesn't have enough privileges",
+        )
+    if user is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return user
+
+
+@router.patch(
+    "/{user_id}",
+    dependencies=[Depends(get_current_active_superuser_async)],
+    response_model=UserPublic,
+)
+async def update_user(
+    *,
+    session: AsyncSessionDep,
+    user_id: uuid.UUID,
+    user_in: UserUpdate,
+) -> Any:
+    """
+    Update a user.
+    """
+
+    db_user = await session.get(User, user_id)
+    if not db_user:
+        raise HTTPException(
+            status_code=404,
+            detail="The user with this id does not exist in the system",
+        )
+    if user_in.email:
+        existing_user = (
+            await session.exec(select(User).where(User.email == user_in.email))
+        ).first()
+        if existing_user and existing_user.id != user_id:
+            raise HTTPException(
+                status_code=409, detail="User with this email already exists"
+            )
+
+    hashed_password = None
+    if user_in.password is not None:
+        # Hash off the event loop, Argon2 takes tens of milliseconds
+        hashed_password = await run_in_threadpool(get_password_hash, user_in.password)
+    revoke = crud.apply_user_update(db_user, user_in, hashed_password=hashed_password)
+    session.add(db_user)
+    token_version = None
+    if revoke:
+        token_version = (
+            await session.exec(crud.bump_token_version(user_id))
+        ).scalar_one()
+    await session.commit()
+    crud.invalidate_principal(user_id, token_version)
+    await session.refresh(db_user)
+    return db_user
+
+
+@router.delete("/{user_id}", dependencies=[Depends(get_current_active_superuser_async)])
+async def delete_user(
+    session: AsyncSessionDep,
+    current_user: AsyncCurrentUser,
+    background_tasks: BackgroundTasks,
+    response: Response,
+    user_id: uuid.UUID,
+    background: bool = False,
+) -> Message:
+    """
+    Delete a user.
+
+    With `background` the user is deactivated right away and their rows are
+    deleted in batches after the response, meant for very large accounts.
+    """
+    user = await session.get(User, user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    if user == current_user:
+        raise HTTPException(
+            status_code=403, detail="Super users are not allowed to delete themselves"
+        )
+    if background:
+        user.is_active = False
+        session.add(user)
+        token_version = (
+            await session.exec(crud.bump_token_version(user_id))
+        ).scalar_one()
+        await session.commit()
+        crud.invalidate_principal(user_id, token_version)
+        background_tasks.add_task(purge_user, user_id)
+        response.status_code = 202
+        return Message(message="User deletion scheduled")
+    token_version = (
+        await session.exec(crud.delete_user_statement(user_id))
+    ).scalar_one()
+    await session.commit()
+    crud.invalidate_principal(user_id, token_version)
+    invalidate_owned_counts(user_id)
+    return Message(message="User deleted successfully")
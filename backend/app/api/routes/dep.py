@@ -1,46 +1,119 @@
 import uuid
 from typing import Any
 
-from fastapi import APIRouter, HTTPException
-from sqlmodel import col, func, select
+from fastapi import APIRouter, HTTPException, Request, Response
+from sqlmodel import col, select, update
 
-from app.api.deps import CurrentUser, SessionDep
-from app.models import Dep, DepCreate, DepPublic, DepsPublic, DepUpdate, Message
+from app.api.batch import batch_ids, delete_batch, get_batch
+from app.api.deps import CurrentPrincipal, SessionDep
+from app.api.etags import (
+    collection_etag,
+    etag_matches,
+    not_modified,
+    row_etag,
+)
+from app.api.pagination import (
+    CountStrategy,
+    count_rows,
+    invalidate_counts,
+    next_cursor,
+    paginate,
+)
+from app.api.responses import FastJSONResponse
+from app.models import (
+    BatchDeleteResult,
+    BatchIds,
+    Dep,
+    DepCreate,
+    DepPublic,
+    DepsBatch,
+    DepsPublic,
+    DepUpdate,
+    Emp,
+    Message,
+)
 
-router = APIRouter()
+router = APIRouter(tags=["deps"])
 
 @router.get("/", response_model=DepsPublic)
-def read_deps(session: SessionDep, current_user: CurrentUser,skip: int = 0,limit: int = 10) -> Any:
+def read_deps(session: SessionDep, current_user: CurrentPrincipal, request: Request,skip: int = 0,limit: int = 10,cursor: str | None = None,count_strategy: CountStrategy = "exact") -> Any:
     """
     Retrieve Departments.
     """
-    if current_user.is_superuser:
-        count_statement = select(func.count()).select_from(Dep)
-        count = session.exec(count_statement).one()
-        statement = (
-            select(Dep).order_by(col(Dep.created_at).desc()).offset(skip).limit(limit)
-        )
-        deps = session.exec(statement).all()
-    else:
-        count_statement = (
-            select(func.count())
-            .select_from(Dep)
-            .where(Dep.depuserid == current_user.id)
-        )
-        count = session.exec(count_statement).one()
-        statement = (
-            select(Dep)
-            .where(Dep.depuserid == current_user.id)
-            .order_by(col(Dep.created_at).desc())
-            .offset(skip)
-            .limit(limit)
-        )
-        deps = session.exec(statement).all()
+    owner_id = None if current_user.is_superuser else current_user.id
+    statement = select(Dep)
+    if owner_id:
+        statement = statement.where(Dep.depuserid == owner_id)
+    count = count_rows(
+        session, statement, model=Dep, owner_id=owner_id, strategy=count_strategy
+    )
+    statement = paginate(
+        statement,
+        created_at=Dep.created_at,
+        id=Dep.dep_id,
+        skip=skip,
+        limit=limit,
+        cursor=cursor,
+    )
+    deps = session.exec(statement).all()
+    etag = collection_etag(request, deps, id=Dep.dep_id, count=count, owner_id=owner_id)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    return FastJSONResponse(
+        DepsPublic(
+            data=[DepPublic.model_validate(dep) for dep in deps],
+            count=count,
+            count_strategy=count_strategy,
+            next_cursor=next_cursor(deps, id=Dep.dep_id, limit=limit),
+        ),
+        headers={"ETag": etag},
+    )
 
-    return DepsPublic(data=deps, count=count)
+@router.post("/batch-get", response_model=DepsBatch)
+def batch_get_deps(session: SessionDep, current_user: CurrentPrincipal, body: BatchIds) -> Any:
+    """
+    Get Departments by Depid in one request.
+
+    IDs that are missing or belong to someone else are listed in `errors`.
+    """
+    deps, errors = get_batch(
+        session,
+        Dep,
+        id=Dep.dep_id,
+        owner_id=Dep.depuserid,
+        ids=batch_ids(body.ids),
+        principal=current_user,
+        not_found="Department not found",
+    )
+    return DepsBatch(data=[DepPublic.model_validate(dep) for dep in deps], errors=errors)
+
+@router.post("/batch-delete", response_model=BatchDeleteResult)
+def batch_delete_deps(session: SessionDep, current_user: CurrentPrincipal, body: BatchIds) -> Any:
+    """
+    Delete Departments by Depid in one transaction.
+
+    IDs that are missing or belong to someone else are listed in `errors`.
+    """
+    deleted, errors = delete_batch(
+        session,
+        Dep,
+        id=Dep.dep_id,
+        owner_id=Dep.depuserid,
+        ids=batch_ids(body.ids),
+        principal=current_user,
+        not_found="Department not found",
+    )
+    session.commit()
+    for owner_id in set(deleted.values()):
+        invalidate_counts(Dep, owner_id)
+    if deleted:
+        # Employees of the departments are removed by the database cascade
+        invalidate_counts(Emp)
+    return BatchDeleteResult(deleted=list(deleted), errors=errors)
 
 @router.get("/{dep_id}", response_model=DepPublic)
-def read_dep(session: SessionDep, current_user: CurrentUser, dep_id: uuid.UUID) -> Any:
+def read_dep(session: SessionDep, current_user: CurrentPrincipal, request: Request, response: Response, dep_id: uuid.UUID) -> Any:
     """
     Get Department by Depid.
     """
@@ -49,10 +122,14 @@ def read_dep(session: SessionDep, current_user: CurrentUser, dep_id: uuid.UUID)
         raise HTTPException(status_code=404, detail="Department not found")
     if not current_user.is_superuser and (deps.depuserid != current_user.id):
         raise HTTPException(status_code=403, detail="Not enough permissions")
+    etag = row_etag(deps.dep_id, deps.updated_at)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
     return deps
 
 @router.post("/", response_model=DepPublic)
-def create_dep(session: SessionDep, current_user: CurrentUser, dep_in: DepCreate) -> Any:
+def create_dep(session: SessionDep, current_user: CurrentPrincipal, dep_in: DepCreate) -> Any:
     """
     Create new Department.
     """
@@ -63,11 +140,12 @@ def create_dep(session: SessionDep, current_user: CurrentUser, dep_in: DepCreate
     deps.depuserid = current_user.id
     session.add(deps)
     session.commit()
+    invalidate_counts(Dep, current_user.id)
     session.refresh(deps)
     return deps
 
 @router.patch("/{dep_id}", response_model=DepPublic)
-def update_dep(*,session: SessionDep, current_user: CurrentUser, dep_id: uuid.UUID, dep_in: DepUpdate) -> Any:
+def update_dep(*,session: SessionDep, current_user: CurrentPrincipal, dep_id: uuid.UUID, dep_in: DepUpdate) -> Any:
     """
     Update Department.
     """
@@ -79,12 +157,20 @@ def update_dep(*,session: SessionDep, current_user: CurrentUser, dep_id: uuid.UU
     update_dep = dep_in.model_dump(exclude_unset=True)
     deps.sqlmodel_update(update_dep)
     session.add(deps)
+    if session.is_modified(deps):
+        # Employees keep a copy of the name and embed the department, rewrite
+        # them in the same transaction, which also moves their updated_at
+        session.exec(
+            update(Emp)
+            .where(col(Emp.depemp_id) == dep_id)
+            .values(dep_name=deps.dep_name)
+        )
     session.commit()
     session.refresh(deps)
     return deps
 
 @router.delete("/{dep_id}", response_model=Message)
-def delete_dep(session: SessionDep, current_user: CurrentUser, dep_id: uuid.UUID) -> Any:
+def delete_dep(session: SessionDep, current_user: CurrentPrincipal, dep_id: uuid.UUID) -> Any:
     """
     Delete Department.
     """
@@ -95,4 +181,7 @@ def delete_dep(session: SessionDep, current_user: CurrentUser, dep_id: uuid.UUID
         raise HTTPException(status_code=403, detail="Not enough permissions")
     session.delete(deps)
     session.commit()
+    invalidate_counts(Dep, deps.depuserid)
+    # Employees of the department are removed by the database cascade
+    invalidate_counts(Emp)
     return Message(message="Department deleted successfully")
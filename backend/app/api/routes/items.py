@@ -1,51 +1,202 @@
 import uuid
-from typing import Any
+from typing import Annotated, Any
 
-from fastapi import APIRouter, HTTPException
-from sqlmodel import col, func, select
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from sqlalchemy import select as select_columns
+from sqlmodel import col, select
 
-from app.api.deps import CurrentUser, SessionDep
-from app.models import Item, ItemCreate, ItemPublic, ItemsPublic, ItemUpdate, Message
+from app.api.batch import batch_ids, delete_batch, get_batch
+from app.api.deps import CurrentPrincipal, SessionDep
+from app.api.etags import (
+    collection_etag,
+    etag_matches,
+    not_modified,
+    row_etag,
+)
+from app.api.export import ExportFormat, export_response
+from app.api.pagination import (
+    CountStrategy,
+    count_rows,
+    invalidate_counts,
+    next_cursor,
+    paginate,
+)
+from app.api.responses import FastJSONResponse
+from app.api.search import next_search_cursor, search_statement
+from app.models import (
+    BatchDeleteResult,
+    BatchIds,
+    Item,
+    ItemCreate,
+    ItemPublic,
+    ItemsBatch,
+    ItemsPublic,
+    ItemUpdate,
+    Message,
+)
 
 router = APIRouter(prefix="/items", tags=["items"])
 
 
 @router.get("/", response_model=ItemsPublic)
 def read_items(
-    session: SessionDep, current_user: CurrentUser, skip: int = 0, limit: int = 100
+    session: SessionDep,
+    current_user: CurrentPrincipal,
+    request: Request,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str | None = None,
+    count_strategy: CountStrategy = "exact",
 ) -> Any:
     """
     Retrieve items.
+
+    Pass the `next_cursor` of a previous page as `cursor` to page by keyset
+    instead of by offset. `count_strategy` picks how `count` is computed.
+    Responds 304 when `If-None-Match` holds the ETag of an unchanged page.
     """
 
-    if current_user.is_superuser:
-        count_statement = select(func.count()).select_from(Item)
-        count = session.exec(count_statement).one()
-        statement = (
-            select(Item).order_by(col(Item.created_at).desc()).offset(skip).limit(limit)
-        )
-        items = session.exec(statement).all()
-    else:
-        count_statement = (
-            select(func.count())
-            .select_from(Item)
-            .where(Item.owner_id == current_user.id)
-        )
-        count = session.exec(count_statement).one()
-        statement = (
-            select(Item)
-            .where(Item.owner_id == current_user.id)
-            .order_by(col(Item.created_at).desc())
-            .offset(skip)
-            .limit(limit)
+    owner_id = None if current_user.is_superuser else current_user.id
+    statement = select(Item)
+    if owner_id:
+        statement = statement.where(Item.owner_id == owner_id)
+    count = count_rows(
+        session, statement, model=Item, owner_id=owner_id, strategy=count_strategy
+    )
+    statement = paginate(
+        statement,
+        created_at=Item.created_at,
+        id=Item.id,
+        skip=skip,
+        limit=limit,
+        cursor=cursor,
+    )
+    items = session.exec(statement).all()
+    etag = collection_etag(request, items, id=Item.id, count=count, owner_id=owner_id)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    return FastJSONResponse(
+        ItemsPublic(
+            data=[ItemPublic.model_validate(item) for item in items],
+            count=count,
+            count_strategy=count_strategy,
+            next_cursor=next_cursor(items, id=Item.id, limit=limit),
+        ),
+        headers={"ETag": etag},
+    )
+
+
+@router.get("/search", response_model=ItemsPublic)
+def search_items(
+    session: SessionDep,
+    current_user: CurrentPrincipal,
+    q: Annotated[str, Query(min_length=1, max_length=255)],
+    limit: int = 100,
+    cursor: str | None = None,
+) -> Any:
+    """
+    Search items by words or word prefixes of their title and description.
+
+    Best matches come first, pass the `next_cursor` of a page as `cursor` to
+    get the following one.
+    """
+    statement = search_statement(
+        Item,
+        q=q,
+        id=Item.id,
+        owner_id=Item.owner_id,
+        owner=None if current_user.is_superuser else current_user.id,
+        limit=limit,
+        cursor=cursor,
+    )
+    rows = session.exec(statement).all()
+    return FastJSONResponse(
+        ItemsPublic(
+            data=[ItemPublic.model_validate(item) for item, _ in rows],
+            count=None,
+            count_strategy="none",
+            next_cursor=next_search_cursor(rows, id=Item.id, limit=limit),
         )
-        items = session.exec(statement).all()
+    )
+
+
+@router.get("/export")
+def export_items(
+    current_user: CurrentPrincipal, format: ExportFormat = "ndjson"
+) -> Any:
+    """
+    Stream all visible items as NDJSON or CSV.
+    """
+    statement = select_columns(
+        col(Item.id),
+        col(Item.owner_id),
+        col(Item.title),
+        col(Item.description),
+        col(Item.created_at),
+    ).order_by(col(Item.created_at).desc())
+    if not current_user.is_superuser:
+        statement = statement.where(col(Item.owner_id) == current_user.id)
+    return export_response(statement, format=format, filename="items")
+
+
+@router.post("/batch-get", response_model=ItemsBatch)
+def batch_get_items(
+    session: SessionDep, current_user: CurrentPrincipal, body: BatchIds
+) -> Any:
+    """
+    Get items by ID in one request.
+
+    IDs that are missing or belong to someone else are listed in `errors` with
+    the status a single-item request would have returned.
+    """
+    items, errors = get_batch(
+        session,
+        Item,
+        id=Item.id,
+        owner_id=Item.owner_id,
+        ids=batch_ids(body.ids),
+        principal=current_user,
+        not_found="Item not found",
+    )
+    return ItemsBatch(
+        data=[ItemPublic.model_validate(item) for item in items], errors=errors
+    )
+
 
-    return ItemsPublic(data=items, count=count)
+@router.post("/batch-delete", response_model=BatchDeleteResult)
+def batch_delete_items(
+    session: SessionDep, current_user: CurrentPrincipal, body: BatchIds
+) -> Any:
+    """
+    Delete items by ID in one transaction.
+
+    IDs that are missing or belong to someone else are listed in `errors` and
+    do not prevent the others from being deleted.
+    """
+    deleted, errors = delete_batch(
+        session,
+        Item,
+        id=Item.id,
+        owner_id=Item.owner_id,
+        ids=batch_ids(body.ids),
+        principal=current_user,
+        not_found="Item not found",
+    )
+    session.commit()
+    for owner_id in set(deleted.values()):
+        invalidate_counts(Item, owner_id)
+    return BatchDeleteResult(deleted=list(deleted), errors=errors)
 
 
 @router.get("/{id}", response_model=ItemPublic)
-def read_item(session: SessionDep, current_user: CurrentUser, id: uuid.UUID) -> Any:
+def read_item(
+    session: SessionDep,
+    current_user: CurrentPrincipal,
+    request: Request,
+    response: Response,
+    id: uuid.UUID,
+) -> Any:
     """
     Get item by ID.
     """
@@ -54,12 +205,16 @@ def read_item(session: SessionDep, current_user: CurrentUser, id: uuid.UUID) ->
         raise HTTPException(status_code=404, detail="Item not found")
     if not current_user.is_superuser and (item.owner_id != current_user.id):
         raise HTTPException(status_code=403, detail="Not enough permissions")
+    etag = row_etag(item.id, item.updated_at)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
     return item
 
 
 @router.post("/", response_model=ItemPublic)
 def create_item(
-    *, session: SessionDep, current_user: CurrentUser, item_in: ItemCreate
+    *, session: SessionDep, current_user: CurrentPrincipal, item_in: ItemCreate
 ) -> Any:
     """
     Create new item.
@@ -67,6 +222,7 @@ def create_item(
     item = Item.model_validate(item_in, update={"owner_id": current_user.id})
     session.add(item)
     session.commit()
+    invalidate_counts(Item, current_user.id)
     session.refresh(item)
     return item
 
@@ -75,7 +231,7 @@ def create_item(
 def update_item(
     *,
     session: SessionDep,
-    current_user: CurrentUser,
+    current_user: CurrentPrincipal,
     id: uuid.UUID,
     item_in: ItemUpdate,
 ) -> Any:
@@ -97,7 +253,7 @@ def update_item(
 
 @router.delete("/{id}")
 def delete_item(
-    session: SessionDep, current_user: CurrentUser, id: uuid.UUID
+    session: SessionDep, current_user: CurrentPrincipal, id: uuid.UUID
 ) -> Message:
     """
     Delete an item.
@@ -109,4 +265,5 @@ def delete_item(
         raise HTTPException(status_code=403, detail="Not enough permissions")
     session.delete(item)
     session.commit()
+    invalidate_counts(Item, item.owner_id)
     return Message(message="Item deleted successfully")
@@ -6,21 +6,56 @@ from fastapi.responses import HTMLResponse
 from fastapi.security import OAuth2PasswordRequestForm
 
 from app import crud
-from app.api.deps import CurrentUser, SessionDep, get_current_active_superuser
+from app.api.deps import (
+    CurrentUser,
+    SessionDep,
+    decode_token,
+    get_current_active_superuser,
+    limit_login,
+    limit_password_recovery,
+)
 from app.core import security
 from app.core.config import settings
-from app.models import Message, NewPassword, Token, UserPublic, UserUpdate
+from app.models import (
+    Message,
+    NewPassword,
+    RefreshTokenRequest,
+    Token,
+    User,
+    UserPublic,
+    UserUpdate,
+)
 from app.utils import (
     generate_password_reset_token,
     generate_reset_password_email,
-    send_email,
     verify_password_reset_token,
 )
 
 router = APIRouter(tags=["login"])
 
 
-@router.post("/login/access-token")
+def issue_tokens(user: User) -> Token:
+    """
+    A short-lived access token carrying the user's current claims and a
+    refresh token to renew it.
+    """
+    return Token(
+        access_token=security.create_access_token(
+            user.id,
+            expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
+            is_superuser=user.is_superuser,
+            is_active=user.is_active,
+            token_version=user.token_version,
+        ),
+        refresh_token=security.create_refresh_token(
+            user.id,
+            expires_delta=timedelta(minutes=settings.REFRESH_TOKEN_EXPIRE_MINUTES),
+            token_version=user.token_version,
+        ),
+    )
+
+
+@router.post("/login/access-token", dependencies=[Depends(limit_login)])
 def login_access_token(
     session: SessionDep, form_data: Annotated[OAuth2PasswordRequestForm, Depends()]
 ) -> Token:
@@ -34,12 +69,21 @@ def login_access_token(
         raise HTTPException(status_code=400, detail="Incorrect email or password")
     elif not user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    return Token(
-        access_token=security.create_access_token(
-            user.id, expires_delta=access_token_expires
-        )
-    )
+    return issue_tokens(user)
+
+
+@router.post("/login/refresh-token")
+def refresh_access_token(session: SessionDep, body: RefreshTokenRequest) -> Token:
+    """
+    Exchange a refresh token for new tokens with the user's current claims
+    """
+    token_data = decode_token(body.refresh_token, token_type="refresh")
+    user = session.get(User, token_data.sub)
+    if not user or user.token_version != token_data.ver:
+        raise HTTPException(status_code=403, detail="Could not validate credentials")
+    if not user.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    return issue_tokens(user)
 
 
 @router.post("/login/test-token", response_model=UserPublic)
@@ -50,7 +94,9 @@ def test_token(current_user: CurrentUser) -> Any:
     return current_user
 
 
-@router.post("/password-recovery/{email}")
+@router.post(
+    "/password-recovery/{email}", dependencies=[Depends(limit_password_recovery)]
+)
 def recover_password(email: str, session: SessionDep) -> Message:
     """
     Password Recovery
@@ -61,14 +107,17 @@ def recover_password(email: str, session: SessionDep) -> Message:
     # Only send email if user actually exists
     if user:
         password_reset_token = generate_password_reset_token(email=email)
-        email_data = generate_reset_password_email(
-            email_to=user.email, email=email, token=password_reset_token
-        )
-        send_email(
+        crud.enqueue_email(
+            session=session,
             email_to=user.email,
-            subject=email_data.subject,
-            html_content=email_data.html_content,
+            template="reset_password",
+            context={
+                "email_to": user.email,
+                "email": email,
+                "token": password_reset_token,
+            },
         )
+        session.commit()
     return Message(
         message="If that email is registered, we sent a password recovery link"
     )
@@ -4,8 +4,11 @@ from fastapi import APIRouter
 from pydantic import BaseModel
 
 from app.api.deps import SessionDep
+from app.api.pagination import invalidate_counts
+from app.core.query_timing import slow_queries
 from app.core.security import get_password_hash
 from app.models import (
+    SlowQuery,
     User,
     UserPublic,
 )
@@ -34,5 +37,14 @@ def create_user(user_in: PrivateUserCreate, session: SessionDep) -> Any:
 
     session.add(user)
     session.commit()
+    invalidate_counts(User)
 
     return user
+
+
+@router.get("/slow-queries/", response_model=list[SlowQuery])
+def read_slow_queries(limit: int = 20) -> Any:
+    """
+    Slowest statements seen per route since startup.
+    """
+    return slow_queries.top(limit)
@@ -1,8 +1,15 @@
 import uuid
 from typing import Any
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import col, delete, func, select
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    HTTPException,
+    Request,
+    Response,
+)
+from sqlmodel import Session, select
 
 from app import crud
 from app.api.deps import (
@@ -10,12 +17,30 @@ from app.api.deps import (
     SessionDep,
     get_current_active_superuser,
 )
+from app.api.etags import (
+    collection_etag,
+    etag_matches,
+    not_modified,
+    row_etag,
+)
+from app.api.pagination import (
+    CountStrategy,
+    count_rows,
+    invalidate_counts,
+    next_cursor,
+    paginate,
+)
+from app.api.responses import FastJSONResponse
+from app.api.routes.login import issue_tokens
 from app.core.config import settings
-from app.core.security import get_password_hash, verify_password
+from app.core.db import engine
+from app.core.security import verify_password
 from app.models import (
-    Item,
+    Dep,
     Emp,
+    Item,
     Message,
+    Token,
     UpdatePassword,
     User,
     UserCreate,
@@ -25,30 +50,90 @@ from app.models import (
     UserUpdate,
     UserUpdateMe,
 )
-from app.utils import generate_new_account_email, send_email
 
 router = APIRouter(prefix="/users", tags=["users"])
 
 
+def invalidate_owned_counts(user_id: uuid.UUID) -> None:
+    invalidate_counts(User)
+    for model in (Item, Emp, Dep):
+        invalidate_counts(model, user_id)
+
+
+def purge_user(user_id: uuid.UUID) -> None:
+    """
+    Background part of a `background=true` user deletion, the user has already
+    been deactivated.
+
+    It runs in the worker that answered the request and is not persisted, a
+    purge cut short by a restart leaves the user deactivated with part of
+    their rows, a superuser deleting the user again finishes it.
+    """
+    with Session(engine) as session:
+        crud.purge_user(
+            session=session,
+            user_id=user_id,
+            batch_size=settings.USER_PURGE_BATCH_SIZE,
+        )
+    invalidate_owned_counts(user_id)
+
+
+def schedule_user_purge(
+    session: Session,
+    user: User,
+    background_tasks: BackgroundTasks,
+    response: Response,
+) -> Message:
+    crud.deactivate_user(session=session, db_user=user)
+    background_tasks.add_task(purge_user, user.id)
+    response.status_code = 202
+    return Message(message="User deletion scheduled")
+
+
 @router.get(
     "/",
     dependencies=[Depends(get_current_active_superuser)],
     response_model=UsersPublic,
 )
-def read_users(session: SessionDep, skip: int = 0, limit: int = 100) -> Any:
+def read_users(
+    session: SessionDep,
+    request: Request,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str | None = None,
+    count_strategy: CountStrategy = "exact",
+) -> Any:
     """
     Retrieve users.
     """
 
-    count_statement = select(func.count()).select_from(User)
-    count = session.exec(count_statement).one()
+    statement = select(User)
+    count = count_rows(
+        session, statement, model=User, owner_id=None, strategy=count_strategy
+    )
 
-    statement = (
-        select(User).order_by(col(User.created_at).desc()).offset(skip).limit(limit)
+    statement = paginate(
+        statement,
+        created_at=User.created_at,
+        id=User.id,
+        skip=skip,
+        limit=limit,
+        cursor=cursor,
     )
     users = session.exec(statement).all()
+    etag = collection_etag(request, users, id=User.id, count=count, owner_id=None)
+    if etag_matches(request, etag):
+        return not_modified(etag)
 
-    return UsersPublic(data=users, count=count)
+    return FastJSONResponse(
+        UsersPublic(
+            data=[UserPublic.model_validate(user) for user in users],
+            count=count,
+            count_strategy=count_strategy,
+            next_cursor=next_cursor(users, id=User.id, limit=limit),
+        ),
+        headers={"ETag": etag},
+    )
 
 
 @router.post(
@@ -65,16 +150,17 @@ def create_user(*, session: SessionDep, user_in: UserCreate) -> Any:
             detail="The user with this email already exists in the system.",
         )
 
-    user = crud.create_user(session=session, user_create=user_in)
     if settings.emails_enabled and user_in.email:
-        email_data = generate_new_account_email(
-            email_to=user_in.email, username=user_in.email, password=user_in.password
-        )
-        send_email(
+        # Committed by crud.create_user along with the user
+        crud.enqueue_email(
+            session=session,
             email_to=user_in.email,
-            subject=email_data.subject,
-            html_content=email_data.html_content,
+            template="new_account",
+            # The password is not stored, the email only names the account
+            context={"email_to": user_in.email, "username": user_in.email},
         )
+    user = crud.create_user(session=session, user_create=user_in)
+    invalidate_counts(User)
     return user
 
 
@@ -96,16 +182,20 @@ def update_user_me(
     current_user.sqlmodel_update(user_data)
     session.add(current_user)
     session.commit()
+    crud.invalidate_principal(current_user.id)
     session.refresh(current_user)
     return current_user
 
 
-@router.patch("/me/password", response_model=Message)
+@router.patch("/me/password", response_model=Token)
 def update_password_me(
     *, session: SessionDep, body: UpdatePassword, current_user: CurrentUser
 ) -> Any:
     """
     Update own password.
+
+    Every token issued before is revoked, the new tokens returned replace
+    them.
     """
     verified, _ = verify_password(body.current_password, current_user.hashed_password)
     if not verified:
@@ -114,32 +204,50 @@ def update_password_me(
         raise HTTPException(
             status_code=400, detail="New password cannot be the same as the current one"
         )
-    hashed_password = get_password_hash(body.new_password)
-    current_user.hashed_password = hashed_password
-    session.add(current_user)
-    session.commit()
-    return Message(message="Password updated successfully")
+    user = crud.update_user(
+        session=session,
+        db_user=current_user,
+        user_in=UserUpdate(password=body.new_password),
+    )
+    return issue_tokens(user)
 
 
 @router.get("/me", response_model=UserPublic)
-def read_user_me(current_user: CurrentUser) -> Any:
+def read_user_me(
+    current_user: CurrentUser, request: Request, response: Response
+) -> Any:
     """
     Get current user.
     """
+    etag = row_etag(current_user.id, current_user.updated_at)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
     return current_user
 
 
 @router.delete("/me", response_model=Message)
-def delete_user_me(session: SessionDep, current_user: CurrentUser) -> Any:
+def delete_user_me(
+    session: SessionDep,
+    current_user: CurrentUser,
+    background_tasks: BackgroundTasks,
+    response: Response,
+    background: bool = False,
+) -> Any:
     """
     Delete own user.
+
+    With `background` the account is deactivated right away and its rows are
+    deleted in batches after the response, meant for very large accounts.
     """
     if current_user.is_superuser:
         raise HTTPException(
             status_code=403, detail="Super users are not allowed to delete themselves"
         )
-    session.delete(current_user)
-    session.commit()
+    if background:
+        return schedule_user_purge(session, current_user, background_tasks, response)
+    crud.delete_user(session=session, db_user=current_user)
+    invalidate_owned_counts(current_user.id)
     return Message(message="User deleted successfully")
 
 
@@ -156,6 +264,7 @@ def register_user(session: SessionDep, user_in: UserRegister) -> Any:
         )
     user_create = UserCreate.model_validate(user_in)
     user = crud.create_user(session=session, user_create=user_create)
+    invalidate_counts(User)
     return user
 
 
@@ -213,10 +322,18 @@ def update_user(
 
 @router.delete("/{user_id}", dependencies=[Depends(get_current_active_superuser)])
 def delete_user(
-    session: SessionDep, current_user: CurrentUser, user_id: uuid.UUID
+    session: SessionDep,
+    current_user: CurrentUser,
+    background_tasks: BackgroundTasks,
+    response: Response,
+    user_id: uuid.UUID,
+    background: bool = False,
 ) -> Message:
     """
     Delete a user.
+
+    With `background` the user is deactivated right away and their rows are
+    deleted in batches after the response, meant for very large accounts.
     """
     user = session.get(User, user_id)
     if not user:
@@ -225,10 +342,8 @@ def delete_user(
         raise HTTPException(
             status_code=403, detail="Super users are not allowed to delete themselves"
         )
-    statement = delete(Item).where(col(Item.owner_id) == user_id)
-    statement2 = delete(Emp).where(col(Emp.emp_id) == user_id)
-    session.exec(statement)
-    session.exec(statement2)
-    session.delete(user)
-    session.commit()
+    if background:
+        return schedule_user_purge(session, user, background_tasks, response)
+    crud.delete_user(session=session, db_user=user)
+    invalidate_owned_counts(user_id)
     return Message(message="User deleted successfully")
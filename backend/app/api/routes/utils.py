@@ -2,7 +2,10 @@ from fastapi import APIRouter, Depends
 from pydantic.networks import EmailStr
 
 from app.api.deps import get_current_active_superuser
-from app.models import Message
+from app.core.db import get_pool_stats
+from app.core.principals import principal_cache
+from app.core.security import hashing_pool
+from app.models import HashingPoolStats, Message, PoolStats, PrincipalCacheStats
 from app.utils import generate_test_email, send_email
 
 router = APIRouter(prefix="/utils", tags=["utils"])
@@ -26,6 +29,39 @@ def test_email(email_to: EmailStr) -> Message:
     return Message(message="Test email sent")
 
 
+@router.get(
+    "/principal-cache-stats/",
+    dependencies=[Depends(get_current_active_superuser)],
+)
+def principal_cache_stats() -> PrincipalCacheStats:
+    """
+    Hit and miss counters of the authenticated user cache in this process.
+    """
+    return principal_cache.stats()
+
+
+@router.get(
+    "/hashing-stats/",
+    dependencies=[Depends(get_current_active_superuser)],
+)
+def hashing_stats() -> HashingPoolStats:
+    """
+    Latency and queue wait of the password hashing pool in this process.
+    """
+    return hashing_pool.stats()
+
+
+@router.get(
+    "/pool-stats/",
+    dependencies=[Depends(get_current_active_superuser)],
+)
+def pool_stats() -> PoolStats:
+    """
+    Connection pool usage of the database engine in this worker process.
+    """
+    return get_pool_stats()
+
+
 @router.get("/health-check/")
 async def health_check() -> bool:
     return True
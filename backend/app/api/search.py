@@ -0,0 +1,91 @@
+import base64
+import json
+import uuid
+from collections.abc import Sequence
+from typing import Any, TypeVar
+
+from fastapi import HTTPException
+from sqlalchemy import Float, cast, func, literal, tuple_
+from sqlalchemy.dialects.postgresql import REGCONFIG
+from sqlalchemy.orm.interfaces import ORMOption
+from sqlmodel import SQLModel, col, select
+from sqlmodel.sql.expression import Select
+
+T = TypeVar("T", bound=SQLModel)
+
+# Must match the configuration of the generated search documents
+SEARCH_CONFIG = "simple"
+
+
+def prefix_query(q: str) -> str:
+    """
+    `to_tsquery` input matching rows with a word starting with each term of `q`.
+
+    Terms are quoted, so user input is parsed as text and never as tsquery
+    operators.
+    """
+    terms = (term.replace("\\", "\\\\").replace("'", "''") for term in q.split())
+    return " & ".join(f"'{term}':*" for term in terms)
+
+
+def encode_search_cursor(rank: float, id: uuid.UUID) -> str:
+    raw = json.dumps([rank, str(id)]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_search_cursor(cursor: str) -> tuple[float, uuid.UUID]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        rank, id = json.loads(base64.urlsafe_b64decode(padded))
+        return float(rank), uuid.UUID(id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def search_statement(
+    model: type[T],
+    *,
+    q: str,
+    id: Any,
+    owner_id: Any,
+    owner: uuid.UUID | None,
+    limit: int,
+    cursor: str | None,
+    options: Sequence[ORMOption] = (),
+) -> Select[T, float]:
+    """
+    Rows of `model` matching `q` through its GIN-indexed `search_vector`, best
+    ranked first, each with its rank.
+
+    Pages are keyset paginated on `(rank, id)`, restricted to `owner` unless it
+    is None.
+    """
+    search_vector = model.__table__.c.search_vector  # type: ignore[attr-defined]
+    query = func.to_tsquery(literal(SEARCH_CONFIG, REGCONFIG), prefix_query(q))
+    # real, widened so the cursor compares exactly with what was returned
+    rank = cast(func.ts_rank(search_vector, query), Float)
+    statement = (
+        select(model, rank.label("rank"))
+        .where(search_vector.op("@@")(query))
+        .options(*options)
+    )
+    if owner is not None:
+        statement = statement.where(col(owner_id) == owner)
+    if cursor is not None:
+        cursor_rank, cursor_id = decode_search_cursor(cursor)
+        statement = statement.where(
+            tuple_(rank, col(id)) < tuple_(cursor_rank, cursor_id)
+        )
+    return statement.order_by(rank.desc(), col(id).desc()).limit(limit)
+
+
+def next_search_cursor(
+    rows: Sequence[tuple[Any, float]], *, id: Any, limit: int
+) -> str | None:
+    """
+    Cursor for the search page following `rows`, or None on the last page.
+    """
+    if not rows or len(rows) < limit:
+        return None
+    last, rank = rows[-1]
+    return encode_search_cursor(rank, getattr(last, id.key))
@@ -0,0 +1,58 @@
+import argparse
+import logging
+
+from sqlmodel import Session, col, select, update
+
+from app.core.db import engine
+from app.models import Dep, Emp
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def backfill_batch(session: Session, batch_size: int) -> int:
+    """
+    Copy the department name onto up to `batch_size` employees whose copy is
+    stale, returns the number of rows fixed.
+    """
+    stale = (
+        select(Emp.empcode)
+        .join(Dep, col(Emp.depemp_id) == col(Dep.dep_id))
+        .where(col(Emp.dep_name).is_distinct_from(col(Dep.dep_name)))
+        .limit(batch_size)
+    )
+    statement = (
+        update(Emp)
+        .where(col(Emp.empcode).in_(stale.scalar_subquery()))
+        .where(col(Emp.depemp_id) == col(Dep.dep_id))
+        .values(dep_name=Dep.dep_name)
+        .execution_options(synchronize_session=False)
+    )
+    result = session.exec(statement)
+    session.commit()
+    return int(result.rowcount)
+
+
+def backfill(session: Session, batch_size: int = 1000) -> int:
+    total = 0
+    while fixed := backfill_batch(session, batch_size):
+        total += fixed
+        logger.info("Fixed %d employees", total)
+    return total
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Repair Emp.dep_name copies that no longer match their department"
+    )
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    logger.info("Backfilling employee department names")
+    with Session(engine) as session:
+        total = backfill(session, args.batch_size)
+    logger.info("Backfilled %d employees", total)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import Any, Generic, Protocol, TypeVar
+
+from app.core.config import settings
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """
+    Thread-safe in-process LRU cache whose entries expire after `ttl` seconds.
+    """
+
+    def __init__(self, *, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: K) -> V | None:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: K, value: V, ttl: float | None = None) -> None:
+        expires = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def incr(self: "TTLCache[K, int]", key: K, ttl: float | None = None) -> int:
+        """
+        Add one to the count under `key`, which expires `ttl` seconds after
+        its last increment.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            count = 1 if entry is None or entry[0] < now else entry[1] + 1
+            self._data[key] = (now + (self.ttl if ttl is None else ttl), count)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+            return count
+
+    def delete(self, key: K) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def delete_where(self, predicate: Callable[[K], bool]) -> None:
+        with self._lock:
+            for key in [key for key in self._data if predicate(key)]:
+                del self._data[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class CacheBackend(Protocol):
+    """
+    Key-value store shared by all worker processes.
+    """
+
+    def get(self, key: str) -> str | None: ...
+
+    def set(self, key: str, value: str, ttl: float) -> None: ...
+
+    def incr(self, key: str, ttl: float) -> int:
+        """
+        Atomically add one to the counter under `key`, which expires `ttl`
+        seconds after its last increment.
+        """
+        ...
+
+    def delete(self, key: str) -> None: ...
+
+
+class MemoryBackend:
+    """
+    In-process stand-in for a shared backend, for tests and single-worker runs.
+    """
+
+    def __init__(self, *, maxsize: int = 100_000) -> None:
+        self._cache: TTLCache[str, str] = TTLCache(maxsize=maxsize, ttl=0)
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> str | None:
+        return self._cache.get(key)
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        self._cache.set(key, value, ttl=ttl)
+
+    def incr(self, key: str, ttl: float) -> int:
+        with self._lock:
+            count = int(self._cache.get(key) or 0) + 1
+            self._cache.set(key, str(count), ttl=ttl)
+            return count
+
+    def delete(self, key: str) -> None:
+        self._cache.delete(key)
+
+
+class RedisBackend:
+    def __init__(self, url: str) -> None:
+        # Optional dependency, only needed when CACHE_REDIS_URL is set
+        import redis  # type: ignore
+
+        self._client: Any = redis.Redis.from_url(url, decode_responses=True)
+
+    def get(self, key: str) -> str | None:
+        value: str | None = self._client.get(key)
+        return value
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        self._client.set(key, value, px=int(ttl * 1000))
+
+    def incr(self, key: str, ttl: float) -> int:
+        pipeline = self._client.pipeline()
+        pipeline.incr(key)
+        pipeline.pexpire(key, int(ttl * 1000))
+        count, _ = pipeline.execute()
+        return int(count)
+
+    def delete(self, key: str) -> None:
+        self._client.delete(key)
+
+
+def get_shared_backend() -> CacheBackend | None:
+    if settings.CACHE_REDIS_URL:
+        return RedisBackend(settings.CACHE_REDIS_URL)
+    return None
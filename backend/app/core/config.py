@@ -15,7 +15,7 @@ from pydantic_settings import BaseSettings, SettingsConfigDict
 from typing_extensions import Self
 
 
-def parse_cors(v: Any) -> list[str] | str:
+def parse_list(v: Any) -> list[str] | str:
     if isinstance(v, str) and not v.startswith("["):
         return [i.strip() for i in v.split(",") if i.strip()]
     elif isinstance(v, list | str):
@@ -32,13 +32,16 @@ class Settings(BaseSettings):
     )
     API_V1_STR: str = "/api/v1"
     SECRET_KEY: str = secrets.token_urlsafe(32)
+    # Access tokens are checked from their claims alone, keep them short and
+    # renew them with the refresh token
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
     # 60 minutes * 24 hours * 8 days = 8 days
-    ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 8
+    REFRESH_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 8
     FRONTEND_HOST: str = "http://localhost:5173"
     ENVIRONMENT: Literal["local", "staging", "production"] = "local"
 
     BACKEND_CORS_ORIGINS: Annotated[
-        list[AnyUrl] | str, BeforeValidator(parse_cors)
+        list[AnyUrl] | str, BeforeValidator(parse_list)
     ] = []
 
     @computed_field  # type: ignore[prop-decorator]
@@ -68,6 +71,78 @@ class Settings(BaseSettings):
             path=self.POSTGRES_DB,
         )
 
+    # Argon2 runs on a dedicated pool, calls beyond workers + queue get a 503.
+    # Each of those calls holds a thread of the request threadpool (40 by
+    # default) while it waits, keep workers + queue well below that so other
+    # sync handlers still get a thread during a login burst.
+    PASSWORD_HASH_MAX_WORKERS: int = 4
+    PASSWORD_HASH_MAX_QUEUE: int = 4
+    PASSWORD_HASH_RETRY_AFTER_SECONDS: int = 1
+    # Redis URL for caches shared by all worker processes, e.g.
+    # redis://redis:6379/0, requires the "redis" extra
+    CACHE_REDIS_URL: str | None = None
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+    PRINCIPAL_CACHE_MAX_SIZE: int = 10_000
+    # Requests per RATE_LIMIT_WINDOW_SECONDS to the login and password
+    # recovery endpoints, by client IP and by submitted username, further ones
+    # get a 429. Counted per worker unless CACHE_REDIS_URL is set.
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_WINDOW_SECONDS: float = 60
+    # Keys whose counters are kept in process memory
+    RATE_LIMIT_MAX_KEYS: int = 100_000
+    LOGIN_RATE_LIMIT_PER_IP: int = 30
+    LOGIN_RATE_LIMIT_PER_USERNAME: int = 10
+    PASSWORD_RECOVERY_RATE_LIMIT_PER_IP: int = 10
+    PASSWORD_RECOVERY_RATE_LIMIT_PER_EMAIL: int = 3
+    # Users whose tokens were revoked within the access token lifetime
+    TOKEN_REVOCATION_MAX_SIZE: int = 100_000
+    # Cached list counts are served for at most this long after a write
+    # performed by another worker process
+    COUNT_CACHE_TTL_SECONDS: int = 60
+    COUNT_CACHE_MAX_SIZE: int = 10_000
+
+    # Sizes are per engine and so per worker process, "fastapi run --workers 4"
+    # opens up to 4 * (DB_POOL_SIZE + DB_MAX_OVERFLOW) connections
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30
+    # Seconds after which a connection is replaced, -1 keeps it forever
+    DB_POOL_RECYCLE: int = -1
+    DB_POOL_PRE_PING: bool = False
+    # Open a connection per checkout, for use behind PgBouncer
+    DB_USE_NULL_POOL: bool = False
+
+    # "async" serves the items, emps, deps and users CRUD endpoints with async
+    # handlers on an AsyncEngine instead of sync handlers on the threadpool
+    DB_MODE: Literal["sync", "async"] = "sync"
+
+    # Read replicas for the sync GET handlers, comma separated, same form as
+    # the primary URL. Empty sends everything to the primary.
+    DB_REPLICA_URLS: Annotated[
+        list[PostgresDsn] | str, BeforeValidator(parse_list)
+    ] = []
+    # Seconds a replica that failed to connect is left out of the rotation
+    DB_REPLICA_EJECT_SECONDS: float = 30
+    # Seconds after a write during which the writer's reads use the primary,
+    # should exceed the usual replication lag
+    DB_READ_YOUR_WRITES_SECONDS: float = 5
+    DB_READ_YOUR_WRITES_MAX_SIZE: int = 100_000
+
+    # Rows fetched per server-side cursor round-trip by the export endpoints
+    EXPORT_BATCH_SIZE: int = 1000
+    # Rows validated, checked and inserted together by POST /emps/bulk
+    EMP_BULK_BATCH_SIZE: int = 1000
+    # IDs accepted by one batch-get or batch-delete request
+    BATCH_MAX_IDS: int = 100
+    # Rows per table deleted in each transaction when a user is deleted with
+    # `background=true`
+    USER_PURGE_BATCH_SIZE: int = 10_000
+
+    # Per-request statement count/time in Server-Timing headers and logs
+    QUERY_STATS_ENABLED: bool = True
+    # Route/statement pairs kept for GET /private/slow-queries
+    SLOW_QUERY_LOG_SIZE: int = 100
+
     SMTP_TLS: bool = True
     SMTP_SSL: bool = False
     SMTP_PORT: int = 587
@@ -84,6 +159,26 @@ class Settings(BaseSettings):
         return self
 
     EMAIL_RESET_TOKEN_EXPIRE_HOURS: int = 48
+    # Directory where compiled email templates are cached as bytecode, so
+    # restarted workers skip compiling them. The directory must exist.
+    EMAIL_TEMPLATES_BYTECODE_DIR: str | None = None
+
+    # Emails are handed to a background worker that sends them over a reused
+    # SMTP connection. Emails queued beyond EMAIL_QUEUE_MAX_SIZE are dropped.
+    EMAIL_QUEUE_MAX_SIZE: int = 1000
+    # Emails taken off the queue and sent back to back on one connection
+    EMAIL_BATCH_SIZE: int = 50
+    EMAIL_SEND_MAX_ATTEMPTS: int = 5
+    # Wait before the first retry of a failed send, doubled on each retry
+    EMAIL_RETRY_BACKOFF_SECONDS: float = 1
+    EMAIL_RETRY_BACKOFF_MAX_SECONDS: float = 60
+    SMTP_TIMEOUT_SECONDS: float = 10
+    # Rows the outbox dispatcher claims, and sends on one SMTP connection, at
+    # a time, and how long it waits when the outbox is empty
+    EMAIL_OUTBOX_BATCH_SIZE: int = 100
+    EMAIL_OUTBOX_POLL_SECONDS: float = 1
+    # The SMTP connection is closed after this long without an email to send
+    SMTP_IDLE_SECONDS: float = 30
 
     @computed_field  # type: ignore[prop-decorator]
     @property
@@ -1,10 +1,156 @@
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, ExecutionContext
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import ConnectionPoolEntry, NullPool, QueuePool
 from sqlmodel import Session, create_engine, select
 
 from app import crud
+from app.core import metrics
+from app.core.cache import get_shared_backend
 from app.core.config import settings
-from app.models import User, UserCreate
+from app.core.replicas import RecentWrites, ReplicaRouter
+from app.models import PoolStats, User, UserCreate
+
+
+class InstrumentedQueuePool(QueuePool):
+    """
+    QueuePool that records how long checkouts wait for a connection.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.wait_count = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            waited = time.perf_counter() - start
+            metrics.DB_POOL_WAIT_SECONDS.observe(waited)
+            with self._stats_lock:
+                self.wait_count += 1
+                self.wait_seconds_total += waited
+                self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+
+def engine_options() -> dict[str, Any]:
+    if settings.DB_USE_NULL_POOL:
+        return {"poolclass": NullPool, "pool_pre_ping": settings.DB_POOL_PRE_PING}
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+sync_engine_options = engine_options()
+if not settings.DB_USE_NULL_POOL:
+    sync_engine_options["poolclass"] = InstrumentedQueuePool
+engine = create_engine(str(settings.SQLALCHEMY_DATABASE_URI), **sync_engine_options)
+# GET requests of the sync handlers read from these when there are any
+replicas = ReplicaRouter(
+    [create_engine(str(url), **engine_options()) for url in settings.DB_REPLICA_URLS],
+    eject_seconds=settings.DB_REPLICA_EJECT_SECONDS,
+)
+recent_writes = RecentWrites(
+    maxsize=settings.DB_READ_YOUR_WRITES_MAX_SIZE,
+    ttl=settings.DB_READ_YOUR_WRITES_SECONDS,
+    backend=get_shared_backend(),
+)
+# Used by the async route handlers when DB_MODE is "async", psycopg picks its
+# async connection class for the same URL
+async_engine = create_async_engine(
+    str(settings.SQLALCHEMY_DATABASE_URI), **engine_options()
+)
+
+
+@event.listens_for(engine, "checkout")
+@event.listens_for(engine, "checkin")
+def _observe_pool(*_: Any) -> None:
+    metrics.observe_pool(engine.pool)
+
+
+@dataclass
+class QueryStats:
+    """
+    Statements executed while handling one request.
+    """
+
+    count: int = 0
+    seconds: float = 0.0
+    slowest_seconds: float = 0.0
+    slowest_statement: str | None = None
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.count += 1
+        self.seconds += seconds
+        if seconds >= self.slowest_seconds:
+            self.slowest_seconds = seconds
+            self.slowest_statement = statement
+
+
+# Set by the request middleware, the thread pool running sync handlers copies
+# the context so their statements land in the same object
+query_stats: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+def _before_cursor_execute(
+    conn: Connection,  # noqa: ARG001
+    cursor: Any,  # noqa: ARG001
+    statement: str,  # noqa: ARG001
+    parameters: Any,  # noqa: ARG001
+    context: ExecutionContext,
+    executemany: bool,  # noqa: ARG001
+) -> None:
+    context._query_started = time.perf_counter()  # type: ignore[attr-defined]
+
+
+def _after_cursor_execute(
+    conn: Connection,  # noqa: ARG001
+    cursor: Any,  # noqa: ARG001
+    statement: str,
+    parameters: Any,  # noqa: ARG001
+    context: ExecutionContext,
+    executemany: bool,  # noqa: ARG001
+) -> None:
+    stats = query_stats.get()
+    if stats is not None:
+        started: float = context._query_started  # type: ignore[attr-defined]
+        stats.record(statement, time.perf_counter() - started)
+
+
+for _engine in (engine, async_engine.sync_engine, *replicas.engines):
+    event.listen(_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(_engine, "after_cursor_execute", _after_cursor_execute)
+
 
-engine = create_engine(str(settings.SQLALCHEMY_DATABASE_URI))
+def get_pool_stats() -> PoolStats:
+    pool = engine.pool
+    if not isinstance(pool, InstrumentedQueuePool):
+        return PoolStats(pool_class=type(pool).__name__)
+    return PoolStats(
+        pool_class=type(pool).__name__,
+        size=pool.size(),
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        checked_in=pool.checkedin(),
+        checked_out=pool.checkedout(),
+        overflow=pool.overflow(),
+        wait_count=pool.wait_count,
+        wait_seconds_total=pool.wait_seconds_total,
+        wait_seconds_max=pool.wait_seconds_max,
+    )
 
 
 # make sure all SQLModel models are imported (app.models) before initializing DB
@@ -0,0 +1,253 @@
+import logging
+import queue
+import smtplib
+import threading
+from dataclasses import dataclass
+
+import emails
+
+from app.core import metrics
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class QueuedEmail:
+    email_to: str
+    mail_from: str
+    message: str
+
+
+def build_email(email_to: str, *, subject: str, html_content: str) -> QueuedEmail:
+    mail_from = str(settings.EMAILS_FROM_EMAIL)
+    message = emails.Message(  # type: ignore[attr-defined]
+        subject=subject,
+        html=html_content,
+        mail_from=(settings.EMAILS_FROM_NAME, mail_from),
+        mail_to=email_to,
+    )
+    return QueuedEmail(
+        email_to=email_to, mail_from=mail_from, message=message.as_string()
+    )
+
+
+def is_permanent_failure(exc: Exception) -> bool:
+    """
+    Whether the SMTP server refused the email for good, a 5xx reply.
+    Connection errors and 4xx replies are worth retrying.
+    """
+    if isinstance(exc, smtplib.SMTPRecipientsRefused):
+        return all(code >= 500 for code, _ in exc.recipients.values())
+    if isinstance(exc, smtplib.SMTPResponseException):
+        return exc.smtp_code >= 500
+    return False
+
+
+def connect_smtp() -> smtplib.SMTP:
+    """
+    A logged in connection to the configured SMTP server.
+    """
+    host, port = settings.SMTP_HOST or "", settings.SMTP_PORT
+    timeout = settings.SMTP_TIMEOUT_SECONDS
+    smtp: smtplib.SMTP
+    if settings.SMTP_TLS:
+        smtp = smtplib.SMTP(host, port, timeout=timeout)
+        smtp.starttls()
+    elif settings.SMTP_SSL:
+        smtp = smtplib.SMTP_SSL(host, port, timeout=timeout)
+    else:
+        smtp = smtplib.SMTP(host, port, timeout=timeout)
+    if settings.SMTP_USER:
+        smtp.login(settings.SMTP_USER, settings.SMTP_PASSWORD or "")
+    return smtp
+
+
+def disconnect_smtp(smtp: smtplib.SMTP) -> None:
+    try:
+        smtp.quit()
+    except (smtplib.SMTPException, OSError):
+        smtp.close()
+
+
+class Mailer:
+    """
+    Sends emails from a background thread so requests never wait on the SMTP
+    server.
+
+    The worker takes up to `batch_size` queued emails at a time and sends them
+    on one SMTP connection, which is kept open for the next batch until it was
+    idle for `idle_seconds`. Temporary failures are retried up to
+    `max_attempts` times with exponential backoff. At most `max_queue` emails
+    wait to be sent, further ones are dropped rather than held in memory
+    while the SMTP server is down.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_queue: int,
+        batch_size: int,
+        max_attempts: int,
+        backoff: float,
+        backoff_max: float,
+        idle_seconds: float,
+    ) -> None:
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.idle_seconds = idle_seconds
+        self._queue: queue.Queue[QueuedEmail | None] = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._closing = threading.Event()
+        self._smtp: smtplib.SMTP | None = None
+
+    def send(self, email_to: str, *, subject: str, html_content: str) -> bool:
+        """
+        Queue an email and return at once, False when the queue is full and
+        the email was dropped.
+        """
+        email = build_email(email_to, subject=subject, html_content=html_content)
+        self._start()
+        try:
+            self._queue.put_nowait(email)
+        except queue.Full:
+            metrics.EMAILS_REJECTED_TOTAL.inc()
+            logger.error("Email queue is full, dropped email to %s", email_to)
+            return False
+        return True
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._closing.clear()
+                self._thread = threading.Thread(
+                    target=self._run, name="email-delivery", daemon=True
+                )
+                self._thread.start()
+
+    def close(self, timeout: float | None = None) -> None:
+        """
+        Send the emails already queued, retries included, waiting at most
+        `timeout` seconds, and stop the worker. Emails still failing then are
+        given up on.
+        """
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            logger.warning("Email queue still full after %s seconds", timeout)
+        else:
+            thread.join(timeout)
+        if thread.is_alive():
+            logger.warning("Email worker still sending after %s seconds", timeout)
+        # Cuts short the backoff of the emails still being retried
+        self._closing.set()
+
+    def _run(self) -> None:
+        while True:
+            try:
+                first = self._queue.get(timeout=self.idle_seconds)
+            except queue.Empty:
+                self._disconnect()
+                continue
+            batch = [first]
+            while first is not None and len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._deliver([email for email in batch if email is not None])
+            except Exception:
+                logger.exception("Email worker failed to deliver a batch")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            if None in batch:
+                self._disconnect()
+                return
+
+    def _deliver(self, batch: list[QueuedEmail]) -> None:
+        pending = batch
+        for attempt in range(1, self.max_attempts + 1):
+            if attempt > 1:
+                metrics.EMAIL_RETRIES_TOTAL.inc(len(pending))
+            pending = self._send_batch(pending)
+            if not pending or attempt == self.max_attempts:
+                break
+            delay = min(self.backoff * 2 ** (attempt - 1), self.backoff_max)
+            if self._closing.wait(delay):
+                break
+        for email in pending:
+            metrics.EMAILS_FAILED_TOTAL.inc()
+            logger.error("Gave up sending email to %s", email.email_to)
+
+    def _send_batch(self, batch: list[QueuedEmail]) -> list[QueuedEmail]:
+        """
+        Send `batch` in order, returning the emails to try again.
+        """
+        if not settings.emails_enabled:
+            logger.error("Emails are not configured, dropped %d emails", len(batch))
+            metrics.EMAILS_FAILED_TOTAL.inc(len(batch))
+            return []
+        retry = []
+        for i, email in enumerate(batch):
+            try:
+                self._sendmail(email)
+            except (smtplib.SMTPException, OSError) as exc:
+                if is_permanent_failure(exc):
+                    metrics.EMAILS_FAILED_TOTAL.inc()
+                    logger.error(
+                        "SMTP server refused email to %s: %s", email.email_to, exc
+                    )
+                    continue
+                logger.warning("Sending email to %s failed: %r", email.email_to, exc)
+                if isinstance(exc, smtplib.SMTPResponseException):
+                    # A temporary refusal of this email, the connection is fine
+                    retry.append(email)
+                    continue
+                self._disconnect()
+                return retry + batch[i:]
+            metrics.EMAILS_SENT_TOTAL.inc()
+        return retry
+
+    def _sendmail(self, email: QueuedEmail) -> None:
+        reused = self._smtp is not None
+        try:
+            self._connection().sendmail(
+                email.mail_from, [email.email_to], email.message
+            )
+        except smtplib.SMTPServerDisconnected:
+            # Servers drop idle connections, reconnect once before failing
+            self._disconnect()
+            if not reused:
+                raise
+            self._connection().sendmail(
+                email.mail_from, [email.email_to], email.message
+            )
+
+    def _connection(self) -> smtplib.SMTP:
+        if self._smtp is None:
+            self._smtp = connect_smtp()
+        return self._smtp
+
+    def _disconnect(self) -> None:
+        smtp, self._smtp = self._smtp, None
+        if smtp is not None:
+            disconnect_smtp(smtp)
+
+
+mailer = Mailer(
+    max_queue=settings.EMAIL_QUEUE_MAX_SIZE,
+    batch_size=settings.EMAIL_BATCH_SIZE,
+    max_attempts=settings.EMAIL_SEND_MAX_ATTEMPTS,
+    backoff=settings.EMAIL_RETRY_BACKOFF_SECONDS,
+    backoff_max=settings.EMAIL_RETRY_BACKOFF_MAX_SECONDS,
+    idle_seconds=settings.SMTP_IDLE_SECONDS,
+)
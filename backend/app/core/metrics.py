@@ -0,0 +1,152 @@
+import os
+import time
+from collections.abc import Callable
+
+from fastapi.routing import APIRoute
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from sqlalchemy.pool import Pool, QueuePool
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# With PROMETHEUS_MULTIPROC_DIR set (e.g. for `fastapi run --workers 4`) every
+# worker writes its samples to files in that directory and /metrics
+# aggregates them. The directory must be emptied before the workers start.
+
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out_connections",
+    "Connections currently checked out of the pool",
+    multiprocess_mode="livesum",
+)
+DB_POOL_OVERFLOW = Gauge(
+    "db_pool_overflow_connections",
+    "Connections open beyond pool_size",
+    multiprocess_mode="livesum",
+)
+DB_POOL_WAIT_SECONDS = Histogram(
+    "db_pool_wait_seconds",
+    "Time spent waiting for a pooled connection",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30),
+)
+
+HTTP_REQUEST_DURATION_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "Time to handle a request, by route operation id",
+    ["route", "method"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "Requests currently being handled",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+HTTP_RESPONSES_TOTAL = Counter(
+    "http_responses_total",
+    "Responses sent, by route operation id and status code",
+    ["route", "method", "status"],
+)
+
+PASSWORD_HASH_SECONDS = Histogram(
+    "password_hash_seconds",
+    "Time spent hashing or verifying a password",
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+PASSWORD_HASH_WAIT_SECONDS = Histogram(
+    "password_hash_wait_seconds",
+    "Time a password hash waited for a hashing thread",
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+PASSWORD_HASH_REJECTED_TOTAL = Counter(
+    "password_hash_rejected_total",
+    "Password hashes rejected because the hashing pool was saturated",
+)
+
+EMAILS_SENT_TOTAL = Counter("emails_sent_total", "Emails accepted by the SMTP server")
+EMAILS_FAILED_TOTAL = Counter(
+    "emails_failed_total",
+    "Emails given up on, refused by the SMTP server or out of attempts",
+)
+EMAILS_REJECTED_TOTAL = Counter(
+    "emails_rejected_total",
+    "Emails dropped because the delivery queue was full",
+)
+EMAIL_RETRIES_TOTAL = Counter(
+    "email_retries_total", "Emails sent again after a temporary failure"
+)
+
+
+def observe_pool(pool: Pool) -> None:
+    if isinstance(pool, QueuePool):
+        DB_POOL_CHECKED_OUT.set(pool.checkedout())
+        DB_POOL_OVERFLOW.set(max(pool.overflow(), 0))
+
+
+def latest() -> tuple[bytes, str]:
+    """
+    Exposition of every metric, merged across workers in multiprocess mode.
+    """
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)  # type: ignore[no-untyped-call]
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead() -> None:
+    """
+    Drop this worker's live gauges from the multiprocess aggregation.
+    """
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        multiprocess.mark_process_dead(os.getpid())  # type: ignore[no-untyped-call]
+
+
+class MetricsMiddleware:
+    """
+    Record latency, status codes and in-flight requests per route.
+
+    Routes are labelled with `route_name`, the app's operation id function, so
+    series line up with the OpenAPI operation ids. Requests that match no
+    route share the "unmatched" label to keep the label set bounded.
+    """
+
+    def __init__(self, app: ASGIApp, route_name: Callable[[APIRoute], str]) -> None:
+        self.app = app
+        self.route_name = route_name
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_progress = HTTP_REQUESTS_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            in_progress.dec()
+            route = scope.get("route")
+            name = (
+                self.route_name(route) if isinstance(route, APIRoute) else "unmatched"
+            )
+            HTTP_REQUEST_DURATION_SECONDS.labels(name, method).observe(
+                time.perf_counter() - started
+            )
+            HTTP_RESPONSES_TOTAL.labels(name, method, str(status_code)).inc()
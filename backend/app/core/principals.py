@@ -0,0 +1,88 @@
+import json
+import threading
+import uuid
+from types import SimpleNamespace
+from typing import Any
+
+from sqlalchemy.orm import make_transient_to_detached
+from sqlmodel import Session
+
+from app.core.cache import CacheBackend, TTLCache, get_shared_backend
+from app.core.config import settings
+from app.models import PrincipalCacheStats, User
+
+
+class PrincipalCache:
+    """
+    Column snapshots of authenticated users, keyed by user id. The password
+    hash is left out, it is loaded from the database when accessed.
+
+    Entries live in process memory unless a shared backend is given, in which
+    case every worker reads and invalidates the same entries. Cached users are
+    attached to the request session without a database round-trip.
+    """
+
+    def __init__(
+        self, *, maxsize: int, ttl: float, backend: CacheBackend | None = None
+    ) -> None:
+        self.ttl = ttl
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self._local: TTLCache[str, dict[str, Any]] = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+
+    def _key(self, user_id: uuid.UUID | str) -> str:
+        return f"principal:{user_id}"
+
+    def _load(self, user_id: uuid.UUID | str) -> dict[str, Any] | None:
+        if self.backend is None:
+            return self._local.get(self._key(user_id))
+        raw = self.backend.get(self._key(user_id))
+        return None if raw is None else dict(json.loads(raw))
+
+    def get(self, session: Session, user_id: uuid.UUID | str) -> User | None:
+        data = self._load(user_id)
+        with self._lock:
+            if data is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if data is None:
+            return None
+        # Validate from attributes so relationship names like `items` are not
+        # looked up on the dict itself
+        user = User.model_validate(
+            SimpleNamespace(**{**data, "hashed_password": ""}), from_attributes=True
+        )
+        make_transient_to_detached(user)
+        user = session.merge(user, load=False)
+        session.expire(user, ["hashed_password"])
+        return user
+
+    def set(self, user: User) -> None:
+        data = user.model_dump(mode="json", exclude={"hashed_password"})
+        if self.backend is None:
+            self._local.set(self._key(user.id), data)
+        else:
+            self.backend.set(self._key(user.id), json.dumps(data), self.ttl)
+
+    def invalidate(self, user_id: uuid.UUID | str) -> None:
+        if self.backend is None:
+            self._local.delete(self._key(user_id))
+        else:
+            self.backend.delete(self._key(user_id))
+
+    def stats(self) -> PrincipalCacheStats:
+        return PrincipalCacheStats(
+            hits=self.hits,
+            misses=self.misses,
+            size=len(self._local) if self.backend is None else None,
+        )
+
+
+principal_cache = PrincipalCache(
+    maxsize=settings.PRINCIPAL_CACHE_MAX_SIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+    backend=get_shared_backend(),
+)
@@ -0,0 +1,120 @@
+import json
+import logging
+import threading
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.db import QueryStats, query_stats
+from app.models import SlowQuery
+
+logger = logging.getLogger(__name__)
+
+
+class SlowQueryLog:
+    """
+    The slowest statement seen for each route, keeping at most `size` pairs.
+    """
+
+    def __init__(self, *, size: int) -> None:
+        self.size = size
+        self._entries: dict[tuple[str, str], SlowQuery] = {}
+        self._lock = threading.Lock()
+
+    def record(self, route: str, statement: str, seconds: float) -> None:
+        ms = seconds * 1000
+        with self._lock:
+            entry = self._entries.get((route, statement))
+            if entry is None:
+                if len(self._entries) >= self.size:
+                    fastest = min(self._entries, key=lambda k: self._entries[k].max_ms)
+                    if self._entries[fastest].max_ms >= ms:
+                        return
+                    del self._entries[fastest]
+                entry = SlowQuery(
+                    route=route, statement=statement, max_ms=0, total_ms=0, count=0
+                )
+                self._entries[(route, statement)] = entry
+            entry.count += 1
+            entry.total_ms += ms
+            entry.max_ms = max(entry.max_ms, ms)
+
+    def top(self, limit: int) -> list[SlowQuery]:
+        with self._lock:
+            entries = sorted(
+                self._entries.values(), key=lambda entry: entry.max_ms, reverse=True
+            )
+        return [entry.model_copy() for entry in entries[:limit]]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+slow_queries = SlowQueryLog(size=settings.SLOW_QUERY_LOG_SIZE)
+
+
+def server_timing(stats: QueryStats) -> str:
+    timing = f'db;dur={stats.seconds * 1000:.2f};desc="{stats.count} queries"'
+    if stats.count:
+        timing += f", db-slowest;dur={stats.slowest_seconds * 1000:.2f}"
+    return timing
+
+
+class QueryTimingMiddleware:
+    """
+    Count and time the SQL statements of each request.
+
+    Totals go out as a `Server-Timing` header and a JSON log line, and the
+    slowest statement is kept in `slow_queries` under the matched route.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        status_code = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                MutableHeaders(scope=message).append(
+                    "Server-Timing", server_timing(stats)
+                )
+            await send(message)
+
+        token = query_stats.set(stats)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            query_stats.reset(token)
+            # Routing stores the matched route in the scope
+            path = getattr(scope.get("route"), "path", scope["path"])
+            route = f"{scope['method']} {path}"
+            if stats.slowest_statement is not None:
+                slow_queries.record(
+                    route, stats.slowest_statement, stats.slowest_seconds
+                )
+            logger.info(
+                json.dumps(
+                    {
+                        "event": "request_queries",
+                        "route": route,
+                        "status": status_code,
+                        "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+                        "query_count": stats.count,
+                        "query_ms": round(stats.seconds * 1000, 2),
+                        "slowest_query_ms": round(stats.slowest_seconds * 1000, 2),
+                        "slowest_query": stats.slowest_statement,
+                    }
+                )
+            )
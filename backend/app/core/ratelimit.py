@@ -0,0 +1,88 @@
+import math
+import time
+
+from app.core.cache import CacheBackend, TTLCache, get_shared_backend
+from app.core.config import settings
+
+
+class RateLimiter:
+    """
+    At most `limit` hits per key in any `window` seconds, counted over a
+    sliding window.
+
+    Each key has a counter per fixed window, the hits of the previous window
+    are weighted by how much of it the sliding window still covers, so a key
+    takes two counters whatever its rate. Rejected hits count too, a client
+    retrying in a loop stays blocked.
+
+    Counters live in process memory, the least recently used are dropped
+    beyond `maxsize` keys, unless a shared backend is given, then the limit
+    holds across all workers.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        limit: int,
+        window: float,
+        maxsize: int,
+        backend: CacheBackend | None = None,
+    ) -> None:
+        self.name = name
+        self.limit = limit
+        self.window = window
+        self.backend = backend
+        self._local: TTLCache[str, int] = TTLCache(maxsize=maxsize, ttl=2 * window)
+
+    def _key(self, key: str, window: int) -> str:
+        return f"rate:{self.name}:{key}:{window}"
+
+    def _incr(self, key: str) -> int:
+        if self.backend is None:
+            return self._local.incr(key)
+        return self.backend.incr(key, 2 * self.window)
+
+    def _count(self, key: str) -> int:
+        if self.backend is None:
+            return self._local.get(key) or 0
+        return int(self.backend.get(key) or 0)
+
+    def hit(self, key: str) -> float | None:
+        """
+        Count a hit for `key`, returns None when it is allowed, otherwise the
+        seconds until the next hit may be.
+        """
+        position = time.time() / self.window
+        window = math.floor(position)
+        elapsed = position - window
+        current = self._incr(self._key(key, window))
+        previous = self._count(self._key(key, window - 1))
+        if previous * (1 - elapsed) + current <= self.limit:
+            return None
+        return (1 - elapsed) * self.window
+
+    def clear(self) -> None:
+        self._local.clear()
+
+
+def _limiter(name: str, limit: int) -> RateLimiter:
+    return RateLimiter(
+        name,
+        limit=limit,
+        window=settings.RATE_LIMIT_WINDOW_SECONDS,
+        maxsize=settings.RATE_LIMIT_MAX_KEYS,
+        backend=get_shared_backend(),
+    )
+
+
+login_ip_limiter = _limiter("login-ip", settings.LOGIN_RATE_LIMIT_PER_IP)
+login_username_limiter = _limiter(
+    "login-username", settings.LOGIN_RATE_LIMIT_PER_USERNAME
+)
+recovery_ip_limiter = _limiter(
+    "recovery-ip", settings.PASSWORD_RECOVERY_RATE_LIMIT_PER_IP
+)
+recovery_email_limiter = _limiter(
+    "recovery-email", settings.PASSWORD_RECOVERY_RATE_LIMIT_PER_EMAIL
+)
@@ -0,0 +1,144 @@
+import itertools
+import threading
+import time
+import uuid
+from collections.abc import Callable, Sequence
+from typing import Any
+
+from sqlalchemy import Engine, event
+from sqlalchemy.engine import ExceptionContext
+from sqlalchemy.sql.dml import UpdateBase
+from sqlmodel import Session
+
+from app.core.cache import CacheBackend, TTLCache
+
+
+class ReplicaRouter:
+    """
+    Round-robin over read replica engines, skipping for `eject_seconds` any
+    replica that failed to connect or lost its connection.
+    """
+
+    def __init__(self, engines: Sequence[Engine], *, eject_seconds: float) -> None:
+        self.engines = list(engines)
+        self.eject_seconds = eject_seconds
+        self._ejected_until: dict[Engine, float] = {}
+        self._next = itertools.cycle(self.engines)
+        self._lock = threading.Lock()
+        for engine in self.engines:
+            event.listen(engine, "handle_error", self._on_error)
+
+    def _on_error(self, context: ExceptionContext) -> None:
+        if context.is_disconnect or context.connection is None:
+            if context.engine is not None:
+                self.eject(context.engine)
+
+    def eject(self, engine: Engine) -> None:
+        with self._lock:
+            self._ejected_until[engine] = time.monotonic() + self.eject_seconds
+
+    def is_healthy(self, engine: Engine) -> bool:
+        return self._ejected_until.get(engine, 0.0) <= time.monotonic()
+
+    def choose(self) -> Engine | None:
+        """
+        Next healthy replica, or None when there is none and reads must go to
+        the primary.
+        """
+        with self._lock:
+            for _ in range(len(self.engines)):
+                engine = next(self._next)
+                if self.is_healthy(engine):
+                    return engine
+        return None
+
+
+class RecentWrites:
+    """
+    Users who wrote in the last `ttl` seconds, whose reads stay on the primary
+    so they see their own changes whatever the replication lag.
+
+    Entries live in process memory unless a shared backend is given, then a
+    write seen by one worker routes the next reads of every worker.
+    """
+
+    def __init__(
+        self, *, maxsize: int, ttl: float, backend: CacheBackend | None = None
+    ) -> None:
+        self.ttl = ttl
+        self.backend = backend
+        self._local: TTLCache[str, float] = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def _key(self, user_id: uuid.UUID) -> str:
+        return f"recent-write:{user_id}"
+
+    def mark(self, user_id: uuid.UUID) -> None:
+        if self.backend is None:
+            self._local.set(self._key(user_id), time.time())
+        else:
+            self.backend.set(self._key(user_id), str(time.time()), self.ttl)
+
+    def __contains__(self, user_id: uuid.UUID) -> bool:
+        if self.backend is None:
+            return self._local.get(self._key(user_id)) is not None
+        return self.backend.get(self._key(user_id)) is not None
+
+
+class RoutingSession(Session):
+    """
+    Session of a read-only request, whose reads go to one replica while
+    flushes, INSERT / UPDATE / DELETE and SELECT ... FOR UPDATE go to the
+    primary `bind`.
+
+    Reads of a user who wrote recently also go to the primary. `user_id` is
+    called on each statement, the user is only known once the request is
+    authenticated. A committed write marks the user in `recent_writes`.
+    """
+
+    def __init__(
+        self,
+        bind: Engine,
+        *,
+        replicas: ReplicaRouter,
+        recent_writes: RecentWrites,
+        read_only: bool,
+        user_id: Callable[[], uuid.UUID | None],
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(bind, **kwargs)
+        self.primary = bind
+        self.replicas = replicas
+        self.recent_writes = recent_writes
+        self.read_only = read_only
+        self.user_id = user_id
+        self.replica: Engine | None = None
+        self.wrote = False
+
+    def _reads_from_replica(self) -> bool:
+        if not self.read_only:
+            return False
+        user_id = self.user_id()
+        return user_id is None or user_id not in self.recent_writes
+
+    def get_bind(self, mapper: Any = None, *, clause: Any = None, **kwargs: Any) -> Any:
+        # `_flushing` is private but is what SQLAlchemy's own vertical
+        # partitioning recipe checks, it has been set for the duration of
+        # Session.flush() through 2.0 and 2.1. Recheck it on SQLAlchemy upgrades,
+        # test_routing_session_flushes_go_to_primary fails if that changes.
+        writes = self._flushing or isinstance(clause, UpdateBase)
+        if writes or getattr(clause, "_for_update_arg", None) is not None:
+            self.wrote = self.wrote or writes
+            return self.primary
+        if not self._reads_from_replica():
+            return self.primary
+        # Stick to one replica for the whole request
+        if self.replica is None or not self.replicas.is_healthy(self.replica):
+            self.replica = self.replicas.choose()
+        return self.replica or self.primary
+
+    def commit(self) -> None:
+        super().commit()
+        user_id = self.user_id()
+        if self.wrote and user_id is not None:
+            self.recent_writes.mark(user_id)
+        self.wrote = False
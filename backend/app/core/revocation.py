@@ -0,0 +1,71 @@
+import logging
+import multiprocessing
+import uuid
+
+from app.core.cache import CacheBackend, TTLCache, get_shared_backend
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class TokenRevocations:
+    """
+    Lowest token version still accepted for users whose tokens were revoked.
+
+    Only revoked users have an entry, and only for as long as an access token
+    issued before the revocation can still be presented, so checking a token
+    is a single dictionary or backend lookup. Entries live in process memory
+    unless a shared backend is given, then every worker sees a revocation.
+    """
+
+    def __init__(
+        self, *, maxsize: int, ttl: float, backend: CacheBackend | None = None
+    ) -> None:
+        self.ttl = ttl
+        self.backend = backend
+        self._local: TTLCache[str, int] = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def _key(self, user_id: uuid.UUID | str) -> str:
+        return f"token-version:{user_id}"
+
+    def min_version(self, user_id: uuid.UUID | str) -> int | None:
+        if self.backend is None:
+            return self._local.get(self._key(user_id))
+        raw = self.backend.get(self._key(user_id))
+        return None if raw is None else int(raw)
+
+    def revoke(self, user_id: uuid.UUID | str, token_version: int) -> None:
+        """
+        Reject access tokens of `user_id` older than `token_version`.
+        """
+        if self.backend is None:
+            self._local.set(self._key(user_id), token_version)
+        else:
+            self.backend.set(self._key(user_id), str(token_version), self.ttl)
+
+    def is_revoked(self, user_id: uuid.UUID | str, token_version: int) -> bool:
+        min_version = self.min_version(user_id)
+        return min_version is not None and token_version < min_version
+
+
+def warn_if_not_shared(revocations: TokenRevocations) -> None:
+    """
+    Warn when this process is one of several workers and keeps revocations in
+    its own memory: a password change, demotion or deletion handled by another
+    worker is not seen here, and the old tokens, with their old claims, are
+    accepted until they expire.
+    """
+    if revocations.backend is None and multiprocessing.parent_process() is not None:
+        logger.warning(
+            "Token revocations are kept per worker process, set CACHE_REDIS_URL "
+            "when running several workers or revoked tokens stay valid on the "
+            "other workers for up to %s seconds",
+            int(revocations.ttl),
+        )
+
+
+token_revocations = TokenRevocations(
+    maxsize=settings.TOKEN_REVOCATION_MAX_SIZE,
+    ttl=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+    backend=get_shared_backend(),
+)
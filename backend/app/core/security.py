@@ -1,12 +1,20 @@
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Any
+from typing import Any, TypeVar
 
 import jwt
 from pwdlib import PasswordHash
 from pwdlib.hashers.argon2 import Argon2Hasher
 from pwdlib.hashers.bcrypt import BcryptHasher
 
+from app.core import metrics
 from app.core.config import settings
+from app.models import HashingPoolStats
+
+T = TypeVar("T")
 
 password_hash = PasswordHash(
     (
@@ -19,18 +27,140 @@ password_hash = PasswordHash(
 ALGORITHM = "HS256"
 
 
-def create_access_token(subject: str | Any, expires_delta: timedelta) -> str:
+def create_access_token(
+    subject: str | Any,
+    expires_delta: timedelta,
+    *,
+    is_superuser: bool = False,
+    is_active: bool = True,
+    token_version: int = 0,
+) -> str:
+    """
+    Sign an access token whose claims are enough to authorize most requests
+    without loading the user.
+    """
     expire = datetime.now(timezone.utc) + expires_delta
-    to_encode = {"exp": expire, "sub": str(subject)}
+    to_encode = {
+        "exp": expire,
+        "sub": str(subject),
+        "typ": "access",
+        "su": is_superuser,
+        "act": is_active,
+        "ver": token_version,
+    }
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
 
+def create_refresh_token(
+    subject: str | Any, expires_delta: timedelta, *, token_version: int = 0
+) -> str:
+    expire = datetime.now(timezone.utc) + expires_delta
+    to_encode = {
+        "exp": expire,
+        "sub": str(subject),
+        "typ": "refresh",
+        "ver": token_version,
+    }
+    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=ALGORITHM)
+
+
+class HashingPoolSaturated(Exception):
+    def __init__(self, retry_after: int) -> None:
+        super().__init__("Password hashing pool is saturated")
+        self.retry_after = retry_after
+
+
+class HashingPool:
+    """
+    Bounded thread pool for Argon2 work.
+
+    argon2-cffi releases the GIL while hashing, so `max_workers` threads hash
+    in parallel. At most `max_queue` more calls may wait for a thread, further
+    calls are rejected with HashingPoolSaturated instead of piling up on the
+    request threadpool.
+    """
+
+    def __init__(self, *, max_workers: int, max_queue: int, retry_after: int) -> None:
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.retry_after = retry_after
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="password-hash"
+        )
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._completed = 0
+        self._rejected = 0
+        self._wait_seconds_total = 0.0
+        self._wait_seconds_max = 0.0
+        self._hash_seconds_total = 0.0
+        self._hash_seconds_max = 0.0
+
+    def run(self, fn: Callable[..., T], *args: Any) -> T:
+        if not self._slots.acquire(blocking=False):
+            metrics.PASSWORD_HASH_REJECTED_TOTAL.inc()
+            with self._lock:
+                self._rejected += 1
+            raise HashingPoolSaturated(retry_after=self.retry_after)
+        submitted = time.perf_counter()
+
+        def task() -> T:
+            started = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                self._record(started - submitted, time.perf_counter() - started)
+
+        with self._lock:
+            self._in_flight += 1
+        try:
+            return self._executor.submit(task).result()
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+            self._slots.release()
+
+    def _record(self, wait: float, duration: float) -> None:
+        metrics.PASSWORD_HASH_WAIT_SECONDS.observe(wait)
+        metrics.PASSWORD_HASH_SECONDS.observe(duration)
+        with self._lock:
+            self._completed += 1
+            self._wait_seconds_total += wait
+            self._wait_seconds_max = max(self._wait_seconds_max, wait)
+            self._hash_seconds_total += duration
+            self._hash_seconds_max = max(self._hash_seconds_max, duration)
+
+    def stats(self) -> HashingPoolStats:
+        with self._lock:
+            return HashingPoolStats(
+                max_workers=self.max_workers,
+                max_queue=self.max_queue,
+                in_flight=self._in_flight,
+                completed=self._completed,
+                rejected=self._rejected,
+                wait_seconds_total=self._wait_seconds_total,
+                wait_seconds_max=self._wait_seconds_max,
+                hash_seconds_total=self._hash_seconds_total,
+                hash_seconds_max=self._hash_seconds_max,
+            )
+
+
+hashing_pool = HashingPool(
+    max_workers=settings.PASSWORD_HASH_MAX_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+    retry_after=settings.PASSWORD_HASH_RETRY_AFTER_SECONDS,
+)
+
+
 def verify_password(
     plain_password: str, hashed_password: str
 ) -> tuple[bool, str | None]:
-    return password_hash.verify_and_update(plain_password, hashed_password)
+    return hashing_pool.run(
+        password_hash.verify_and_update, plain_password, hashed_password
+    )
 
 
 def get_password_hash(password: str) -> str:
-    return password_hash.hash(password)
+    return hashing_pool.run(password_hash.hash, password)
@@ -1,10 +1,12 @@
 import uuid
 from typing import Any
 
-from sqlmodel import Session, select
+from sqlmodel import Session, col, delete, select, update
 
+from app.core.principals import principal_cache
+from app.core.revocation import token_revocations
 from app.core.security import get_password_hash, verify_password
-from app.models import Item, ItemCreate, User, UserCreate, UserUpdate,Emp, EmpCreate, EmpPublic
+from app.models import EmailOutbox, Item, ItemCreate, User, UserCreate, UserUpdate,Emp, EmpCreate, EmpPublic, Dep, DepCreate
 
 
 def create_user(*, session: Session, user_create: UserCreate) -> User:
@@ -17,20 +19,151 @@ def create_user(*, session: Session, user_create: UserCreate) -> User:
     return db_obj
 
 
-def update_user(*, session: Session, db_user: User, user_in: UserUpdate) -> Any:
+def enqueue_email(
+    *, session: Session, email_to: str, template: str, context: dict[str, Any]
+) -> EmailOutbox:
+    """
+    Add an email to the outbox, sent once the caller commits.
+    """
+    email = EmailOutbox(email_to=email_to, template=template, context=context)
+    session.add(email)
+    return email
+
+
+def revokes_tokens(db_user: User, user_data: dict[str, Any]) -> bool:
+    """
+    Whether an update must invalidate the user's tokens: a new password, or a
+    change to a flag signed into the access token.
+    """
+    return "password" in user_data or any(
+        field in user_data and user_data[field] != getattr(db_user, field)
+        for field in ("is_active", "is_superuser")
+    )
+
+
+def bump_token_version(user_id: uuid.UUID) -> Any:
+    """
+    Statement incrementing a user's token version in the database, returning
+    the new version.
+
+    The version of a loaded user may be stale, it can come from the principal
+    cache or another worker may have bumped it since, so the increment is
+    never computed from the ORM object.
+    """
+    return (
+        update(User)
+        .where(col(User.id) == user_id)
+        .values(token_version=col(User.token_version) + 1)
+        .returning(col(User.token_version))
+        .execution_options(synchronize_session=False)
+    )
+
+
+def delete_user_statement(user_id: uuid.UUID) -> Any:
+    """
+    Statement deleting a user, returning the lowest token version still to be
+    accepted for them, one above the version they had.
+    """
+    return (
+        delete(User)
+        .where(col(User.id) == user_id)
+        .returning(col(User.token_version) + 1)
+    )
+
+
+def apply_user_update(
+    db_user: User, user_in: UserUpdate, *, hashed_password: str | None = None
+) -> bool:
+    """
+    Set the fields of `user_in` on `db_user` and return whether the user's
+    tokens must be revoked.
+
+    No IO: the caller hashes a new password, off the event loop in the async
+    routes, then runs `bump_token_version` if this returned True, commits and
+    calls `invalidate_principal`.
+    """
     user_data = user_in.model_dump(exclude_unset=True)
-    extra_data = {}
-    if "password" in user_data:
-        password = user_data["password"]
-        hashed_password = get_password_hash(password)
-        extra_data["hashed_password"] = hashed_password
+    revoke = revokes_tokens(db_user, user_data)
+    extra_data = {} if hashed_password is None else {"hashed_password": hashed_password}
     db_user.sqlmodel_update(user_data, update=extra_data)
+    return revoke
+
+
+def invalidate_principal(user_id: uuid.UUID, token_version: int | None = None) -> None:
+    """
+    After a user was changed and committed, drop their cached principal and,
+    given a token version, reject their access tokens older than it.
+    """
+    principal_cache.invalidate(user_id)
+    if token_version is not None:
+        token_revocations.revoke(user_id, token_version)
+
+
+def update_user(*, session: Session, db_user: User, user_in: UserUpdate) -> Any:
+    hashed_password = None
+    if user_in.password is not None:
+        hashed_password = get_password_hash(user_in.password)
+    revoke = apply_user_update(db_user, user_in, hashed_password=hashed_password)
     session.add(db_user)
+    token_version = None
+    if revoke:
+        token_version = session.exec(bump_token_version(db_user.id)).scalar_one()
     session.commit()
+    invalidate_principal(db_user.id, token_version)
     session.refresh(db_user)
     return db_user
 
 
+def delete_user(*, session: Session, db_user: User) -> None:
+    """
+    Delete a user with a single statement, the foreign keys cascade to their
+    items, employees and departments without loading them.
+    """
+    token_version = session.exec(delete_user_statement(db_user.id)).scalar_one()
+    session.commit()
+    invalidate_principal(db_user.id, token_version)
+
+
+def deactivate_user(*, session: Session, db_user: User) -> None:
+    """
+    Lock a user out before their rows are purged: new logins are refused and
+    the tokens already issued stop working.
+    """
+    db_user.is_active = False
+    session.add(db_user)
+    token_version = session.exec(bump_token_version(db_user.id)).scalar_one()
+    session.commit()
+    invalidate_principal(db_user.id, token_version)
+
+
+def purge_user(*, session: Session, user_id: uuid.UUID, batch_size: int) -> None:
+    """
+    Delete a user and the rows they own in transactions of at most
+    `batch_size` rows, so a very large account neither holds its locks for
+    long nor builds one huge transaction.
+    """
+    owned: list[tuple[Any, Any, Any]] = [
+        # Employees before departments, whose cascade would take them all at once
+        (Emp, Emp.empcode, Emp.emp_id),
+        (Dep, Dep.dep_id, Dep.depuserid),
+        (Item, Item.id, Item.owner_id),
+    ]
+    for model, id, owner_id in owned:
+        batch = select(col(id)).where(col(owner_id) == user_id).limit(batch_size)
+        statement = (
+            delete(model)
+            .where(col(id).in_(batch.scalar_subquery()))
+            .execution_options(synchronize_session=False)
+        )
+        while True:
+            deleted = session.exec(statement).rowcount
+            session.commit()
+            if deleted < batch_size:
+                break
+    session.exec(delete(User).where(col(User.id) == user_id))
+    session.commit()
+
+
 def get_user_by_email(*, session: Session, email: str) -> User | None:
     statement = select(User).where(User.email == email)
     session_user = session.exec(statement).first()
@@ -56,6 +189,7 @@ def authenticate(*, session: Session, email: str, password: str) -> User | None:
         db_user.hashed_password = updated_password_hash
         session.add(db_user)
         session.commit()
+        principal_cache.invalidate(db_user.id)
         session.refresh(db_user)
     return db_user
 
@@ -67,8 +201,23 @@ def create_item(*, session: Session, item_in: ItemCreate, owner_id: uuid.UUID) -
     session.refresh(db_item)
     return db_item
 
+def create_dep(*, session: Session, dep_in: DepCreate, depuserid: uuid.UUID) -> Dep:
+    db_dep = Dep.model_validate(dep_in, update={"depuserid": depuserid})
+    session.add(db_dep)
+    session.commit()
+    session.refresh(db_dep)
+    return db_dep
+
 def create_emp(*, session: Session, emp_in: EmpCreate, emp_id: uuid.UUID) -> Emp:
-    db_emp = Emp.model_validate(emp_in, update={"emp_id": emp_id})
+    # The department name is denormalized onto the employee for search
+    department = session.get(Dep, emp_in.depemp_id) if emp_in.depemp_id else None
+    db_emp = Emp.model_validate(
+        emp_in,
+        update={
+            "emp_id": emp_id,
+            "dep_name": department.dep_name if department else None,
+        },
+    )
     session.add(db_emp)
     session.commit()
     session.refresh(db_emp)
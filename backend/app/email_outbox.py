@@ -0,0 +1,159 @@
+import argparse
+import logging
+import smtplib
+import threading
+import time
+from collections.abc import Sequence
+from datetime import timedelta
+
+from sqlmodel import Session, col, select
+
+from app.core import metrics
+from app.core.config import settings
+from app.core.db import engine
+from app.core.mailer import (
+    build_email,
+    connect_smtp,
+    disconnect_smtp,
+    is_permanent_failure,
+)
+from app.models import EmailOutbox, get_datetime_utc
+from app.utils import EMAIL_GENERATORS
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def claim_batch(session: Session, batch_size: int) -> Sequence[EmailOutbox]:
+    """
+    Lock up to `batch_size` pending emails that are due, oldest first.
+
+    Rows locked by another dispatcher are skipped, so dispatchers running side
+    by side each get their own batch. The locks are held until the caller
+    commits.
+    """
+    statement = (
+        select(EmailOutbox)
+        .where(EmailOutbox.status == "pending")
+        .where(col(EmailOutbox.available_at) <= get_datetime_utc())
+        .order_by(col(EmailOutbox.available_at))
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    return session.exec(statement).all()
+
+
+def _failed(email: EmailOutbox, exc: Exception, *, permanent: bool = False) -> None:
+    email.attempts += 1
+    email.last_error = repr(exc)[:1000]
+    if (
+        permanent
+        or is_permanent_failure(exc)
+        or email.attempts >= settings.EMAIL_SEND_MAX_ATTEMPTS
+    ):
+        email.status = "failed"
+        # It will never be sent, reset tokens in the context must not linger
+        email.context = {}
+        metrics.EMAILS_FAILED_TOTAL.inc()
+        logger.error("Gave up sending email %s: %r", email.id, exc)
+        return
+    delay = min(
+        settings.EMAIL_RETRY_BACKOFF_SECONDS * 2 ** (email.attempts - 1),
+        settings.EMAIL_RETRY_BACKOFF_MAX_SECONDS,
+    )
+    email.available_at = get_datetime_utc() + timedelta(seconds=delay)
+    metrics.EMAIL_RETRIES_TOTAL.inc()
+    logger.warning("Sending email %s failed, retrying in %ss: %r", email.id, delay, exc)
+
+
+def _sent(email: EmailOutbox) -> None:
+    email.attempts += 1
+    email.status = "sent"
+    email.sent_at = get_datetime_utc()
+    email.context = {}
+    email.last_error = None
+    metrics.EMAILS_SENT_TOTAL.inc()
+
+
+def dispatch_batch(session: Session, batch_size: int) -> int:
+    """
+    Claim a batch, send it on one SMTP connection and record the outcome of
+    each email, returns the number of emails claimed.
+    """
+    batch = claim_batch(session, batch_size)
+    smtp: smtplib.SMTP | None = None
+    try:
+        for i, email in enumerate(batch):
+            try:
+                email_data = EMAIL_GENERATORS[email.template](**email.context)
+            except Exception as exc:
+                _failed(email, exc, permanent=True)
+                continue
+            queued = build_email(
+                email.email_to,
+                subject=email_data.subject,
+                html_content=email_data.html_content,
+            )
+            try:
+                if smtp is None:
+                    smtp = connect_smtp()
+                smtp.sendmail(queued.mail_from, [queued.email_to], queued.message)
+            except (smtplib.SMTPException, OSError) as exc:
+                if isinstance(exc, smtplib.SMTPResponseException):
+                    _failed(email, exc)
+                    continue
+                # The connection is unusable, the rest of the batch waits
+                # for the next attempt
+                for unsent in batch[i:]:
+                    _failed(unsent, exc)
+                if smtp is not None:
+                    smtp.close()
+                    smtp = None
+                break
+            _sent(email)
+    finally:
+        if smtp is not None:
+            disconnect_smtp(smtp)
+    session.commit()
+    return len(batch)
+
+
+def dispatch(session: Session, batch_size: int, *, poll_seconds: float) -> None:
+    while True:
+        if dispatch_batch(session, batch_size) < batch_size:
+            time.sleep(poll_seconds)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Send the emails of the outbox table, run as many as needed"
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=settings.EMAIL_OUTBOX_BATCH_SIZE
+    )
+    parser.add_argument(
+        "--poll-seconds", type=float, default=settings.EMAIL_OUTBOX_POLL_SECONDS
+    )
+    parser.add_argument(
+        "--once", action="store_true", help="Send the due emails and exit"
+    )
+    args = parser.parse_args()
+
+    if not settings.emails_enabled:
+        # Nothing is queued without SMTP, idle rather than exit so a service
+        # restarted always does not crash loop
+        logger.warning("Set SMTP_HOST and EMAILS_FROM_EMAIL to send emails")
+        if not args.once:
+            threading.Event().wait()
+        return
+    logger.info("Dispatching the email outbox")
+    with Session(engine) as session:
+        if args.once:
+            while dispatch_batch(session, args.batch_size) == args.batch_size:
+                pass
+        else:
+            dispatch(session, args.batch_size, poll_seconds=args.poll_seconds)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,21 @@
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
 import sentry_sdk
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import JSONResponse
 from fastapi.routing import APIRoute
+from starlette.concurrency import run_in_threadpool
 from starlette.middleware.cors import CORSMiddleware
 
 from app.api.main import api_router
+from app.core import metrics
 from app.core.config import settings
+from app.core.mailer import mailer
+from app.core.query_timing import QueryTimingMiddleware
+from app.core.revocation import token_revocations, warn_if_not_shared
+from app.core.security import HashingPoolSaturated
+from app.utils import compile_email_templates
 
 
 def custom_generate_unique_id(route: APIRoute) -> str:
@@ -14,12 +25,28 @@ def custom_generate_unique_id(route: APIRoute) -> str:
 if settings.SENTRY_DSN and settings.ENVIRONMENT != "local":
     sentry_sdk.init(dsn=str(settings.SENTRY_DSN), enable_tracing=True)
 
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    compile_email_templates()
+    warn_if_not_shared(token_revocations)
+    yield
+    await run_in_threadpool(mailer.close, 30)
+    metrics.mark_process_dead()
+
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
     generate_unique_id_function=custom_generate_unique_id,
+    lifespan=lifespan,
 )
 
+app.add_middleware(metrics.MetricsMiddleware, route_name=custom_generate_unique_id)
+
+if settings.QUERY_STATS_ENABLED:
+    app.add_middleware(QueryTimingMiddleware)
+
 # Set all CORS enabled origins
 if settings.all_cors_origins:
     app.add_middleware(
@@ -28,6 +55,26 @@ if settings.all_cors_origins:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["ETag"],
     )
 
+
+@app.exception_handler(HashingPoolSaturated)
+async def hashing_pool_saturated_handler(
+    request: Request,  # noqa: ARG001
+    exc: HashingPoolSaturated,
+) -> JSONResponse:
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Server is busy, please retry later"},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+@app.get("/metrics", tags=["metrics"], include_in_schema=False)
+def read_metrics() -> Response:
+    content, media_type = metrics.latest()
+    return Response(content=content, media_type=media_type)
+
+
 app.include_router(api_router, prefix=settings.API_V1_STR)
@@ -1,9 +1,10 @@
 import uuid
 from datetime import datetime, timezone
-from typing import Annotated, Optional
+from typing import Annotated, Any, Optional
 
 from pydantic import EmailStr, StringConstraints
-from sqlalchemy import DateTime
+from sqlalchemy import Column, Computed, DateTime, Index, text
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
 from sqlmodel import Field, Relationship, SQLModel
 
 Mobile10 = Annotated[
@@ -15,6 +16,21 @@ def get_datetime_utc() -> datetime:
     return datetime.now(timezone.utc)
 
 
+# Documents behind the search endpoints, generated and stored by Postgres. The
+# "simple" configuration does not stem, so a prefix of any word matches, and
+# the e-mail is also indexed split at the "@" to find it by local part or host.
+ITEM_SEARCH_DOCUMENT = (
+    "setweight(to_tsvector('simple', coalesce(title, '')), 'A')"
+    " || setweight(to_tsvector('simple', coalesce(description, '')), 'B')"
+)
+EMP_SEARCH_DOCUMENT = (
+    "setweight(to_tsvector('simple', coalesce(name, '')), 'A')"
+    " || setweight(to_tsvector('simple',"
+    " workemail || ' ' || replace(workemail, '@', ' ')), 'B')"
+    " || setweight(to_tsvector('simple', coalesce(dep_name, '')), 'C')"
+)
+
+
 # Shared properties
 class UserBase(SQLModel):
     email: EmailStr = Field(unique=True, index=True, max_length=255)
@@ -52,15 +68,36 @@ class UpdatePassword(SQLModel):
 
 # Database model, database table inferred from class name
 class User(UserBase, table=True):
+    __table_args__ = (
+        Index("ix_user_created_at_id", "created_at", "id"),
+        Index("ix_user_updated_at", "updated_at"),
+    )
+
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     hashed_password: str
-    created_at: datetime | None = Field(
+    # Tokens carrying an older version are rejected
+    token_version: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
+    created_at: datetime = Field(
         default_factory=get_datetime_utc,
         sa_type=DateTime(timezone=True),  # type: ignore
+        sa_column_kwargs={"server_default": text("now()")},
+    )
+    updated_at: datetime | None = Field(
+        default_factory=get_datetime_utc,
+        sa_type=DateTime(timezone=True),
+        sa_column_kwargs={"onupdate": get_datetime_utc},
+    )
+    # Owned rows are removed by the ON DELETE CASCADE foreign keys, deleting a
+    # user must not load these collections first
+    items: list["Item"] = Relationship(
+        back_populates="owner", cascade_delete=True, passive_deletes=True
+    )
+    emps: list["Emp"] = Relationship(
+        back_populates="owner", cascade_delete=True, passive_deletes=True
+    )
+    deps: list["Dep"] = Relationship(
+        back_populates="owner", cascade_delete=True, passive_deletes=True
     )
-    items: list["Item"] = Relationship(back_populates="owner", cascade_delete=True)
-    emps: list["Emp"] = Relationship(back_populates="owner", cascade_delete=True)
-    deps: list["Dep"] = Relationship(back_populates="owner", cascade_delete=True)
 
 # Properties to return via API, id is always required
 class UserPublic(UserBase):
@@ -70,7 +107,9 @@ class UserPublic(UserBase):
 
 class UsersPublic(SQLModel):
     data: list[UserPublic]
-    count: int
+    count: int | None
+    count_strategy: str = "exact"
+    next_cursor: str | None = None
 
 class DepBase(SQLModel):
     dep_name: str = Field(default=None, max_length=200)
@@ -86,14 +125,26 @@ class DepUpdate(DepBase):
     dep_code: str = Field(default=None, max_length=50)
 
 class Dep(DepBase, table=True):
+    __table_args__ = (
+        Index("ix_dep_depuserid_created_at_dep_id", "depuserid", "created_at", "dep_id"),
+        Index("ix_dep_dep_code", "dep_code"),
+        Index("ix_dep_depuserid_updated_at", "depuserid", "updated_at"),
+    )
+
     dep_id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
-    created_at: datetime | None = Field(
+    created_at: datetime = Field(
         default_factory=get_datetime_utc,
         sa_type=DateTime(timezone=True),  # type: ignore
+        sa_column_kwargs={"server_default": text("now()")},
+    )
+    updated_at: datetime | None = Field(
+        default_factory=get_datetime_utc,
+        sa_type=DateTime(timezone=True),
+        sa_column_kwargs={"onupdate": get_datetime_utc},
     )
     depuserid: uuid.UUID = Field(foreign_key="user.id", nullable=False, ondelete="CASCADE")
     owner: User | None = Relationship(back_populates="deps")
-    emps: list["Emp"] = Relationship(back_populates="ownerdep", cascade_delete=True)
+    emps: list["Emp"] = Relationship(back_populates="ownerdep", cascade_delete=True, passive_deletes=True)
 
 class DepPublic(DepBase):
     dep_id: uuid.UUID
@@ -102,7 +153,14 @@ class DepPublic(DepBase):
 
 class DepsPublic(SQLModel):
     data: list[DepPublic]
-    count: int
+    count: int | None
+    count_strategy: str = "exact"
+    next_cursor: str | None = None
+
+
+class DepsBatch(SQLModel):
+    data: list[DepPublic]
+    errors: list["BatchError"]
 
 class Message(SQLModel):
     message: str
@@ -123,27 +181,66 @@ class EmpUpdate(EmpBase):
     depemp_id: uuid.UUID | None = Field(default=None, foreign_key="dep.dep_id")
 
 class Emp(EmpBase, table=True):
+    __table_args__ = (
+        Index("ix_emp_emp_id_created_at_empcode", "emp_id", "created_at", "empcode"),
+        Index("ix_emp_depemp_id", "depemp_id"),
+        Index("ix_emp_emp_id_updated_at", "emp_id", "updated_at"),
+        Index("ix_emp_search_vector", "search_vector", postgresql_using="gin"),
+    )
+    # Only used in WHERE and ORDER BY, never loaded with the row
+    __mapper_args__ = {"exclude_properties": ["search_vector"]}
+
     empcode: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
-    created_at: datetime | None = Field(
+    created_at: datetime = Field(
         default_factory=get_datetime_utc,
         sa_type=DateTime(timezone=True),  # type: ignore
+        sa_column_kwargs={"server_default": text("now()")},
+    )
+    updated_at: datetime | None = Field(
+        default_factory=get_datetime_utc,
+        sa_type=DateTime(timezone=True),
+        sa_column_kwargs={"onupdate": get_datetime_utc},
     )
     emp_id: uuid.UUID = Field(foreign_key="user.id", nullable=False, ondelete="CASCADE")
     depemp_id: uuid.UUID = Field(default=None, foreign_key="dep.dep_id", nullable=True, ondelete="CASCADE")
     dep_name: str | None = None
+    search_vector: str | None = Field(
+        default=None,
+        sa_column=Column(TSVECTOR, Computed(EMP_SEARCH_DOCUMENT, persisted=True)),
+        exclude=True,
+    )
     owner: User | None = Relationship(back_populates="emps")
     ownerdep: Dep | None = Relationship(back_populates="emps")
 
 class EmpPublic(EmpBase):
     empcode: uuid.UUID
     emp_id: uuid.UUID
+    depemp_id: uuid.UUID | None = None
+    dep_name: str | None = None
     ownerdep: Optional[DepPublic] = None
     created_at: datetime | None = None
 
 
 class EmpsPublic(SQLModel):
     data: list[EmpPublic]
-    count: int
+    count: int | None
+    count_strategy: str = "exact"
+    next_cursor: str | None = None
+
+
+class EmpBulkError(SQLModel):
+    row: int
+    detail: str
+
+
+class EmpBulkResult(SQLModel):
+    created: int
+    errors: list[EmpBulkError]
+
+
+class EmpsBatch(SQLModel):
+    data: list[EmpPublic]
+    errors: list["BatchError"]
 
 class Message(SQLModel):
     message: str
@@ -166,14 +263,33 @@ class ItemUpdate(ItemBase):
 
 # Database model, database table inferred from class name
 class Item(ItemBase, table=True):
+    __table_args__ = (
+        Index("ix_item_owner_id_created_at_id", "owner_id", "created_at", "id"),
+        Index("ix_item_owner_id_updated_at", "owner_id", "updated_at"),
+        Index("ix_item_search_vector", "search_vector", postgresql_using="gin"),
+    )
+    # Only used in WHERE and ORDER BY, never loaded with the row
+    __mapper_args__ = {"exclude_properties": ["search_vector"]}
+
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
-    created_at: datetime | None = Field(
+    created_at: datetime = Field(
         default_factory=get_datetime_utc,
         sa_type=DateTime(timezone=True),  # type: ignore
+        sa_column_kwargs={"server_default": text("now()")},
+    )
+    updated_at: datetime | None = Field(
+        default_factory=get_datetime_utc,
+        sa_type=DateTime(timezone=True),
+        sa_column_kwargs={"onupdate": get_datetime_utc},
     )
     owner_id: uuid.UUID = Field(
         foreign_key="user.id", nullable=False, ondelete="CASCADE"
     )
+    search_vector: str | None = Field(
+        default=None,
+        sa_column=Column(TSVECTOR, Computed(ITEM_SEARCH_DOCUMENT, persisted=True)),
+        exclude=True,
+    )
     owner: User | None = Relationship(back_populates="items")
 
 
@@ -186,7 +302,9 @@ class ItemPublic(ItemBase):
 
 class ItemsPublic(SQLModel):
     data: list[ItemPublic]
-    count: int
+    count: int | None
+    count_strategy: str = "exact"
+    next_cursor: str | None = None
 
 
 # Generic message
@@ -194,15 +312,117 @@ class Message(SQLModel):
     message: str
 
 
+# An email for the outbox dispatcher to send, inserted in the transaction of
+# the change it is about. `template` names an email generator of app.utils and
+# `context` holds its arguments, emptied once sent as it may hold a password
+# or a reset token.
+class EmailOutbox(SQLModel, table=True):
+    __table_args__ = (
+        Index(
+            "ix_emailoutbox_pending_available_at",
+            "available_at",
+            postgresql_where=text("status = 'pending'"),
+        ),
+    )
+
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    email_to: str = Field(max_length=255)
+    template: str = Field(max_length=50)
+    context: dict[str, Any] = Field(default_factory=dict, sa_type=JSONB)
+    # pending, sent or failed
+    status: str = Field(default="pending", max_length=20)
+    attempts: int = 0
+    last_error: str | None = Field(default=None, max_length=1000)
+    created_at: datetime = Field(
+        default_factory=get_datetime_utc,
+        sa_type=DateTime(timezone=True),  # type: ignore
+    )
+    # Not sent before then, pushed back after each temporary failure
+    available_at: datetime = Field(
+        default_factory=get_datetime_utc, sa_type=DateTime(timezone=True)
+    )
+    sent_at: datetime | None = Field(default=None, sa_type=DateTime(timezone=True))
+
+
+# Body of the batch-get and batch-delete endpoints
+class BatchIds(SQLModel):
+    ids: list[uuid.UUID] = Field(min_length=1)
+
+
+# Why one of the requested IDs is missing from a batch response, with the
+# status and detail a single-ID request would have got
+class BatchError(SQLModel):
+    id: uuid.UUID
+    status: int
+    detail: str
+
+
+class BatchDeleteResult(SQLModel):
+    deleted: list[uuid.UUID]
+    errors: list[BatchError]
+
+
+class ItemsBatch(SQLModel):
+    data: list[ItemPublic]
+    errors: list[BatchError]
+
+
+class PrincipalCacheStats(SQLModel):
+    hits: int
+    misses: int
+    size: int | None = None
+
+
+class HashingPoolStats(SQLModel):
+    max_workers: int
+    max_queue: int
+    in_flight: int
+    completed: int
+    rejected: int
+    wait_seconds_total: float
+    wait_seconds_max: float
+    hash_seconds_total: float
+    hash_seconds_max: float
+
+
+class PoolStats(SQLModel):
+    pool_class: str
+    size: int | None = None
+    max_overflow: int | None = None
+    checked_in: int | None = None
+    checked_out: int | None = None
+    overflow: int | None = None
+    wait_count: int | None = None
+    wait_seconds_total: float | None = None
+    wait_seconds_max: float | None = None
+
+
+class SlowQuery(SQLModel):
+    route: str
+    statement: str
+    max_ms: float
+    total_ms: float
+    count: int
+
+
 # JSON payload containing access token
 class Token(SQLModel):
     access_token: str
     token_type: str = "bearer"
+    refresh_token: str | None = None
+
+
+class RefreshTokenRequest(SQLModel):
+    refresh_token: str
 
 
 # Contents of JWT token
 class TokenPayload(SQLModel):
     sub: str | None = None
+    typ: str | None = None
+    su: bool = False
+    act: bool = True
+    ver: int = 0
 
 
 class NewPassword(SQLModel):
@@ -1,16 +1,17 @@
 import logging
+from collections.abc import Callable
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import Any
 
-import emails  # type: ignore
 import jwt
-from jinja2 import Template
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
 from jwt.exceptions import InvalidTokenError
 
 from app.core import security
 from app.core.config import settings
+from app.core.mailer import mailer
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -22,11 +23,30 @@ class EmailData:
     subject: str
 
 
+EMAIL_TEMPLATES_DIR = Path(__file__).parent / "email-templates" / "build"
+
+# Compiled templates are kept by the environment, so each one is read and
+# compiled once per process. Locally they are recompiled when the file changes.
+email_templates = Environment(
+    loader=FileSystemLoader(EMAIL_TEMPLATES_DIR),
+    auto_reload=settings.ENVIRONMENT == "local",
+    bytecode_cache=FileSystemBytecodeCache(settings.EMAIL_TEMPLATES_BYTECODE_DIR)
+    if settings.EMAIL_TEMPLATES_BYTECODE_DIR
+    else None,
+)
+
+
+def compile_email_templates() -> None:
+    """
+    Compile every email template up front, so the first emails sent after
+    startup do not pay for it.
+    """
+    for name in email_templates.list_templates():
+        email_templates.get_template(name)
+
+
 def render_email_template(*, template_name: str, context: dict[str, Any]) -> str:
-    template_str = (
-        Path(__file__).parent / "email-templates" / "build" / template_name
-    ).read_text()
-    html_content = Template(template_str).render(context)
+    html_content = email_templates.get_template(template_name).render(context)
     return html_content
 
 
@@ -36,23 +56,12 @@ def send_email(
     subject: str = "",
     html_content: str = "",
 ) -> None:
+    """
+    Queue an email for the background delivery worker, without waiting for
+    the SMTP server.
+    """
     assert settings.emails_enabled, "no provided configuration for email variables"
-    message = emails.Message(
-        subject=subject,
-        html=html_content,
-        mail_from=(settings.EMAILS_FROM_NAME, settings.EMAILS_FROM_EMAIL),
-    )
-    smtp_options = {"host": settings.SMTP_HOST, "port": settings.SMTP_PORT}
-    if settings.SMTP_TLS:
-        smtp_options["tls"] = True
-    elif settings.SMTP_SSL:
-        smtp_options["ssl"] = True
-    if settings.SMTP_USER:
-        smtp_options["user"] = settings.SMTP_USER
-    if settings.SMTP_PASSWORD:
-        smtp_options["password"] = settings.SMTP_PASSWORD
-    response = message.send(to=email_to, smtp=smtp_options)
-    logger.info(f"send email result: {response}")
+    mailer.send(email_to, subject=subject, html_content=html_content)
 
 
 def generate_test_email(email_to: str) -> EmailData:
@@ -82,9 +91,7 @@ def generate_reset_password_email(email_to: str, email: str, token: str) -> Emai
     return EmailData(html_content=html_content, subject=subject)
 
 
-def generate_new_account_email(
-    email_to: str, username: str, password: str
-) -> EmailData:
+def generate_new_account_email(email_to: str, username: str) -> EmailData:
     project_name = settings.PROJECT_NAME
     subject = f"{project_name} - New account for user {username}"
     html_content = render_email_template(
@@ -92,7 +99,6 @@ def generate_new_account_email(
         context={
             "project_name": settings.PROJECT_NAME,
             "username": username,
-            "password": password,
             "email": email_to,
             "link": settings.FRONTEND_HOST,
         },
@@ -100,6 +106,15 @@ def generate_new_account_email(
     return EmailData(html_content=html_content, subject=subject)
 
 
+# Emails the outbox dispatcher can send, EmailOutbox.context holds the
+# keyword arguments of the generator
+EMAIL_GENERATORS: dict[str, Callable[..., EmailData]] = {
+    "test_email": generate_test_email,
+    "reset_password": generate_reset_password_email,
+    "new_account": generate_new_account_email,
+}
+
+
 def generate_password_reset_token(email: str) -> str:
     delta = timedelta(hours=settings.EMAIL_RESET_TOKEN_EXPIRE_HOURS)
     now = datetime.now(timezone.utc)
@@ -0,0 +1,87 @@
+import argparse
+import json
+import logging
+import timeit
+from collections.abc import Callable
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+from unittest.mock import patch
+
+from jinja2 import Template
+
+from app import utils
+from app.utils import (
+    EMAIL_TEMPLATES_DIR,
+    EmailData,
+    generate_new_account_email,
+    generate_reset_password_email,
+)
+from benchmarks.run import git_commit
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def uncached_render(*, template_name: str, context: dict[str, Any]) -> str:
+    """
+    How templates were rendered before the shared environment: read from
+    disk and compiled again on every call.
+    """
+    template_str = (EMAIL_TEMPLATES_DIR / template_name).read_text()
+    return Template(template_str).render(context)
+
+
+def measure(function: Callable[[], Any], *, number: int, repeat: int) -> float:
+    return min(timeit.repeat(function, number=number, repeat=repeat)) / number
+
+
+def run(args: argparse.Namespace) -> dict[str, Any]:
+    generators: dict[str, Callable[[], EmailData]] = {
+        "reset_password": lambda: generate_reset_password_email(
+            email_to="user@example.com", email="user@example.com", token="token"
+        ),
+        "new_account": lambda: generate_new_account_email(
+            email_to="user@example.com", username="user"
+        ),
+    }
+    utils.compile_email_templates()
+    results = {}
+    for name, generate in generators.items():
+        with patch.object(utils, "render_email_template", uncached_render):
+            expected = generate()
+            before = measure(generate, number=args.number, repeat=args.repeat)
+        assert generate() == expected
+        after = measure(generate, number=args.number, repeat=args.repeat)
+        results[name] = {
+            "uncached_ms": round(before * 1000, 4),
+            "cached_ms": round(after * 1000, 4),
+            "speedup": round(before / after, 2),
+        }
+        logger.info("%s: %s", name, results[name])
+    return {
+        "commit": git_commit(),
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "config": {key: value for key, value in vars(args).items() if key != "output"},
+        "emails": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Compare email rendering with and without the template cache"
+    )
+    parser.add_argument("--number", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--output", type=Path, default=Path("email-templates-results.json")
+    )
+    args = parser.parse_args()
+
+    results = run(args)
+    args.output.write_text(json.dumps(results, indent=2))
+    logger.info("Results written to %s", args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import statistics
+import subprocess
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+from contextlib import nullcontext
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+import httpx
+from sqlalchemy import event
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.core.db import engine
+from app.main import app
+from benchmarks.seed import SeededUser, seed
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+# One line per request would drown the results
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+Request = Callable[[httpx.AsyncClient, int], Awaitable[httpx.Response]]
+
+
+@dataclass
+class ScenarioResult:
+    requests: int
+    errors: int
+    seconds: float
+    rps: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    mean_ms: float
+    statements_per_request: float | None
+
+
+class StatementCounter:
+    """
+    Counts statements sent through the app engine, only meaningful when the
+    app runs in this process.
+    """
+
+    def __init__(self) -> None:
+        self.count = 0
+
+    def __enter__(self) -> "StatementCounter":
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        event.remove(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args: Any) -> None:
+        self.count += 1
+
+
+async def login(client: httpx.AsyncClient, user: SeededUser) -> httpx.Response:
+    return await client.post(
+        f"{settings.API_V1_STR}/login/access-token",
+        data={"username": user.email, "password": user.password},
+    )
+
+
+def scenarios(
+    users: list[SeededUser], headers: list[dict[str, str]]
+) -> dict[str, Request]:
+    def get(path: str) -> Request:
+        async def request(client: httpx.AsyncClient, i: int) -> httpx.Response:
+            return await client.get(
+                f"{settings.API_V1_STR}{path}", headers=headers[i % len(headers)]
+            )
+
+        return request
+
+    async def login_request(client: httpx.AsyncClient, i: int) -> httpx.Response:
+        return await login(client, users[i % len(users)])
+
+    return {
+        "login": login_request,
+        "items": get("/items/"),
+        "emps": get("/emps/"),
+        "deps": get("/deps/"),
+        "users_me": get("/users/me"),
+    }
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    request: Request,
+    *,
+    requests: int,
+    concurrency: int,
+    count_statements: bool,
+) -> ScenarioResult:
+    latencies: list[float] = []
+    errors = 0
+    indexes = itertools.count()
+
+    async def worker() -> None:
+        nonlocal errors
+        while (i := next(indexes)) < requests:
+            started = time.perf_counter()
+            response = await request(client, i)
+            latencies.append(time.perf_counter() - started)
+            if response.is_error:
+                errors += 1
+
+    counter = StatementCounter()
+    started = time.perf_counter()
+    with counter if count_statements else nullcontext():
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    seconds = time.perf_counter() - started
+
+    percentiles = statistics.quantiles(latencies, n=100, method="inclusive")
+    return ScenarioResult(
+        requests=requests,
+        errors=errors,
+        seconds=round(seconds, 3),
+        rps=round(requests / seconds, 1),
+        p50_ms=round(percentiles[49] * 1000, 2),
+        p95_ms=round(percentiles[94] * 1000, 2),
+        p99_ms=round(percentiles[98] * 1000, 2),
+        mean_ms=round(statistics.fmean(latencies) * 1000, 2),
+        statements_per_request=(
+            round(counter.count / requests, 2) if count_statements else None
+        ),
+    )
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, check=True, text=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    run_id = uuid.uuid4().hex[:8]
+    with Session(engine) as session:
+        users = seed(
+            session,
+            users=args.users,
+            deps_per_user=args.deps_per_user,
+            emps_per_user=args.emps_per_user,
+            items_per_user=args.items_per_user,
+            run_id=run_id,
+        )
+
+    if args.base_url:
+        transport: httpx.AsyncBaseTransport = httpx.AsyncHTTPTransport()
+        base_url = args.base_url
+    else:
+        transport = httpx.ASGITransport(app=app)
+        base_url = "http://benchmark"
+        # Every request comes from the one client address, the login limits
+        # would reject nearly all of them
+        settings.RATE_LIMIT_ENABLED = args.rate_limits
+    async with httpx.AsyncClient(
+        transport=transport, base_url=base_url, timeout=args.timeout
+    ) as client:
+        headers = []
+        for user in users:
+            response = await login(client, user)
+            response.raise_for_status()
+            token = response.json()["access_token"]
+            headers.append({"Authorization": f"Bearer {token}"})
+
+        results = {}
+        for name, request in scenarios(users, headers).items():
+            if args.scenario and name not in args.scenario:
+                continue
+            logger.info("Running %s", name)
+            results[name] = await run_scenario(
+                client,
+                request,
+                requests=args.requests,
+                concurrency=args.concurrency,
+                count_statements=not args.base_url,
+            )
+            logger.info("%s: %s", name, results[name])
+
+    return {
+        "commit": git_commit(),
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "run_id": run_id,
+        "config": {key: value for key, value in vars(args).items() if key != "output"},
+        "scenarios": {name: asdict(result) for name, result in results.items()},
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load test the backend API")
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--deps-per-user", type=int, default=3)
+    parser.add_argument("--emps-per-user", type=int, default=50)
+    parser.add_argument("--items-per-user", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument(
+        "--scenario",
+        action="append",
+        help="Only run this scenario, can be repeated",
+    )
+    parser.add_argument(
+        "--base-url",
+        help="Benchmark a running server instead of the app in this process",
+    )
+    parser.add_argument(
+        "--rate-limits",
+        action="store_true",
+        help="Keep the login rate limits on, a server given by --base-url uses its own",
+    )
+    parser.add_argument("--output", type=Path, default=Path("benchmark-results.json"))
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    args.output.write_text(json.dumps(results, indent=2))
+    logger.info("Results written to %s", args.output)
+
+
+if __name__ == "__main__":
+    main()
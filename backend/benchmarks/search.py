@@ -0,0 +1,184 @@
+import argparse
+import hashlib
+import json
+import logging
+import statistics
+import time
+import uuid
+from collections.abc import Callable
+from datetime import datetime, timezone
+from functools import partial
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import Executable, or_, text
+from sqlmodel import Session, col, select
+
+from app import crud
+from app.api.search import search_statement
+from app.core.db import engine
+from app.models import Emp, Item, UserCreate
+from benchmarks.run import git_commit
+from benchmarks.seed import PASSWORD
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+WORDS = [
+    "alpha", "bravo", "charlie", "delta", "echo",
+    "foxtrot", "golf", "hotel", "india", "juliet",
+]  # fmt: skip
+
+# Rows are generated by Postgres, going through the crud layer would take
+# hours for a million of them. Every row gets a common word out of WORDS and a
+# rare one out of an md5, so queries of both kinds can be measured.
+SEED_ITEMS = text(
+    """
+    INSERT INTO item (id, title, description, owner_id, created_at, updated_at)
+    WITH seed AS (SELECT CAST(:words AS text[]) AS words,
+                         CAST(:owners AS uuid[]) AS owners)
+    SELECT gen_random_uuid(),
+           'Item ' || words[1 + g % 10] || ' ' || substr(md5(g::text), 1, 8),
+           'Seeded for the search benchmark, row ' || g,
+           owners[1 + g / 100 % cardinality(owners)],
+           now(), now()
+    FROM seed, generate_series(1, :rows) AS g
+    """
+)
+SEED_EMPS = text(
+    """
+    INSERT INTO emp (empcode, workemail, name, mobile_number, emp_id, dep_name,
+                     created_at, updated_at)
+    WITH seed AS (SELECT CAST(:words AS text[]) AS words,
+                         CAST(:owners AS uuid[]) AS owners)
+    SELECT gen_random_uuid(),
+           substr(md5(g::text), 1, 8) || '.' || g || '@' || :run_id || '.example.com',
+           initcap(words[1 + g % 10]) || ' ' || initcap(words[1 + g / 10 % 10]),
+           '0123456789',
+           owners[1 + g / 100 % cardinality(owners)],
+           'Department ' || words[1 + g % 7],
+           now(), now()
+    FROM seed, generate_series(1, :rows) AS g
+    """
+)
+
+
+def seed_rows(
+    session: Session, *, rows: int, users: int, run_id: str
+) -> list[uuid.UUID]:
+    owners = [
+        crud.create_user(
+            session=session,
+            user_create=UserCreate(
+                email=f"search-{run_id}-{u}@example.com", password=PASSWORD
+            ),
+        ).id
+        for u in range(users)
+    ]
+    params = {"words": WORDS, "owners": owners, "rows": rows, "run_id": run_id}
+    for statement in (SEED_ITEMS, SEED_EMPS):
+        session.connection().execute(statement, params)
+    session.commit()
+    for table in ("item", "emp"):
+        session.connection().exec_driver_sql(f"ANALYZE {table}")
+    session.commit()
+    logger.info("Seeded %d items and %d employees", rows, rows)
+    return owners
+
+
+def ilike_statement(q: str, owner: uuid.UUID | None, limit: int) -> Executable:
+    """
+    The same search without the index, matching substrings, for comparison.
+    """
+    statement = select(Item).where(
+        or_(col(Item.title).ilike(f"%{q}%"), col(Item.description).ilike(f"%{q}%"))
+    )
+    if owner is not None:
+        statement = statement.where(col(Item.owner_id) == owner)
+    return statement.order_by(col(Item.created_at).desc()).limit(limit)
+
+
+def measure(
+    session: Session, statement: Callable[[], Executable], *, repeat: int
+) -> dict[str, Any]:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        rows = session.exec(statement()).all()  # type: ignore[call-overload]
+        timings.append(time.perf_counter() - started)
+    return {
+        "rows": len(rows),
+        "p50_ms": round(statistics.median(timings) * 1000, 2),
+        "max_ms": round(max(timings) * 1000, 2),
+    }
+
+
+def run(args: argparse.Namespace) -> dict[str, Any]:
+    run_id = uuid.uuid4().hex[:8]
+    queries = {
+        "common word": WORDS[3],
+        "prefix": WORDS[3][:3],
+        "two words": f"item {WORDS[3]}",
+        "rare word": hashlib.md5(b"1").hexdigest()[:6],
+    }
+    searches: dict[str, Callable[[str, uuid.UUID | None], Executable]] = {
+        "items_search": lambda q, owner: search_statement(
+            Item,
+            q=q,
+            id=Item.id,
+            owner_id=Item.owner_id,
+            owner=owner,
+            limit=args.limit,
+            cursor=None,
+        ),
+        "emps_search": lambda q, owner: search_statement(
+            Emp,
+            q=q,
+            id=Emp.empcode,
+            owner_id=Emp.emp_id,
+            owner=owner,
+            limit=args.limit,
+            cursor=None,
+        ),
+        "items_ilike": lambda q, owner: ilike_statement(q, owner, args.limit),
+    }
+    results: dict[str, Any] = {}
+    with Session(engine) as session:
+        owners = seed_rows(session, rows=args.rows, users=args.users, run_id=run_id)
+        for name, q in queries.items():
+            for scope, owner in (("own", owners[0]), ("all", None)):
+                key = f"{name} ({scope})"
+                results[key] = {"q": q} | {
+                    label: measure(
+                        session, partial(search, q, owner), repeat=args.repeat
+                    )
+                    for label, search in searches.items()
+                }
+                logger.info("%s: %s", key, results[key])
+    return {
+        "commit": git_commit(),
+        "run_id": run_id,
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "config": {key: value for key, value in vars(args).items() if key != "output"},
+        "queries": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Seed items and employees in bulk and time the search queries"
+    )
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=10, help="Owners of the rows")
+    parser.add_argument("--limit", type=int, default=100, help="Rows per page")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--output", type=Path, default=Path("search-results.json"))
+    args = parser.parse_args()
+
+    results = run(args)
+    args.output.write_text(json.dumps(results, indent=2))
+    logger.info("Results written to %s", args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+import logging
+from dataclasses import dataclass
+
+from sqlmodel import Session
+
+from app import crud
+from app.models import DepCreate, EmpCreate, ItemCreate, UserCreate
+
+logger = logging.getLogger(__name__)
+
+PASSWORD = "benchmark-password"
+
+
+@dataclass
+class SeededUser:
+    email: str
+    password: str
+
+
+def seed(
+    session: Session,
+    *,
+    users: int,
+    deps_per_user: int,
+    emps_per_user: int,
+    items_per_user: int,
+    run_id: str,
+) -> list[SeededUser]:
+    """
+    Create `users` regular users, each owning the given number of departments,
+    employees and items, through the crud layer the API itself uses.
+    """
+    seeded = []
+    for u in range(users):
+        email = f"bench-{run_id}-{u}@example.com"
+        user = crud.create_user(
+            session=session, user_create=UserCreate(email=email, password=PASSWORD)
+        )
+        dep_ids = [
+            crud.create_dep(
+                session=session,
+                dep_in=DepCreate(
+                    dep_name=f"Department {d}", dep_code=f"{run_id}-{u}-{d}"
+                ),
+                depuserid=user.id,
+            ).dep_id
+            for d in range(deps_per_user)
+        ]
+        for e in range(emps_per_user):
+            crud.create_emp(
+                session=session,
+                emp_in=EmpCreate(
+                    workemail=f"emp-{run_id}-{u}-{e}@example.com",
+                    name=f"Employee {e}",
+                    mobile_number="0123456789",
+                    depemp_id=dep_ids[e % len(dep_ids)] if dep_ids else None,
+                ),
+                emp_id=user.id,
+            )
+        for i in range(items_per_user):
+            crud.create_item(
+                session=session,
+                item_in=ItemCreate(title=f"Item {i}", description="Benchmark item"),
+                owner_id=user.id,
+            )
+        seeded.append(SeededUser(email=email, password=PASSWORD))
+        logger.info("Seeded user %d/%d", u + 1, users)
+    return seeded
@@ -0,0 +1,120 @@
+import argparse
+import json
+import logging
+import timeit
+import uuid
+from collections.abc import Callable
+from datetime import datetime, timezone
+from functools import partial
+from pathlib import Path
+from typing import Any
+
+from pydantic import BaseModel
+
+from app.api.responses import FastJSONResponse
+from app.models import Dep, Emp, EmpsPublic, Item, ItemsPublic
+from benchmarks.run import git_commit
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def items_page(size: int) -> ItemsPublic:
+    owner_id = uuid.uuid4()
+    items = [
+        Item(
+            id=uuid.uuid4(),
+            title=f"Item {i}",
+            description="Benchmark item " * 5,
+            owner_id=owner_id,
+            created_at=datetime.now(timezone.utc),
+        )
+        for i in range(size)
+    ]
+    return ItemsPublic(data=items, count=size)
+
+
+def emps_page(size: int) -> EmpsPublic:
+    owner_id = uuid.uuid4()
+    dep = Dep(dep_name="Benchmark", dep_code="bench", depuserid=owner_id)
+    emps = [
+        Emp(
+            empcode=uuid.uuid4(),
+            workemail=f"emp{i}@example.com",
+            name=f"Emp {i}",
+            address="1 Benchmark Street",
+            mobile_number="0123456789",
+            emp_id=owner_id,
+            depemp_id=dep.dep_id,
+            dep_name=dep.dep_name,
+            ownerdep=dep,
+            created_at=datetime.now(timezone.utc),
+        )
+        for i in range(size)
+    ]
+    return EmpsPublic(data=emps, count=size)
+
+
+def response_model_path(page: BaseModel) -> bytes:
+    """
+    What FastAPI does with an envelope returned for a `response_model`: dump
+    it, validate the dump again and serialize the result.
+    """
+    validated = type(page).model_validate(page.model_dump(by_alias=True))
+    return validated.model_dump_json(by_alias=True).encode()
+
+
+def fast_path(page: BaseModel) -> bytes:
+    return FastJSONResponse(page).body
+
+
+def measure(function: Callable[[], Any], *, number: int, repeat: int) -> float:
+    return min(timeit.repeat(function, number=number, repeat=repeat)) / number
+
+
+def run(args: argparse.Namespace) -> dict[str, Any]:
+    results = {}
+    for name, page in (
+        ("items", items_page(args.size)),
+        ("emps", emps_page(args.size)),
+    ):
+        assert json.loads(response_model_path(page)) == json.loads(fast_path(page))
+        before = measure(
+            partial(response_model_path, page), number=args.number, repeat=args.repeat
+        )
+        after = measure(
+            partial(fast_path, page), number=args.number, repeat=args.repeat
+        )
+        results[name] = {
+            "response_model_ms": round(before * 1000, 4),
+            "fast_json_ms": round(after * 1000, 4),
+            "speedup": round(before / after, 2),
+        }
+        logger.info("%s: %s", name, results[name])
+    return {
+        "commit": git_commit(),
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "config": {key: value for key, value in vars(args).items() if key != "output"},
+        "serializers": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Compare list response serialization paths"
+    )
+    parser.add_argument("--size", type=int, default=100, help="Rows per page")
+    parser.add_argument("--number", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--output", type=Path, default=Path("serialization-results.json")
+    )
+    args = parser.parse_args()
+
+    results = run(args)
+    args.output.write_text(json.dumps(results, indent=2))
+    logger.info("Results written to %s", args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+from collections.abc import Generator
+
+import pytest
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app import crud
+from app.api.main import with_async_overrides
+from app.api.routes import (
+    Emp,
+    async_deps,
+    async_emps,
+    async_items,
+    async_users,
+    dep,
+    items,
+    users,
+)
+from app.core.config import settings
+from app.core.db import async_engine
+from app.models import UserCreate
+from tests.utils.user import user_authentication_headers
+from tests.utils.utils import random_email, random_lower_string
+
+
+@pytest.fixture(scope="module")
+def async_client() -> Generator[TestClient, None, None]:
+    router = APIRouter()
+    router.include_router(with_async_overrides(users.router, async_users.router))
+    router.include_router(with_async_overrides(Emp.router, async_emps.router))
+    router.include_router(
+        with_async_overrides(dep.router, async_deps.router), prefix="/deps"
+    )
+    router.include_router(with_async_overrides(items.router, async_items.router))
+    app = FastAPI()
+    app.include_router(router, prefix=settings.API_V1_STR)
+    with TestClient(app) as c:
+        yield c
+        # Pooled connections belong to this client's event loop
+        c.portal.call(async_engine.dispose)
+
+
+def test_with_async_overrides_keeps_route_order() -> None:
+    router = with_async_overrides(users.router, async_users.router)
+    paths = [(route.path, route.endpoint) for route in router.routes]  # type: ignore[attr-defined]
+    assert paths.index(("/users/me", async_users.read_user_me)) < paths.index(
+        ("/users/{user_id}", async_users.read_user_by_id)
+    )
+    assert ("/users/signup", users.register_user) in paths
+
+
+def test_async_items_crud(
+    async_client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    url = f"{settings.API_V1_STR}/items/"
+    r = async_client.post(
+        url, headers=normal_user_token_headers, json={"title": "Async"}
+    )
+    assert r.status_code == 200
+    item = r.json()
+    r = async_client.get(f"{url}{item['id']}", headers=normal_user_token_headers)
+    assert r.status_code == 200
+    assert r.json()["title"] == "Async"
+    r = async_client.get(
+        f"{url}{item['id']}",
+        headers={**normal_user_token_headers, "If-None-Match": r.headers["ETag"]},
+    )
+    assert r.status_code == 304
+    r = async_client.get(url, headers=normal_user_token_headers)
+    assert r.status_code == 200
+    assert item["id"] in {i["id"] for i in r.json()["data"]}
+    r = async_client.get(
+        url, headers={**normal_user_token_headers, "If-None-Match": r.headers["ETag"]}
+    )
+    assert r.status_code == 304
+    r = async_client.put(
+        f"{url}{item['id']}",
+        headers=normal_user_token_headers,
+        json={"title": "Updated"},
+    )
+    assert r.json()["title"] == "Updated"
+    r = async_client.delete(f"{url}{item['id']}", headers=normal_user_token_headers)
+    assert r.status_code == 200
+    r = async_client.get(f"{url}{item['id']}", headers=normal_user_token_headers)
+    assert r.status_code == 404
+
+
+def test_async_emps_with_department(
+    async_client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    r = async_client.post(
+        f"{settings.API_V1_STR}/deps/",
+        headers=superuser_token_headers,
+        json={"dep_name": "Async dep", "dep_code": random_lower_string()},
+    )
+    assert r.status_code == 200
+    department = r.json()
+    r = async_client.post(
+        f"{settings.API_V1_STR}/emps/",
+        headers=superuser_token_headers,
+        json={
+            "workemail": random_email(),
+            "name": "Async emp",
+            "mobile_number": "0123456789",
+            "depemp_id": department["dep_id"],
+        },
+    )
+    assert r.status_code == 200
+    assert r.json()["ownerdep"]["dep_id"] == department["dep_id"]
+    r = async_client.get(
+        f"{settings.API_V1_STR}/emps/",
+        headers=superuser_token_headers,
+        params={"limit": 100},
+    )
+    assert r.status_code == 200
+    assert any(e["ownerdep"] for e in r.json()["data"])
+
+
+def test_async_users(
+    async_client: TestClient,
+    superuser_token_headers: dict[str, str],
+    normal_user_token_headers: dict[str, str],
+) -> None:
+    r = async_client.get(
+        f"{settings.API_V1_STR}/users/me", headers=normal_user_token_headers
+    )
+    assert r.status_code == 200
+    assert r.json()["email"] == settings.EMAIL_TEST_USER
+    r = async_client.get(
+        f"{settings.API_V1_STR}/users/", headers=normal_user_token_headers
+    )
+    assert r.status_code == 403
+    r = async_client.get(
+        f"{settings.API_V1_STR}/users/", headers=superuser_token_headers
+    )
+    assert r.status_code == 200
+    assert r.json()["count"] >= 2
+
+
+def test_async_update_and_delete_user_revoke_tokens(
+    async_client: TestClient,
+    client: TestClient,
+    superuser_token_headers: dict[str, str],
+    db: Session,
+) -> None:
+    email = random_email()
+    password = random_lower_string()
+    user = crud.create_user(
+        session=db, user_create=UserCreate(email=email, password=password)
+    )
+    headers = user_authentication_headers(client=client, email=email, password=password)
+    password = random_lower_string()
+    r = async_client.patch(
+        f"{settings.API_V1_STR}/users/{user.id}",
+        headers=superuser_token_headers,
+        json={"password": password},
+    )
+    assert r.status_code == 200
+    r = async_client.get(f"{settings.API_V1_STR}/users/me", headers=headers)
+    assert r.status_code == 403
+
+    headers = user_authentication_headers(client=client, email=email, password=password)
+    r = async_client.delete(
+        f"{settings.API_V1_STR}/users/{user.id}", headers=superuser_token_headers
+    )
+    assert r.status_code == 200
+    r = async_client.get(f"{settings.API_V1_STR}/users/me", headers=headers)
+    assert r.status_code == 403
@@ -0,0 +1,384 @@
+import json
+import uuid
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.models import Emp
+from tests.utils.utils import count_queries, random_email, random_lower_string
+
+
+def create_department(client: TestClient, headers: dict[str, str]) -> dict[str, str]:
+    r = client.post(
+        f"{settings.API_V1_STR}/deps/",
+        headers=headers,
+        json={"dep_name": "Engineering", "dep_code": random_lower_string()},
+    )
+    assert r.status_code == 200
+    return r.json()  # type: ignore[no-any-return]
+
+
+def test_bulk_create_emps_csv(
+    client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+) -> None:
+    department = create_department(client, normal_user_token_headers)
+    first, second = random_email(), random_email()
+    body = (
+        "workemail,name,address,mobile_number,depemp_id\n"
+        f'{first},Ada,"1 Main St,\nSpringfield",0123456789,{department["dep_id"]}\n'
+        f"{second},Grace,,0123456789,\n"
+        f"{first},Dup,,0123456789,\n"
+        "not-an-email,Bad,,0123456789,\n"
+        f"{random_email()},NoDep,,0123456789,{random_lower_string()}\n"
+    )
+    r = client.post(
+        f"{settings.API_V1_STR}/emps/bulk",
+        headers={**normal_user_token_headers, "Content-Type": "text/csv"},
+        content=body,
+    )
+    assert r.status_code == 200
+    result = r.json()
+    assert result["created"] == 2
+    assert [error["row"] for error in result["errors"]] == [3, 4, 5]
+    assert result["errors"][0]["detail"] == "Duplicate workemail in upload"
+    assert result["errors"][1]["detail"].startswith("workemail")
+
+    emp = db.exec(select(Emp).where(Emp.workemail == first)).one()
+    assert emp.address == "1 Main St,\nSpringfield"
+    assert emp.dep_name == "Engineering"
+
+
+def test_bulk_create_emps_ndjson_skips_existing(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    existing = random_email()
+    rows = [
+        {"workemail": existing, "name": "One", "mobile_number": "0123456789"},
+        {"workemail": random_email(), "name": "Two", "mobile_number": "0123456789"},
+    ]
+    body = "\n".join(json.dumps(row) for row in rows)
+    headers = {**normal_user_token_headers, "Content-Type": "application/x-ndjson"}
+    r = client.post(f"{settings.API_V1_STR}/emps/bulk", headers=headers, content=body)
+    assert r.json() == {"created": 2, "errors": []}
+
+    body = json.dumps(rows[0]) + "\n[1, 2]\n{broken"
+    r = client.post(f"{settings.API_V1_STR}/emps/bulk", headers=headers, content=body)
+    result = r.json()
+    assert result["created"] == 0
+    assert result["errors"] == [
+        {"row": 1, "detail": "Employee with this email already exists"},
+        {"row": 2, "detail": "Expected a JSON object"},
+        {"row": 3, "detail": "Invalid JSON"},
+    ]
+
+
+def test_bulk_create_emps_unsupported_content_type(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    r = client.post(
+        f"{settings.API_V1_STR}/emps/bulk",
+        headers=normal_user_token_headers,
+        json=[],
+    )
+    assert r.status_code == 415
+
+
+def test_export_emps(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    workemail = random_email()
+    body = json.dumps(
+        {"workemail": workemail, "name": "Out", "mobile_number": "0123456789"}
+    )
+    r = client.post(
+        f"{settings.API_V1_STR}/emps/bulk",
+        headers={**normal_user_token_headers, "Content-Type": "application/x-ndjson"},
+        content=body,
+    )
+    assert r.json()["created"] == 1
+
+    r = client.get(
+        f"{settings.API_V1_STR}/emps/export", headers=normal_user_token_headers
+    )
+    assert r.status_code == 200
+    rows = [json.loads(line) for line in r.text.splitlines()]
+    exported = next(row for row in rows if row["workemail"] == workemail)
+    assert exported["name"] == "Out"
+    assert exported["depemp_id"] is None
+
+    r = client.get(
+        f"{settings.API_V1_STR}/emps/export",
+        headers=normal_user_token_headers,
+        params={"format": "csv"},
+    )
+    header, *lines = r.text.splitlines()
+    assert header.split(",")[:3] == ["empcode", "emp_id", "workemail"]
+    assert any(workemail in line for line in lines)
+
+
+def test_rename_department_updates_emps(
+    client: TestClient,
+    normal_user_token_headers: dict[str, str],
+    superuser_token_headers: dict[str, str],
+    db: Session,
+) -> None:
+    department = create_department(client, normal_user_token_headers)
+    workemail = random_email()
+    r = client.post(
+        f"{settings.API_V1_STR}/emps/",
+        headers=normal_user_token_headers,
+        json={
+            "workemail": workemail,
+            "name": "Renamed",
+            "mobile_number": "0123456789",
+            "depemp_id": department["dep_id"],
+        },
+    )
+    assert r.status_code == 200
+    empcode = r.json()["empcode"]
+
+    r = client.patch(
+        f"{settings.API_V1_STR}/deps/{department['dep_id']}",
+        headers=normal_user_token_headers,
+        json={"dep_name": "Research"},
+    )
+    assert r.status_code == 200
+
+    r = client.get(
+        f"{settings.API_V1_STR}/emps/{empcode}", headers=superuser_token_headers
+    )
+    assert r.json()["dep_name"] == "Research"
+    emp = db.exec(select(Emp).where(Emp.workemail == workemail)).one()
+    db.refresh(emp)
+    assert emp.dep_name == "Research"
+
+
+def test_update_department_changes_emp_etag(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    department = create_department(client, normal_user_token_headers)
+    r = client.post(
+        f"{settings.API_V1_STR}/emps/",
+        headers=normal_user_token_headers,
+        json={
+            "workemail": random_email(),
+            "name": "Tagged",
+            "mobile_number": "0123456789",
+            "depemp_id": department["dep_id"],
+        },
+    )
+    url = f"{settings.API_V1_STR}/emps/{r.json()['empcode']}"
+    etag = client.get(url, headers=normal_user_token_headers).headers["ETag"]
+    list_url = f"{settings.API_V1_STR}/emps/"
+    list_etag = client.get(list_url, headers=normal_user_token_headers).headers["ETag"]
+
+    # The department is embedded in the employee, changing its code only must
+    # invalidate both
+    r = client.patch(
+        f"{settings.API_V1_STR}/deps/{department['dep_id']}",
+        headers=normal_user_token_headers,
+        json={"dep_code": random_lower_string()},
+    )
+    assert r.status_code == 200
+    r = client.get(url, headers={**normal_user_token_headers, "If-None-Match": etag})
+    assert r.status_code == 200
+    assert r.json()["ownerdep"]["dep_code"] != department["dep_code"]
+    r = client.get(
+        list_url, headers={**normal_user_token_headers, "If-None-Match": list_etag}
+    )
+    assert r.status_code == 200
+
+
+def test_read_emps_query_count_does_not_grow_with_page(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    rows = [
+        {
+            "workemail": random_email(),
+            "name": f"Paged {i}",
+            "mobile_number": "0123456789",
+            "depemp_id": create_department(client, normal_user_token_headers)["dep_id"],
+        }
+        for i in range(6)
+    ]
+    r = client.post(
+        f"{settings.API_V1_STR}/emps/bulk",
+        headers={**normal_user_token_headers, "Content-Type": "application/x-ndjson"},
+        content="\n".join(json.dumps(row) for row in rows),
+    )
+    assert r.json()["created"] == 6
+
+    statement_counts = []
+    for limit in (1, 6):
+        url = f"{settings.API_V1_STR}/emps/?limit={limit}"
+        client.get(url, headers=normal_user_token_headers)
+        with count_queries() as statements:
+            r = client.get(url, headers=normal_user_token_headers)
+        assert len(r.json()["data"]) == limit
+        assert all(emp["ownerdep"] for emp in r.json()["data"])
+        statement_counts.append(len(statements))
+    assert statement_counts[0] == statement_counts[1]
+
+
+def test_read_emp_own(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    department = create_department(client, normal_user_token_headers)
+    r = client.post(
+        f"{settings.API_V1_STR}/emps/",
+        headers=normal_user_token_headers,
+        json={
+            "workemail": random_email(),
+            "name": "Own",
+            "mobile_number": "0123456789",
+            "depemp_id": department["dep_id"],
+        },
+    )
+    empcode = r.json()["empcode"]
+    client.get(
+        f"{settings.API_V1_STR}/emps/{empcode}", headers=normal_user_token_headers
+    )
+    with count_queries() as statements:
+        r = client.get(
+            f"{settings.API_V1_STR}/emps/{empcode}", headers=normal_user_token_headers
+        )
+    assert r.status_code == 200
+    assert r.json()["ownerdep"]["dep_id"] == department["dep_id"]
+    # The cached principal needs no query, the employee and department one
+    assert len(statements) == 1
+
+
+def test_batch_get_emps(
+    client: TestClient,
+    normal_user_token_headers: dict[str, str],
+    superuser_token_headers: dict[str, str],
+) -> None:
+    department = create_department(client, normal_user_token_headers)
+    empcodes = [
+        client.post(
+            f"{settings.API_V1_STR}/emps/",
+            headers=normal_user_token_headers,
+            json={
+                "workemail": random_email(),
+                "name": f"Batch {i}",
+                "mobile_number": "0123456789",
+                "depemp_id": department["dep_id"],
+            },
+        ).json()["empcode"]
+        for i in range(2)
+    ]
+    others = client.post(
+        f"{settings.API_V1_STR}/emps/",
+        headers=superuser_token_headers,
+        json={
+            "workemail": random_email(),
+            "name": "Other",
+            "mobile_number": "0123456789",
+            "depemp_id": create_department(client, superuser_token_headers)["dep_id"],
+        },
+    ).json()["empcode"]
+    with count_queries() as statements:
+        r = client.post(
+            f"{settings.API_V1_STR}/emps/batch-get",
+            headers=normal_user_token_headers,
+            json={"ids": [*empcodes, others]},
+        )
+    assert r.status_code == 200
+    content = r.json()
+    assert [emp["empcode"] for emp in content["data"]] == empcodes
+    assert all(
+        emp["ownerdep"]["dep_id"] == department["dep_id"] for emp in content["data"]
+    )
+    assert content["errors"] == [
+        {"id": others, "status": 403, "detail": "Not enough permissions"}
+    ]
+    assert len(statements) == 1
+
+
+def test_batch_delete_deps_removes_emps(
+    client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+) -> None:
+    departments = [
+        create_department(client, normal_user_token_headers) for _ in range(2)
+    ]
+    workemail = random_email()
+    r = client.post(
+        f"{settings.API_V1_STR}/emps/",
+        headers=normal_user_token_headers,
+        json={
+            "workemail": workemail,
+            "name": "Cascaded",
+            "mobile_number": "0123456789",
+            "depemp_id": departments[0]["dep_id"],
+        },
+    )
+    empcode = r.json()["empcode"]
+    missing = str(uuid.uuid4())
+    r = client.post(
+        f"{settings.API_V1_STR}/deps/batch-delete",
+        headers=normal_user_token_headers,
+        json={"ids": [dep["dep_id"] for dep in departments] + [missing]},
+    )
+    assert r.status_code == 200
+    assert sorted(r.json()["deleted"]) == sorted(dep["dep_id"] for dep in departments)
+    assert r.json()["errors"] == [
+        {"id": missing, "status": 404, "detail": "Department not found"}
+    ]
+    assert db.exec(select(Emp).where(Emp.workemail == workemail)).first() is None
+
+    r = client.post(
+        f"{settings.API_V1_STR}/emps/batch-delete",
+        headers=normal_user_token_headers,
+        json={"ids": [empcode]},
+    )
+    assert r.json() == {
+        "deleted": [],
+        "errors": [{"id": empcode, "status": 404, "detail": "Employee not found"}],
+    }
+
+
+def test_search_emps(
+    client: TestClient,
+    normal_user_token_headers: dict[str, str],
+    superuser_token_headers: dict[str, str],
+) -> None:
+    department = create_department(client, normal_user_token_headers)
+    local_part = random_lower_string()
+    for headers, name, dep in (
+        (normal_user_token_headers, "Ada Lovelace", department),
+        (
+            superuser_token_headers,
+            "Ada Other",
+            create_department(client, superuser_token_headers),
+        ),
+    ):
+        r = client.post(
+            f"{settings.API_V1_STR}/emps/",
+            headers=headers,
+            json={
+                "workemail": f"{local_part}@{name.split()[1].lower()}.example.com",
+                "name": name,
+                "mobile_number": "0123456789",
+                "depemp_id": dep["dep_id"],
+            },
+        )
+        assert r.status_code == 200
+
+    url = f"{settings.API_V1_STR}/emps/search"
+    # By local part of the e-mail, only the caller's own employee
+    r = client.get(url, headers=normal_user_token_headers, params={"q": local_part})
+    assert [emp["name"] for emp in r.json()["data"]] == ["Ada Lovelace"]
+    assert r.json()["data"][0]["ownerdep"]["dep_id"] == department["dep_id"]
+    # By prefix of the e-mail up to the host
+    r = client.get(
+        url, headers=normal_user_token_headers, params={"q": f"{local_part}@love"}
+    )
+    assert len(r.json()["data"]) == 1
+    # Superusers search every employee
+    r = client.get(url, headers=superuser_token_headers, params={"q": local_part})
+    assert {emp["name"] for emp in r.json()["data"]} == {"Ada Lovelace", "Ada Other"}
+    r = client.get(
+        url, headers=superuser_token_headers, params={"q": f"{local_part} lovel"}
+    )
+    assert [emp["name"] for emp in r.json()["data"]] == ["Ada Lovelace"]
@@ -1,10 +1,15 @@
+import csv
+import io
+import json
 import uuid
 
 from fastapi.testclient import TestClient
 from sqlmodel import Session
 
 from app.core.config import settings
+from app.models import Item, ItemsPublic
 from tests.utils.item import create_random_item
+from tests.utils.utils import count_queries, random_lower_string
 
 
 def test_create_item(
@@ -40,6 +45,71 @@ def test_read_item(
     assert content["owner_id"] == str(item.owner_id)
 
 
+def test_read_item_if_none_match(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    item = create_random_item(db)
+    url = f"{settings.API_V1_STR}/items/{item.id}"
+    response = client.get(url, headers=superuser_token_headers)
+    etag = response.headers["ETag"]
+    assert etag.startswith('W/"')
+
+    response = client.get(
+        url, headers={**superuser_token_headers, "If-None-Match": etag}
+    )
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+
+    client.put(url, headers=superuser_token_headers, json={"title": "Changed"})
+    response = client.get(
+        url, headers={**superuser_token_headers, "If-None-Match": etag}
+    )
+    assert response.status_code == 200
+    assert response.json()["title"] == "Changed"
+    assert response.headers["ETag"] != etag
+
+
+def test_read_items_if_none_match(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    url = f"{settings.API_V1_STR}/items/"
+    client.post(url, headers=normal_user_token_headers, json={"title": "Polled"})
+    response = client.get(url, headers=normal_user_token_headers)
+    etag = response.headers["ETag"]
+    conditional = {**normal_user_token_headers, "If-None-Match": etag}
+
+    with count_queries() as statements:
+        response = client.get(url, headers=conditional)
+    assert response.status_code == 304
+    # The count and the page, the tag is built from them
+    assert len(statements) == 2
+    with count_queries() as statements:
+        response = client.get(
+            f"{url}?count_strategy=none", headers=normal_user_token_headers
+        )
+    assert response.status_code == 200
+    # No count, so only the page, and no aggregate for the tag
+    assert len(statements) == 1
+
+    response = client.get(f"{url}?limit=1", headers=conditional)
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+    item = client.post(
+        url, headers=normal_user_token_headers, json={"title": "New"}
+    ).json()
+    response = client.get(url, headers=conditional)
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+
+    client.delete(f"{url}{item['id']}", headers=normal_user_token_headers)
+    response = client.get(
+        url, headers={**normal_user_token_headers, "If-None-Match": etag}
+    )
+    assert response.status_code == 200
+
+
 def test_read_item_not_found(
     client: TestClient, superuser_token_headers: dict[str, str]
 ) -> None:
@@ -79,6 +149,20 @@ def test_read_items(
     assert len(content["data"]) >= 2
 
 
+def test_read_items_matches_response_model(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    create_random_item(db)
+    response = client.get(
+        f"{settings.API_V1_STR}/items/",
+        headers=superuser_token_headers,
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    page = ItemsPublic.model_validate_json(response.content)
+    assert response.content == page.model_dump_json().encode()
+
+
 def test_update_item(
     client: TestClient, superuser_token_headers: dict[str, str], db: Session
 ) -> None:
@@ -162,3 +246,313 @@ def test_delete_item_not_enough_permissions(
     assert response.status_code == 403
     content = response.json()
     assert content["detail"] == "Not enough permissions"
+
+
+def test_batch_get_items(
+    client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+) -> None:
+    own = [
+        client.post(
+            f"{settings.API_V1_STR}/items/",
+            headers=normal_user_token_headers,
+            json={"title": f"Batch {i}"},
+        ).json()["id"]
+        for i in range(3)
+    ]
+    other = str(create_random_item(db).id)
+    missing = str(uuid.uuid4())
+    with count_queries() as statements:
+        response = client.post(
+            f"{settings.API_V1_STR}/items/batch-get",
+            headers=normal_user_token_headers,
+            json={"ids": [own[2], other, own[0], missing, own[1], own[0]]},
+        )
+    assert response.status_code == 200
+    content = response.json()
+    assert [item["id"] for item in content["data"]] == [own[2], own[0], own[1]]
+    assert content["errors"] == [
+        {"id": other, "status": 403, "detail": "Not enough permissions"},
+        {"id": missing, "status": 404, "detail": "Item not found"},
+    ]
+    assert len(statements) == 1
+
+
+def test_batch_get_items_too_many_ids(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    response = client.post(
+        f"{settings.API_V1_STR}/items/batch-get",
+        headers=normal_user_token_headers,
+        json={"ids": [str(uuid.uuid4()) for _ in range(settings.BATCH_MAX_IDS + 1)]},
+    )
+    assert response.status_code == 422
+    response = client.post(
+        f"{settings.API_V1_STR}/items/batch-get",
+        headers=normal_user_token_headers,
+        json={"ids": []},
+    )
+    assert response.status_code == 422
+
+
+def test_batch_delete_items(
+    client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+) -> None:
+    own = [
+        client.post(
+            f"{settings.API_V1_STR}/items/",
+            headers=normal_user_token_headers,
+            json={"title": f"Doomed {i}"},
+        ).json()["id"]
+        for i in range(2)
+    ]
+    other = create_random_item(db)
+    missing = str(uuid.uuid4())
+    with count_queries() as statements:
+        response = client.post(
+            f"{settings.API_V1_STR}/items/batch-delete",
+            headers=normal_user_token_headers,
+            json={"ids": [*own, str(other.id), missing]},
+        )
+    assert response.status_code == 200
+    content = response.json()
+    assert sorted(content["deleted"]) == sorted(own)
+    assert content["errors"] == [
+        {"id": str(other.id), "status": 403, "detail": "Not enough permissions"},
+        {"id": missing, "status": 404, "detail": "Item not found"},
+    ]
+    # The delete, and the lookup telling forbidden from missing
+    assert len(statements) == 2
+    for id in own:
+        response = client.get(
+            f"{settings.API_V1_STR}/items/{id}", headers=normal_user_token_headers
+        )
+        assert response.status_code == 404
+    db.expire_all()
+    assert db.get(Item, other.id) is not None
+
+
+def test_batch_delete_items_superuser(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    ids = [str(create_random_item(db).id) for _ in range(2)]
+    with count_queries() as statements:
+        response = client.post(
+            f"{settings.API_V1_STR}/items/batch-delete",
+            headers=superuser_token_headers,
+            json={"ids": ids},
+        )
+    assert response.status_code == 200
+    assert sorted(response.json()["deleted"]) == sorted(ids)
+    assert response.json()["errors"] == []
+    assert len(statements) == 1
+
+
+def test_search_items(
+    client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+) -> None:
+    word = random_lower_string()
+    for title, description in (
+        (f"{word} in title", None),
+        ("Other", f"{word} in description"),
+        ("Unrelated", None),
+    ):
+        client.post(
+            f"{settings.API_V1_STR}/items/",
+            headers=normal_user_token_headers,
+            json={"title": title, "description": description},
+        )
+    # Someone else's item never shows up
+    item = create_random_item(db)
+    item.title = word
+    db.add(item)
+    db.commit()
+
+    response = client.get(
+        f"{settings.API_V1_STR}/items/search",
+        headers=normal_user_token_headers,
+        params={"q": word[:8]},
+    )
+    assert response.status_code == 200
+    content = response.json()
+    # A title match outranks a description match
+    assert [item["title"] for item in content["data"]] == [f"{word} in title", "Other"]
+    assert content["next_cursor"] is None
+
+
+def test_search_items_with_cursor(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    word = random_lower_string()
+    for i in range(5):
+        client.post(
+            f"{settings.API_V1_STR}/items/",
+            headers=normal_user_token_headers,
+            json={"title": f"{word} " * (i + 1)},
+        )
+    url = f"{settings.API_V1_STR}/items/search"
+    params: dict[str, str | int] = {"q": word, "limit": 2}
+    titles: list[str] = []
+    while True:
+        response = client.get(url, headers=normal_user_token_headers, params=params)
+        content = response.json()
+        titles += [item["title"] for item in content["data"]]
+        if content["next_cursor"] is None:
+            break
+        params["cursor"] = content["next_cursor"]
+    # More occurrences rank higher, every item is seen exactly once
+    assert [title.count(word) for title in titles] == [5, 4, 3, 2, 1]
+
+
+def test_search_items_quotes_query(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    for q in ("it's", "a & b | !c", "x:*", "\\", "'"):
+        response = client.get(
+            f"{settings.API_V1_STR}/items/search",
+            headers=normal_user_token_headers,
+            params={"q": q},
+        )
+        assert response.status_code == 200
+    response = client.get(
+        f"{settings.API_V1_STR}/items/search",
+        headers=normal_user_token_headers,
+        params={"q": "x", "cursor": "invalid"},
+    )
+    assert response.status_code == 400
+
+
+def test_read_items_with_cursor(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    for i in range(3):
+        r = client.post(
+            f"{settings.API_V1_STR}/items/",
+            headers=normal_user_token_headers,
+            json={"title": f"Cursor {i}"},
+        )
+        assert r.status_code == 200
+    response = client.get(
+        f"{settings.API_V1_STR}/items/",
+        headers=normal_user_token_headers,
+        params={"limit": 2},
+    )
+    assert response.status_code == 200
+    first_page = response.json()
+    assert len(first_page["data"]) == 2
+    assert first_page["next_cursor"]
+
+    response = client.get(
+        f"{settings.API_V1_STR}/items/",
+        headers=normal_user_token_headers,
+        params={"limit": 2, "cursor": first_page["next_cursor"]},
+    )
+    assert response.status_code == 200
+    second_page = response.json()
+    assert second_page["data"]
+    first_ids = {item["id"] for item in first_page["data"]}
+    assert not first_ids & {item["id"] for item in second_page["data"]}
+
+    response = client.get(
+        f"{settings.API_V1_STR}/items/",
+        headers=normal_user_token_headers,
+        params={"limit": 2, "skip": 2},
+    )
+    assert response.json()["data"][0]["id"] == second_page["data"][0]["id"]
+
+
+def test_read_items_invalid_cursor(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    response = client.get(
+        f"{settings.API_V1_STR}/items/",
+        headers=superuser_token_headers,
+        params={"cursor": "not-a-cursor"},
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
+
+
+def test_read_items_count_strategies(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    url = f"{settings.API_V1_STR}/items/"
+    exact = client.get(url, headers=normal_user_token_headers).json()
+    assert exact["count_strategy"] == "exact"
+
+    cached = client.get(
+        url, headers=normal_user_token_headers, params={"count_strategy": "cached"}
+    ).json()
+    assert cached["count"] == exact["count"]
+    assert cached["count_strategy"] == "cached"
+
+    client.post(url, headers=normal_user_token_headers, json={"title": "Counted"})
+    cached = client.get(
+        url, headers=normal_user_token_headers, params={"count_strategy": "cached"}
+    ).json()
+    assert cached["count"] == exact["count"] + 1
+
+    estimated = client.get(
+        url, headers=normal_user_token_headers, params={"count_strategy": "estimated"}
+    ).json()
+    assert isinstance(estimated["count"], int)
+    assert estimated["count_strategy"] == "estimated"
+
+    omitted = client.get(
+        url, headers=normal_user_token_headers, params={"count_strategy": "none"}
+    ).json()
+    assert omitted["count"] is None
+    assert omitted["data"]
+
+
+def test_read_items_estimated_count_superuser(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    response = client.get(
+        f"{settings.API_V1_STR}/items/",
+        headers=superuser_token_headers,
+        params={"count_strategy": "estimated"},
+    )
+    assert response.status_code == 200
+    assert isinstance(response.json()["count"], int)
+
+
+def test_export_items_ndjson(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    item = create_random_item(db)
+    response = client.get(
+        f"{settings.API_V1_STR}/items/export",
+        headers=superuser_token_headers,
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    exported = next(row for row in rows if row["id"] == str(item.id))
+    assert exported["title"] == item.title
+    assert exported["owner_id"] == str(item.owner_id)
+
+
+def test_export_items_csv_only_own(
+    client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+) -> None:
+    other = create_random_item(db)
+    response = client.post(
+        f"{settings.API_V1_STR}/items/",
+        headers=normal_user_token_headers,
+        json={"title": "Exported, with comma"},
+    )
+    own = response.json()
+    response = client.get(
+        f"{settings.API_V1_STR}/items/export",
+        headers=normal_user_token_headers,
+        params={"format": "csv"},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    ids = {row["id"] for row in rows}
+    assert own["id"] in ids
+    assert str(other.id) not in ids
+    assert {row["owner_id"] for row in rows} == {own["owner_id"]}
+    exported = next(row for row in rows if row["id"] == own["id"])
+    assert exported["title"] == "Exported, with comma"
@@ -1,3 +1,4 @@
+import uuid
 from unittest.mock import patch
 
 from fastapi.testclient import TestClient
@@ -5,12 +6,13 @@ from pwdlib.hashers.bcrypt import BcryptHasher
 from sqlmodel import Session
 
 from app.core.config import settings
+from app.core.ratelimit import RateLimiter
 from app.core.security import get_password_hash, verify_password
 from app.crud import create_user
 from app.models import User, UserCreate
 from app.utils import generate_password_reset_token
 from tests.utils.user import user_authentication_headers
-from tests.utils.utils import random_email, random_lower_string
+from tests.utils.utils import count_queries, random_email, random_lower_string
 
 
 def test_get_access_token(client: TestClient) -> None:
@@ -189,3 +191,115 @@ def test_login_with_argon2_password_keeps_hash(client: TestClient, db: Session)
 
     assert user.hashed_password == original_hash
     assert user.hashed_password.startswith("$argon2")
+
+
+def test_refresh_token(client: TestClient, db: Session) -> None:
+    email = random_email()
+    password = random_lower_string()
+    create_user(session=db, user_create=UserCreate(email=email, password=password))
+    r = client.post(
+        f"{settings.API_V1_STR}/login/access-token",
+        data={"username": email, "password": password},
+    )
+    tokens = r.json()
+    assert tokens["refresh_token"]
+
+    # Each token is only accepted where its type is expected
+    r = client.get(
+        f"{settings.API_V1_STR}/items/",
+        headers={"Authorization": f"Bearer {tokens['refresh_token']}"},
+    )
+    assert r.status_code == 403
+    r = client.post(
+        f"{settings.API_V1_STR}/login/refresh-token",
+        json={"refresh_token": tokens["access_token"]},
+    )
+    assert r.status_code == 403
+
+    r = client.post(
+        f"{settings.API_V1_STR}/login/refresh-token",
+        json={"refresh_token": tokens["refresh_token"]},
+    )
+    assert r.status_code == 200
+    r = client.get(
+        f"{settings.API_V1_STR}/users/me",
+        headers={"Authorization": f"Bearer {r.json()['access_token']}"},
+    )
+    assert r.json()["email"] == email
+
+
+def test_deactivating_user_revokes_tokens(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    email = random_email()
+    password = random_lower_string()
+    user = create_user(
+        session=db, user_create=UserCreate(email=email, password=password)
+    )
+    tokens = client.post(
+        f"{settings.API_V1_STR}/login/access-token",
+        data={"username": email, "password": password},
+    ).json()
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+    assert client.get(f"{settings.API_V1_STR}/items/", headers=headers).is_success
+
+    r = client.patch(
+        f"{settings.API_V1_STR}/users/{user.id}",
+        headers=superuser_token_headers,
+        json={"is_active": False},
+    )
+    assert r.status_code == 200
+    r = client.get(f"{settings.API_V1_STR}/items/", headers=headers)
+    assert r.status_code == 403
+    r = client.post(
+        f"{settings.API_V1_STR}/login/refresh-token",
+        json={"refresh_token": tokens["refresh_token"]},
+    )
+    assert r.status_code == 403
+
+
+def test_access_token_claims_authorize_without_queries(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    with count_queries() as statements:
+        r = client.get(
+            f"{settings.API_V1_STR}/items/{uuid.uuid4()}",
+            headers=normal_user_token_headers,
+        )
+    assert r.status_code == 404
+    # Only the item lookup, the user is neither loaded nor looked up
+    assert len(statements) == 1
+
+
+def test_login_rate_limited_per_username(client: TestClient) -> None:
+    limiter = RateLimiter("test-login-username", limit=2, window=60, maxsize=10)
+    login_data = {"username": random_email(), "password": "incorrect"}
+    with (
+        patch.object(settings, "RATE_LIMIT_ENABLED", True),
+        patch("app.api.deps.login_username_limiter", limiter),
+        patch("app.api.routes.login.crud.authenticate", return_value=None) as auth,
+    ):
+        for _ in range(2):
+            r = client.post(
+                f"{settings.API_V1_STR}/login/access-token", data=login_data
+            )
+            assert r.status_code == 400
+        login_data["username"] = login_data["username"].upper()
+        r = client.post(f"{settings.API_V1_STR}/login/access-token", data=login_data)
+    assert r.status_code == 429
+    assert 0 < int(r.headers["Retry-After"]) <= 60
+    # The password of the rejected attempt is never hashed
+    assert auth.call_count == 2
+
+
+def test_recovery_password_rate_limited_per_ip(client: TestClient) -> None:
+    limiter = RateLimiter("test-recovery-ip", limit=1, window=60, maxsize=10)
+    with (
+        patch.object(settings, "RATE_LIMIT_ENABLED", True),
+        patch("app.api.deps.recovery_ip_limiter", limiter),
+    ):
+        r = client.post(f"{settings.API_V1_STR}/password-recovery/{random_email()}")
+        assert r.status_code == 200
+        r = client.post(f"{settings.API_V1_STR}/password-recovery/{random_email()}")
+    assert r.status_code == 429
+    assert "Retry-After" in r.headers
@@ -2,6 +2,7 @@ from fastapi.testclient import TestClient
 from sqlmodel import Session, select
 
 from app.core.config import settings
+from app.core.query_timing import slow_queries
 from app.models import User
 
 
@@ -24,3 +25,24 @@ def test_create_user(client: TestClient, db: Session) -> None:
     assert user
     assert user.email == "pollo@listo.com"
     assert user.full_name == "Pollo Listo"
+
+
+def test_read_slow_queries(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    slow_queries.clear()
+    r = client.get(f"{settings.API_V1_STR}/items/", headers=normal_user_token_headers)
+    server_timing = r.headers["Server-Timing"]
+    assert server_timing.startswith("db;dur=")
+    assert 'desc="0 queries"' not in server_timing
+
+    r = client.get(f"{settings.API_V1_STR}/private/slow-queries/")
+    assert r.status_code == 200
+    entries = r.json()
+    entry = next(e for e in entries if e["route"] == "GET /items/")
+    assert entry["statement"].startswith("SELECT")
+    assert entry["count"] >= 1
+    assert entry["max_ms"] >= entry["total_ms"] / entry["count"]
+    assert [e["max_ms"] for e in entries] == sorted(
+        (e["max_ms"] for e in entries), reverse=True
+    )
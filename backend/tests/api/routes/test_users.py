@@ -1,15 +1,16 @@
+import tracemalloc
 import uuid
 from unittest.mock import patch
 
 from fastapi.testclient import TestClient
-from sqlmodel import Session, select
+from sqlmodel import Session, insert, select
 
 from app import crud
 from app.core.config import settings
 from app.core.security import verify_password
-from app.models import User, UserCreate
-from tests.utils.user import create_random_user
-from tests.utils.utils import random_email, random_lower_string
+from app.models import Dep, DepCreate, Emp, EmpCreate, Item, User, UserCreate
+from tests.utils.user import create_random_user, user_authentication_headers
+from tests.utils.utils import count_queries, random_email, random_lower_string
 
 
 def test_get_users_superuser_me(
@@ -34,6 +35,23 @@ def test_get_users_normal_user_me(
     assert current_user["email"] == settings.EMAIL_TEST_USER
 
 
+def test_get_users_me_if_none_match(client: TestClient, db: Session) -> None:
+    email = random_email()
+    password = random_lower_string()
+    crud.create_user(session=db, user_create=UserCreate(email=email, password=password))
+    headers = user_authentication_headers(client=client, email=email, password=password)
+    url = f"{settings.API_V1_STR}/users/me"
+    etag = client.get(url, headers=headers).headers["ETag"]
+    r = client.get(url, headers={**headers, "If-None-Match": f'"other", {etag}'})
+    assert r.status_code == 304
+
+    r = client.patch(url, headers=headers, json={"full_name": "Changed"})
+    assert r.status_code == 200
+    r = client.get(url, headers={**headers, "If-None-Match": etag})
+    assert r.status_code == 200
+    assert r.json()["full_name"] == "Changed"
+
+
 def test_create_user_new_email(
     client: TestClient, superuser_token_headers: dict[str, str], db: Session
 ) -> None:
@@ -196,6 +214,7 @@ def test_retrieve_users(
     assert "count" in all_users
     for item in all_users["data"]:
         assert "email" in item
+        assert "hashed_password" not in item
 
 
 def test_update_user_me(
@@ -221,47 +240,46 @@ def test_update_user_me(
     assert user_db.full_name == full_name
 
 
-def test_update_password_me(
-    client: TestClient, superuser_token_headers: dict[str, str], db: Session
-) -> None:
+def test_update_password_me(client: TestClient, db: Session) -> None:
+    username = random_email()
+    password = random_lower_string()
+    crud.create_user(
+        session=db, user_create=UserCreate(email=username, password=password)
+    )
+    login = client.post(
+        f"{settings.API_V1_STR}/login/access-token",
+        data={"username": username, "password": password},
+    ).json()
+    headers = {"Authorization": f"Bearer {login['access_token']}"}
     new_password = random_lower_string()
-    data = {
-        "current_password": settings.FIRST_SUPERUSER_PASSWORD,
-        "new_password": new_password,
-    }
+    data = {"current_password": password, "new_password": new_password}
     r = client.patch(
-        f"{settings.API_V1_STR}/users/me/password",
-        headers=superuser_token_headers,
-        json=data,
+        f"{settings.API_V1_STR}/users/me/password", headers=headers, json=data
     )
     assert r.status_code == 200
-    updated_user = r.json()
-    assert updated_user["message"] == "Password updated successfully"
+    tokens = r.json()
+    assert tokens["access_token"]
+    assert tokens["refresh_token"]
 
-    user_query = select(User).where(User.email == settings.FIRST_SUPERUSER)
-    user_db = db.exec(user_query).first()
+    user_db = db.exec(select(User).where(User.email == username)).first()
     assert user_db
-    assert user_db.email == settings.FIRST_SUPERUSER
+    db.refresh(user_db)
     verified, _ = verify_password(new_password, user_db.hashed_password)
     assert verified
 
-    # Revert to the old password to keep consistency in test
-    old_data = {
-        "current_password": new_password,
-        "new_password": settings.FIRST_SUPERUSER_PASSWORD,
-    }
-    r = client.patch(
-        f"{settings.API_V1_STR}/users/me/password",
-        headers=superuser_token_headers,
-        json=old_data,
+    # The tokens issued before the change are revoked, the new ones work
+    r = client.get(f"{settings.API_V1_STR}/users/me", headers=headers)
+    assert r.status_code == 403
+    r = client.post(
+        f"{settings.API_V1_STR}/login/refresh-token",
+        json={"refresh_token": login["refresh_token"]},
     )
-    db.refresh(user_db)
-
-    assert r.status_code == 200
-    verified, _ = verify_password(
-        settings.FIRST_SUPERUSER_PASSWORD, user_db.hashed_password
+    assert r.status_code == 403
+    r = client.get(
+        f"{settings.API_V1_STR}/users/me",
+        headers={"Authorization": f"Bearer {tokens['access_token']}"},
     )
-    assert verified
+    assert r.status_code == 200
 
 
 def test_update_password_me_incorrect_password(
@@ -519,3 +537,127 @@ def test_delete_user_without_privileges(
     )
     assert r.status_code == 403
     assert r.json()["detail"] == "The user doesn't have enough privileges"
+
+
+def test_update_password_me_invalidates_cached_principal(
+    client: TestClient, db: Session
+) -> None:
+    username = random_email()
+    password = random_lower_string()
+    crud.create_user(
+        session=db, user_create=UserCreate(email=username, password=password)
+    )
+    headers = user_authentication_headers(
+        client=client, email=username, password=password
+    )
+    r = client.get(f"{settings.API_V1_STR}/users/me", headers=headers)
+    assert r.status_code == 200
+    new_password = random_lower_string()
+    r = client.patch(
+        f"{settings.API_V1_STR}/users/me/password",
+        headers=headers,
+        json={"current_password": password, "new_password": new_password},
+    )
+    assert r.status_code == 200
+    headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+    # A stale cached hash would still accept the old password here
+    r = client.patch(
+        f"{settings.API_V1_STR}/users/me/password",
+        headers=headers,
+        json={"current_password": password, "new_password": random_lower_string()},
+    )
+    assert r.status_code == 400
+
+
+def _create_user_with_items(db: Session, count: int) -> User:
+    user = create_random_user(db)
+    db.exec(
+        insert(Item),
+        params=[{"title": f"Owned {i}", "owner_id": user.id} for i in range(count)],
+    )
+    department = crud.create_dep(
+        session=db,
+        dep_in=DepCreate(dep_name="Owned", dep_code=random_lower_string()),
+        depuserid=user.id,
+    )
+    crud.create_emp(
+        session=db,
+        emp_in=EmpCreate(
+            workemail=random_email(),
+            name="Owned",
+            mobile_number="0123456789",
+            depemp_id=department.dep_id,
+        ),
+        emp_id=user.id,
+    )
+    return user
+
+
+def test_delete_user_does_not_load_owned_rows(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    user = _create_user_with_items(db, 2000)
+    tracemalloc.start()
+    try:
+        with count_queries() as statements:
+            r = client.delete(
+                f"{settings.API_V1_STR}/users/{user.id}",
+                headers=superuser_token_headers,
+            )
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert r.status_code == 200
+    # The caller and the user are looked up, one DELETE does the rest through
+    # the database cascade
+    assert len(statements) == 3
+    assert not any("FROM item" in statement for statement in statements)
+    # Loading the 2000 items would take several MB
+    assert peak < 1_000_000
+    assert db.exec(select(Item).where(Item.owner_id == user.id)).first() is None
+    assert db.exec(select(Emp).where(Emp.emp_id == user.id)).first() is None
+
+
+def test_delete_user_background(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    user_id = _create_user_with_items(db, 250).id
+    with (
+        patch.object(settings, "USER_PURGE_BATCH_SIZE", 100),
+        count_queries() as statements,
+    ):
+        r = client.delete(
+            f"{settings.API_V1_STR}/users/{user_id}",
+            headers=superuser_token_headers,
+            params={"background": True},
+        )
+    assert r.status_code == 202
+    assert r.json()["message"] == "User deletion scheduled"
+    # Three item batches, one each for employees and departments, the user
+    assert sum(statement.startswith("DELETE") for statement in statements) == 6
+    db.expire_all()
+    assert db.get(User, user_id) is None
+    assert db.exec(select(Item).where(Item.owner_id == user_id)).first() is None
+    assert db.exec(select(Dep).where(Dep.depuserid == user_id)).first() is None
+
+
+def test_delete_user_me_background_revokes_tokens(
+    client: TestClient, db: Session
+) -> None:
+    username = random_email()
+    password = random_lower_string()
+    crud.create_user(
+        session=db, user_create=UserCreate(email=username, password=password)
+    )
+    headers = user_authentication_headers(
+        client=client, email=username, password=password
+    )
+    r = client.delete(
+        f"{settings.API_V1_STR}/users/me",
+        headers=headers,
+        params={"background": True},
+    )
+    assert r.status_code == 202
+    assert crud.get_user_by_email(session=db, email=username) is None
+    r = client.get(f"{settings.API_V1_STR}/users/me", headers=headers)
+    assert r.status_code == 403
@@ -0,0 +1,49 @@
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+
+
+def test_pool_stats(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    r = client.get(
+        f"{settings.API_V1_STR}/utils/pool-stats/", headers=superuser_token_headers
+    )
+    assert r.status_code == 200
+    stats = r.json()
+    assert stats["pool_class"] == "InstrumentedQueuePool"
+    assert stats["size"] == settings.DB_POOL_SIZE
+    assert stats["checked_out"] >= 1
+    assert stats["wait_count"] >= 1
+
+
+def test_pool_stats_requires_superuser(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    r = client.get(
+        f"{settings.API_V1_STR}/utils/pool-stats/", headers=normal_user_token_headers
+    )
+    assert r.status_code == 403
+
+
+def test_principal_cache_stats(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    r = client.get(
+        f"{settings.API_V1_STR}/utils/principal-cache-stats/",
+        headers=superuser_token_headers,
+    )
+    assert r.status_code == 200
+    assert r.json()["hits"] + r.json()["misses"] >= 1
+
+
+def test_hashing_stats(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    r = client.get(
+        f"{settings.API_V1_STR}/utils/hashing-stats/", headers=superuser_token_headers
+    )
+    assert r.status_code == 200
+    stats = r.json()
+    assert stats["max_workers"] == settings.PASSWORD_HASH_MAX_WORKERS
+    assert stats["completed"] >= 1
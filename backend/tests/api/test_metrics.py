@@ -0,0 +1,58 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+
+
+def test_read_metrics(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    client.get(f"{settings.API_V1_STR}/items/", headers=normal_user_token_headers)
+    client.get(f"{settings.API_V1_STR}/deps/", headers=normal_user_token_headers)
+    client.get("/not-a-route")
+
+    r = client.get("/metrics")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/plain")
+    body = r.text
+    assert (
+        'http_responses_total{method="GET",route="items-read_items",status="200"}'
+        in body
+    )
+    assert 'route="deps-read_deps"' in body
+    assert 'route="unmatched",status="404"' in body
+    assert "http_request_duration_seconds_bucket" in body
+    assert "http_requests_in_progress" in body
+    assert "db_pool_checked_out_connections" in body
+    assert "password_hash_seconds_count" in body
+
+
+def test_metrics_aggregate_across_processes(tmp_path: Path) -> None:
+    env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(tmp_path)}
+    worker = (
+        "from app.core import metrics;"
+        "metrics.HTTP_RESPONSES_TOTAL.labels('items-read_items', 'GET', '200').inc()"
+    )
+    for _ in range(2):
+        subprocess.run([sys.executable, "-c", worker], env=env, check=True)
+
+    exposition = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys; from app.core import metrics;"
+            "sys.stdout.write(metrics.latest()[0].decode())",
+        ],
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    assert (
+        'http_responses_total{method="GET",route="items-read_items",status="200"} 2.0'
+        in exposition
+    )
@@ -0,0 +1,130 @@
+import uuid
+from collections.abc import Callable, Iterator
+from datetime import datetime, timezone
+from typing import Any
+
+import pytest
+from sqlalchemy import Executable
+from sqlmodel import Session, col, func, select
+
+from app.api.loaders import select_emps
+from app.api.pagination import encode_cursor, paginate
+from app.api.search import search_statement
+from app.models import Dep, Emp, Item, User
+from tests.utils.user import create_random_user
+from tests.utils.utils import random_email, random_lower_string
+
+CURSOR = encode_cursor(datetime.now(timezone.utc), uuid.uuid4())
+
+
+def _page(statement: Any, created_at: Any, id: Any, cursor: str | None) -> Any:
+    return paginate(
+        statement, created_at=created_at, id=id, skip=0, limit=10, cursor=cursor
+    )
+
+
+def _count(statement: Any) -> Any:
+    return statement.with_only_columns(func.count(), maintain_column_froms=True)
+
+
+# Queries the list and lookup endpoints run for a regular user, each must be
+# answerable from an index
+LIST_QUERIES: dict[str, Callable[[User, Dep], Executable]] = {
+    "items page": lambda user, _: _page(
+        select(Item).where(Item.owner_id == user.id), Item.created_at, Item.id, None
+    ),
+    "items cursor page": lambda user, _: _page(
+        select(Item).where(Item.owner_id == user.id), Item.created_at, Item.id, CURSOR
+    ),
+    "items count": lambda user, _: _count(select(Item).where(Item.owner_id == user.id)),
+    "emps page": lambda user, _: _page(
+        select_emps().where(Emp.emp_id == user.id), Emp.created_at, Emp.empcode, None
+    ),
+    "emps cursor page": lambda user, _: _page(
+        select_emps().where(Emp.emp_id == user.id),
+        Emp.created_at,
+        Emp.empcode,
+        CURSOR,
+    ),
+    "emps count": lambda user, _: _count(select(Emp).where(Emp.emp_id == user.id)),
+    "emps of department": lambda _, dep: select(Emp).where(
+        col(Emp.depemp_id) == dep.dep_id
+    ),
+    "deps page": lambda user, _: _page(
+        select(Dep).where(Dep.depuserid == user.id), Dep.created_at, Dep.dep_id, None
+    ),
+    "deps count": lambda user, _: _count(select(Dep).where(Dep.depuserid == user.id)),
+    "dep by code": lambda _, dep: select(Dep).where(Dep.dep_code == dep.dep_code),
+    "users page": lambda *_: _page(select(User), User.created_at, User.id, None),
+    # Searched across all owners, as for a superuser, so only the GIN index helps
+    "items search": lambda *_: search_statement(
+        Item,
+        q="ite",
+        id=Item.id,
+        owner_id=Item.owner_id,
+        owner=None,
+        limit=10,
+        cursor=None,
+    ),
+    "emps search": lambda *_: search_statement(
+        Emp,
+        q="emp",
+        id=Emp.empcode,
+        owner_id=Emp.emp_id,
+        owner=None,
+        limit=10,
+        cursor=None,
+    ),
+}
+
+
+def _seq_scans(plan: dict[str, Any]) -> Iterator[str]:
+    if plan["Node Type"] == "Seq Scan":
+        yield plan["Relation Name"]
+    for child in plan.get("Plans", []):
+        yield from _seq_scans(child)
+
+
+@pytest.fixture(scope="module")
+def seeded(db: Session) -> tuple[User, Dep]:
+    user = create_random_user(db)
+    dep = Dep(dep_name="Plans", dep_code=random_lower_string(), depuserid=user.id)
+    db.add(dep)
+    for i in range(50):
+        db.add(Item(title=f"Item {i}", owner_id=user.id))
+        db.add(
+            Emp(
+                workemail=random_email(),
+                name=f"Emp {i}",
+                mobile_number="0123456789",
+                emp_id=user.id,
+                depemp_id=dep.dep_id,
+                dep_name=dep.dep_name,
+            )
+        )
+    db.commit()
+    db.refresh(user)
+    db.refresh(dep)
+    for table in ("item", "emp", "dep", '"user"'):
+        db.connection().exec_driver_sql(f"ANALYZE {table}")
+    db.commit()
+    return user, dep
+
+
+@pytest.mark.parametrize("name", LIST_QUERIES)
+def test_list_query_uses_index(
+    db: Session, seeded: tuple[User, Dep], name: str
+) -> None:
+    statement = LIST_QUERIES[name](*seeded)
+    connection = db.connection()
+    compiled = statement.compile(dialect=connection.dialect)
+    try:
+        # Small tables are cheaper to scan, make the planner show whether an
+        # index could be used at all
+        connection.exec_driver_sql("SET LOCAL enable_seqscan = off")
+        plan = connection.exec_driver_sql(
+            f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params
+        ).scalar_one()
+    finally:
+        db.rollback()
+    assert list(_seq_scans(plan[0]["Plan"])) == []
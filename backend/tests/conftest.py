@@ -1,6 +1,7 @@
-from collections.abc import Generator
+from collections.abc import Callable, Generator
 
 import pytest
+from aiosmtpd.controller import Controller
 from fastapi.testclient import TestClient
 from sqlmodel import Session, delete
 
@@ -8,6 +9,7 @@ from app.core.config import settings
 from app.core.db import engine, init_db
 from app.main import app
 from app.models import Item, User
+from tests.utils.smtp import Sink, smtp_servers
 from tests.utils.user import authentication_token_from_email
 from tests.utils.utils import get_superuser_token_headers
 
@@ -24,6 +26,17 @@ def db() -> Generator[Session, None, None]:
         session.commit()
 
 
+@pytest.fixture(scope="session", autouse=True)
+def no_rate_limits() -> Generator[None, None, None]:
+    """
+    The suite logs in far more often than a client is allowed to, tests of
+    the limits turn them back on.
+    """
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(settings, "RATE_LIMIT_ENABLED", False)
+        yield
+
+
 @pytest.fixture(scope="module")
 def client() -> Generator[TestClient, None, None]:
     with TestClient(app) as c:
@@ -40,3 +53,12 @@ def normal_user_token_headers(client: TestClient, db: Session) -> dict[str, str]
     return authentication_token_from_email(
         client=client, email=settings.EMAIL_TEST_USER, db=db
     )
+
+
+@pytest.fixture()
+def smtp_server() -> Generator[Callable[[Sink], Controller], None, None]:
+    """
+    Starts local SMTP servers the email settings point at, the last one wins.
+    """
+    with smtp_servers() as start:
+        yield start
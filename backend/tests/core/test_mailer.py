@@ -0,0 +1,125 @@
+import time
+from collections.abc import Callable
+from typing import Any
+
+from aiosmtpd.controller import Controller
+
+from app.core.config import settings
+from app.core.mailer import Mailer
+from tests.utils.smtp import Sink
+
+
+def _mailer(**kwargs: Any) -> Mailer:
+    options: dict[str, Any] = {
+        "max_queue": 100,
+        "batch_size": 10,
+        "max_attempts": 3,
+        "backoff": 0.01,
+        "backoff_max": 0.05,
+        "idle_seconds": 5,
+    }
+    return Mailer(**options | kwargs)
+
+
+def _wait_for(condition: Callable[[], bool], timeout: float = 5) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_mailer_sends_on_one_connection(
+    smtp_server: Callable[[Sink], Controller],
+) -> None:
+    sink = Sink()
+    smtp_server(sink)
+    mailer = _mailer()
+    for i in range(5):
+        assert mailer.send(f"user{i}@example.com", subject="Hi", html_content="<p/>")
+    _wait_for(lambda: len(sink.received) == 5)
+    for i in range(5, 8):
+        assert mailer.send(f"user{i}@example.com", subject="Hi", html_content="<p/>")
+    mailer.close(timeout=5)
+
+    assert len(sink.received) == 8
+    assert len({peer for peer, _ in sink.received}) == 1
+    envelope = sink.received[0][1]
+    assert envelope.rcpt_tos == ["user0@example.com"]
+    assert envelope.mail_from == settings.EMAILS_FROM_EMAIL
+    assert b"Subject: Hi" in envelope.original_content
+
+
+def test_mailer_retries_temporary_failures(
+    smtp_server: Callable[[Sink], Controller],
+) -> None:
+    sink = Sink(replies=["451 Try again later", "451 Try again later"])
+    smtp_server(sink)
+    mailer = _mailer()
+    mailer.send("retry@example.com", subject="Retry", html_content="<p/>")
+    mailer.close(timeout=5)
+    assert [envelope.rcpt_tos for _, envelope in sink.received] == [
+        ["retry@example.com"]
+    ]
+
+
+def test_mailer_gives_up_on_permanent_failures(
+    smtp_server: Callable[[Sink], Controller],
+) -> None:
+    sink = Sink(replies=["550 No such user"])
+    smtp_server(sink)
+    mailer = _mailer()
+    mailer.send("refused@example.com", subject="Refused", html_content="<p/>")
+    mailer.send("accepted@example.com", subject="Accepted", html_content="<p/>")
+    mailer.close(timeout=5)
+    assert [envelope.rcpt_tos for _, envelope in sink.received] == [
+        ["accepted@example.com"]
+    ]
+    assert sink.replies == []
+
+
+def test_mailer_gives_up_after_max_attempts(
+    smtp_server: Callable[[Sink], Controller],
+) -> None:
+    sink = Sink(replies=["451 Try again later"] * 3)
+    smtp_server(sink)
+    mailer = _mailer(max_attempts=2)
+    mailer.send("lost@example.com", subject="Lost", html_content="<p/>")
+    mailer.close(timeout=5)
+    assert sink.received == []
+    assert len(sink.replies) == 1
+
+
+def test_mailer_reconnects_after_server_restart(
+    smtp_server: Callable[[Sink], Controller],
+) -> None:
+    first = Sink()
+    controller = smtp_server(first)
+    mailer = _mailer()
+    mailer.send("first@example.com", subject="First", html_content="<p/>")
+    _wait_for(lambda: len(first.received) == 1)
+    # Drops the connection the mailer keeps open
+    controller.stop()
+
+    second = Sink()
+    smtp_server(second)
+    mailer.send("second@example.com", subject="Second", html_content="<p/>")
+    mailer.close(timeout=5)
+    assert [envelope.rcpt_tos for _, envelope in second.received] == [
+        ["second@example.com"]
+    ]
+
+
+def test_mailer_drops_emails_when_queue_is_full(
+    smtp_server: Callable[[Sink], Controller],
+) -> None:
+    sink = Sink(delay=0.5)
+    smtp_server(sink)
+    mailer = _mailer(max_queue=1, batch_size=1)
+    sent = [
+        mailer.send(f"user{i}@example.com", subject="Hi", html_content="<p/>")
+        for i in range(3)
+    ]
+    mailer.close(timeout=5)
+    assert sent[0] is True
+    assert False in sent
+    assert len(sink.received) == sent.count(True)
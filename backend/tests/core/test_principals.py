@@ -0,0 +1,44 @@
+from sqlmodel import Session
+
+from app import crud
+from app.core.cache import MemoryBackend
+from app.core.principals import PrincipalCache, principal_cache
+from app.models import UserUpdate
+from tests.utils.user import create_random_user
+
+
+def test_principal_cache_hit_returns_session_bound_user(db: Session) -> None:
+    user = create_random_user(db)
+    cache = PrincipalCache(maxsize=10, ttl=60)
+    assert cache.get(db, user.id) is None
+    cache.set(user)
+    cached = cache.get(db, user.id)
+    assert cached is not None
+    assert cached.id == user.id
+    assert cached.email == user.email
+    assert cached in db
+    assert cache.stats().hits == 1
+    assert cache.stats().misses == 1
+
+
+def test_principal_cache_shared_backend(db: Session) -> None:
+    user = create_random_user(db)
+    backend = MemoryBackend()
+    writer = PrincipalCache(maxsize=10, ttl=60, backend=backend)
+    reader = PrincipalCache(maxsize=10, ttl=60, backend=backend)
+    writer.set(user)
+    assert "hashed_password" not in (backend.get(f"principal:{user.id}") or "")
+    cached = reader.get(db, user.id)
+    assert cached is not None
+    # Not cached, loaded from the database
+    assert cached.hashed_password == user.hashed_password
+    assert cached.created_at == user.created_at
+    writer.invalidate(user.id)
+    assert reader.get(db, user.id) is None
+
+
+def test_update_user_invalidates_principal(db: Session) -> None:
+    user = create_random_user(db)
+    principal_cache.set(user)
+    crud.update_user(session=db, db_user=user, user_in=UserUpdate(is_active=False))
+    assert principal_cache.get(db, user.id) is None
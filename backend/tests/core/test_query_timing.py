@@ -0,0 +1,28 @@
+from app.core.db import QueryStats
+from app.core.query_timing import SlowQueryLog, server_timing
+
+
+def test_slow_query_log_keeps_slowest_pairs() -> None:
+    log = SlowQueryLog(size=2)
+    log.record("GET /a", "SELECT 1", 0.001)
+    log.record("GET /a", "SELECT 1", 0.003)
+    log.record("GET /b", "SELECT 2", 0.002)
+    log.record("GET /c", "SELECT 3", 0.0005)
+    log.record("GET /d", "SELECT 4", 0.01)
+
+    top = log.top(10)
+    assert [(e.route, e.statement) for e in top] == [
+        ("GET /d", "SELECT 4"),
+        ("GET /a", "SELECT 1"),
+    ]
+    assert top[1].count == 2
+    assert top[1].max_ms == 3
+
+
+def test_server_timing() -> None:
+    stats = QueryStats()
+    assert server_timing(stats) == 'db;dur=0.00;desc="0 queries"'
+    stats.record("SELECT 1", 0.002)
+    stats.record("SELECT 2", 0.001)
+    assert stats.slowest_statement == "SELECT 1"
+    assert server_timing(stats) == 'db;dur=3.00;desc="2 queries", db-slowest;dur=2.00'
@@ -0,0 +1,45 @@
+from unittest.mock import patch
+
+from app.core.cache import MemoryBackend, TTLCache
+from app.core.ratelimit import RateLimiter
+
+
+def test_rate_limiter_rejects_over_limit() -> None:
+    limiter = RateLimiter("test", limit=3, window=60, maxsize=10)
+    with patch("app.core.ratelimit.time.time", return_value=6000.0):
+        assert [limiter.hit("a") for _ in range(3)] == [None] * 3
+        assert limiter.hit("a") == 60
+        assert limiter.hit("b") is None
+
+
+def test_rate_limiter_slides_over_previous_window() -> None:
+    limiter = RateLimiter("test", limit=4, window=60, maxsize=10)
+    with patch("app.core.ratelimit.time.time", return_value=6000.0):
+        for _ in range(4):
+            assert limiter.hit("a") is None
+    # A quarter into the next window, three quarters of the previous hits count
+    with patch("app.core.ratelimit.time.time", return_value=6075.0):
+        assert limiter.hit("a") is None
+        assert limiter.hit("a") == 45
+    with patch("app.core.ratelimit.time.time", return_value=6180.0):
+        assert limiter.hit("a") is None
+
+
+def test_rate_limiter_shared_backend() -> None:
+    backend = MemoryBackend()
+    first = RateLimiter("test", limit=2, window=60, maxsize=10, backend=backend)
+    second = RateLimiter("test", limit=2, window=60, maxsize=10, backend=backend)
+    with patch("app.core.ratelimit.time.time", return_value=6000.0):
+        assert first.hit("a") is None
+        assert second.hit("a") is None
+        assert first.hit("a") is not None
+
+
+def test_ttl_cache_incr() -> None:
+    cache: TTLCache[str, int] = TTLCache(maxsize=2, ttl=60)
+    assert cache.incr("a") == 1
+    assert cache.incr("a") == 2
+    cache.incr("b")
+    cache.incr("c")
+    assert cache.get("a") is None
+    assert cache.incr("a") == 1
@@ -0,0 +1,219 @@
+import uuid
+from collections import Counter
+from collections.abc import Generator
+from typing import Any
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import Engine, event
+from sqlalchemy.exc import OperationalError
+from sqlmodel import create_engine, select
+
+from app.api import deps
+from app.core.cache import MemoryBackend
+from app.core.config import settings
+from app.core.db import engine
+from app.core.replicas import RecentWrites, ReplicaRouter, RoutingSession
+from app.models import Item, User
+
+
+@pytest.fixture()
+def replica() -> Generator[Engine, None, None]:
+    # A second engine on the test database stands in for a replica
+    replica = create_engine(str(settings.SQLALCHEMY_DATABASE_URI))
+    yield replica
+    replica.dispose()
+
+
+@pytest.fixture()
+def counts(replica: Engine) -> Generator[Counter[Engine], None, None]:
+    """
+    Statements run on the primary and on the replica.
+    """
+    counts: Counter[Engine] = Counter()
+
+    def on(counted: Engine) -> Any:
+        def count(*_: Any) -> None:
+            counts[counted] += 1
+
+        return count
+
+    listeners = [(counted, on(counted)) for counted in (engine, replica)]
+    for counted, listener in listeners:
+        event.listen(counted, "before_cursor_execute", listener)
+    yield counts
+    for counted, listener in listeners:
+        event.remove(counted, "before_cursor_execute", listener)
+
+
+def test_replica_router_round_robin_skips_ejected() -> None:
+    first, second = create_engine("sqlite://"), create_engine("sqlite://")
+    router = ReplicaRouter([first, second], eject_seconds=60)
+    assert [router.choose() for _ in range(4)] == [first, second, first, second]
+    router.eject(first)
+    assert [router.choose() for _ in range(3)] == [second, second, second]
+    router.eject(second)
+    assert router.choose() is None
+
+
+def test_replica_router_ejects_unreachable_replica() -> None:
+    unreachable = create_engine(
+        "postgresql+psycopg://postgres@127.0.0.1:1/app",
+        connect_args={"connect_timeout": 1},
+    )
+    router = ReplicaRouter([unreachable], eject_seconds=60)
+    with pytest.raises(OperationalError):
+        unreachable.connect()
+    assert not router.is_healthy(unreachable)
+    assert router.choose() is None
+
+
+def test_replica_router_readmits_after_eject_seconds() -> None:
+    replica = create_engine("sqlite://")
+    router = ReplicaRouter([replica], eject_seconds=0)
+    router.eject(replica)
+    assert router.choose() is replica
+
+
+def test_recent_writes_expire() -> None:
+    recent_writes = RecentWrites(maxsize=10, ttl=60)
+    user_id = uuid.uuid4()
+    assert user_id not in recent_writes
+    recent_writes.mark(user_id)
+    assert user_id in recent_writes
+    assert user_id not in RecentWrites(maxsize=10, ttl=60)
+
+    expired = RecentWrites(maxsize=10, ttl=0)
+    expired.mark(user_id)
+    assert user_id not in expired
+
+
+def test_recent_writes_shared_backend() -> None:
+    backend = MemoryBackend()
+    writer = RecentWrites(maxsize=10, ttl=60, backend=backend)
+    reader = RecentWrites(maxsize=10, ttl=60, backend=backend)
+    user_id = uuid.uuid4()
+    writer.mark(user_id)
+    assert user_id in reader
+
+
+def test_routing_session_reads_from_replica(
+    replica: Engine, counts: Counter[Engine]
+) -> None:
+    user_id = uuid.uuid4()
+    with RoutingSession(
+        engine,
+        replicas=ReplicaRouter([replica], eject_seconds=60),
+        recent_writes=RecentWrites(maxsize=10, ttl=60),
+        read_only=True,
+        user_id=lambda: user_id,
+    ) as session:
+        session.exec(select(User).limit(1)).all()
+        session.exec(select(Item).limit(1)).all()
+        assert counts == {replica: 2}
+        session.exec(select(User).limit(1).with_for_update()).all()
+        assert counts == {replica: 2, engine: 1}
+
+
+def test_routing_session_writes_go_to_primary(
+    replica: Engine, counts: Counter[Engine]
+) -> None:
+    user_id = uuid.uuid4()
+    recent_writes = RecentWrites(maxsize=10, ttl=60)
+    with RoutingSession(
+        engine,
+        replicas=ReplicaRouter([replica], eject_seconds=60),
+        recent_writes=recent_writes,
+        read_only=False,
+        user_id=lambda: user_id,
+    ) as session:
+        session.exec(select(User).limit(1)).all()
+        user = User(email=f"{uuid.uuid4().hex}@example.com", hashed_password="x")
+        session.add(user)
+        session.commit()
+        assert replica not in counts
+        assert user_id in recent_writes
+        session.delete(user)
+        session.commit()
+
+
+def test_routing_session_flushes_go_to_primary(
+    replica: Engine, counts: Counter[Engine]
+) -> None:
+    with RoutingSession(
+        engine,
+        replicas=ReplicaRouter([replica], eject_seconds=60),
+        recent_writes=RecentWrites(maxsize=10, ttl=60),
+        read_only=True,
+        user_id=lambda: None,
+    ) as session:
+        session.add(User(email=f"{uuid.uuid4().hex}@example.com", hashed_password="x"))
+        session.flush()
+        assert replica not in counts
+        assert counts[engine] == 1
+        session.rollback()
+
+
+def test_routing_session_reads_own_writes_from_primary(
+    replica: Engine, counts: Counter[Engine]
+) -> None:
+    user_id = uuid.uuid4()
+    recent_writes = RecentWrites(maxsize=10, ttl=60)
+    recent_writes.mark(user_id)
+    with RoutingSession(
+        engine,
+        replicas=ReplicaRouter([replica], eject_seconds=60),
+        recent_writes=recent_writes,
+        read_only=True,
+        user_id=lambda: user_id,
+    ) as session:
+        session.exec(select(User).limit(1)).all()
+    assert counts == {engine: 1}
+
+
+def test_routing_session_falls_back_to_primary(
+    replica: Engine, counts: Counter[Engine]
+) -> None:
+    router = ReplicaRouter([replica], eject_seconds=60)
+    router.eject(replica)
+    with RoutingSession(
+        engine,
+        replicas=router,
+        recent_writes=RecentWrites(maxsize=10, ttl=60),
+        read_only=True,
+        user_id=lambda: None,
+    ) as session:
+        session.exec(select(User).limit(1)).all()
+    assert counts == {engine: 1}
+
+
+def test_get_routes_read_from_replica_until_written(
+    client: TestClient,
+    normal_user_token_headers: dict[str, str],
+    replica: Engine,
+    counts: Counter[Engine],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(deps, "replicas", ReplicaRouter([replica], eject_seconds=60))
+    monkeypatch.setattr(deps, "recent_writes", RecentWrites(maxsize=10, ttl=60))
+
+    r = client.get(f"{settings.API_V1_STR}/items/", headers=normal_user_token_headers)
+    assert r.status_code == 200
+    assert engine not in counts
+    replica_reads = counts[replica]
+    assert replica_reads > 0
+
+    r = client.post(
+        f"{settings.API_V1_STR}/items/",
+        headers=normal_user_token_headers,
+        json={"title": "Written to the primary"},
+    )
+    assert r.status_code == 200
+    assert counts[replica] == replica_reads
+
+    r = client.get(
+        f"{settings.API_V1_STR}/items/{r.json()['id']}",
+        headers=normal_user_token_headers,
+    )
+    assert r.status_code == 200
+    assert counts[replica] == replica_reads
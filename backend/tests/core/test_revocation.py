@@ -0,0 +1,68 @@
+import logging
+import multiprocessing
+import uuid
+
+import pytest
+from sqlmodel import Session
+
+from app import crud
+from app.core.cache import MemoryBackend
+from app.core.revocation import (
+    TokenRevocations,
+    token_revocations,
+    warn_if_not_shared,
+)
+from app.models import UserUpdate
+from tests.utils.user import create_random_user
+
+
+def test_token_revocations_reject_older_versions() -> None:
+    revocations = TokenRevocations(maxsize=10, ttl=60)
+    user_id = uuid.uuid4()
+    assert not revocations.is_revoked(user_id, 0)
+    revocations.revoke(user_id, 2)
+    assert revocations.is_revoked(user_id, 1)
+    assert not revocations.is_revoked(user_id, 2)
+
+
+def test_token_revocations_shared_backend() -> None:
+    backend = MemoryBackend()
+    writer = TokenRevocations(maxsize=10, ttl=60, backend=backend)
+    reader = TokenRevocations(maxsize=10, ttl=60, backend=backend)
+    user_id = uuid.uuid4()
+    writer.revoke(user_id, 1)
+    assert reader.is_revoked(user_id, 0)
+
+
+def test_warn_if_not_shared_in_worker_process(
+    monkeypatch: pytest.MonkeyPatch, caplog: pytest.LogCaptureFixture
+) -> None:
+    # Workers started by `fastapi run --workers N` have a parent process
+    monkeypatch.setattr(multiprocessing, "parent_process", lambda: object())
+    with caplog.at_level(logging.WARNING, logger="app.core.revocation"):
+        warn_if_not_shared(TokenRevocations(maxsize=10, ttl=60))
+        assert "CACHE_REDIS_URL" in caplog.text
+        caplog.clear()
+        warn_if_not_shared(
+            TokenRevocations(maxsize=10, ttl=60, backend=MemoryBackend())
+        )
+        assert not caplog.text
+
+
+def test_warn_if_not_shared_single_process(caplog: pytest.LogCaptureFixture) -> None:
+    with caplog.at_level(logging.WARNING, logger="app.core.revocation"):
+        warn_if_not_shared(TokenRevocations(maxsize=10, ttl=60))
+    assert not caplog.text
+
+
+def test_update_user_revokes_only_on_claim_changes(db: Session) -> None:
+    user = create_random_user(db)
+    crud.update_user(
+        session=db, db_user=user, user_in=UserUpdate(full_name="Same claims")
+    )
+    assert user.token_version == 0
+    assert not token_revocations.is_revoked(user.id, 0)
+
+    crud.update_user(session=db, db_user=user, user_in=UserUpdate(is_superuser=True))
+    assert user.token_version == 1
+    assert token_revocations.is_revoked(user.id, 0)
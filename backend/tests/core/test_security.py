@@ -0,0 +1,46 @@
+import threading
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.core.security import HashingPool, HashingPoolSaturated, hashing_pool
+
+
+def test_hashing_pool_rejects_when_saturated() -> None:
+    pool = HashingPool(max_workers=1, max_queue=0, retry_after=3)
+    release = threading.Event()
+    started = threading.Event()
+
+    def block() -> str:
+        started.set()
+        release.wait(5)
+        return "done"
+
+    worker = threading.Thread(target=pool.run, args=(block,))
+    worker.start()
+    started.wait(5)
+    with pytest.raises(HashingPoolSaturated) as exc_info:
+        pool.run(str.upper, "x")
+    assert exc_info.value.retry_after == 3
+    release.set()
+    worker.join()
+
+    assert pool.run(str.upper, "x") == "X"
+    stats = pool.stats()
+    assert stats.completed == 2
+    assert stats.rejected == 1
+    assert stats.in_flight == 0
+
+
+def test_login_returns_503_when_hashing_pool_saturated(client: TestClient) -> None:
+    with patch.object(
+        hashing_pool, "run", side_effect=HashingPoolSaturated(retry_after=2)
+    ):
+        r = client.post(
+            f"{settings.API_V1_STR}/login/access-token",
+            data={"username": "nobody@example.com", "password": "whatever12"},
+        )
+    assert r.status_code == 503
+    assert r.headers["Retry-After"] == "2"
@@ -0,0 +1,26 @@
+from sqlmodel import Session
+
+from app import crud
+from app.models import DepCreate, EmpCreate
+from tests.utils.user import create_random_user
+from tests.utils.utils import random_email, random_lower_string
+
+
+def test_create_emp_copies_department_name(db: Session) -> None:
+    user = create_random_user(db)
+    department = crud.create_dep(
+        session=db,
+        dep_in=DepCreate(dep_name="Finance", dep_code=random_lower_string()),
+        depuserid=user.id,
+    )
+    emp = crud.create_emp(
+        session=db,
+        emp_in=EmpCreate(
+            workemail=random_email(),
+            name="Copied",
+            mobile_number="0123456789",
+            depemp_id=department.dep_id,
+        ),
+        emp_id=user.id,
+    )
+    assert emp.dep_name == "Finance"
@@ -3,6 +3,8 @@ from pwdlib.hashers.bcrypt import BcryptHasher
 from sqlmodel import Session
 
 from app import crud
+from app.core.db import engine
+from app.core.revocation import token_revocations
 from app.core.security import verify_password
 from app.models import User, UserCreate, UserUpdate
 from tests.utils.utils import random_email, random_lower_string
@@ -93,6 +95,43 @@ def test_update_user(db: Session) -> None:
     assert verified
 
 
+def test_update_user_bumps_token_version_of_stale_user(db: Session) -> None:
+    user = crud.create_user(
+        session=db,
+        user_create=UserCreate(email=random_email(), password=random_lower_string()),
+    )
+    # Another worker revokes the user's tokens after `user` was loaded
+    with Session(engine) as other:
+        other_user = other.get(User, user.id)
+        assert other_user
+        crud.update_user(
+            session=other,
+            db_user=other_user,
+            user_in=UserUpdate(password=random_lower_string()),
+        )
+    assert user.token_version == 0
+    crud.update_user(
+        session=db, db_user=user, user_in=UserUpdate(password=random_lower_string())
+    )
+    assert user.token_version == 2
+    assert token_revocations.min_version(user.id) == 2
+
+
+def test_deactivate_user_bumps_token_version_in_database(db: Session) -> None:
+    user = crud.create_user(
+        session=db,
+        user_create=UserCreate(email=random_email(), password=random_lower_string()),
+    )
+    with Session(engine) as other:
+        other.exec(crud.bump_token_version(user.id))
+        other.commit()
+    crud.deactivate_user(session=db, db_user=user)
+    db.refresh(user)
+    assert not user.is_active
+    assert user.token_version == 2
+    assert token_revocations.min_version(user.id) == 2
+
+
 def test_authenticate_user_with_bcrypt_upgrades_to_argon2(db: Session) -> None:
     """Test that a user with bcrypt password hash gets upgraded to argon2 on login."""
     email = random_email()
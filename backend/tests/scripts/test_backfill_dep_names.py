@@ -0,0 +1,38 @@
+import uuid
+
+from sqlmodel import Session, col, update
+
+from app.backfill_dep_names import backfill
+from app.models import Dep, Emp
+from tests.utils.user import create_random_user
+from tests.utils.utils import random_email, random_lower_string
+
+
+def test_backfill_repairs_stale_dep_names(db: Session) -> None:
+    user = create_random_user(db)
+    dep = Dep(dep_name="Current", dep_code=random_lower_string(), depuserid=user.id)
+    db.add(dep)
+    db.commit()
+    emps = [
+        Emp(
+            workemail=random_email(),
+            name=f"Emp {i}",
+            mobile_number="0123456789",
+            emp_id=user.id,
+            depemp_id=dep.dep_id,
+            dep_name="Current",
+        )
+        for i in range(5)
+    ]
+    db.add_all(emps)
+    db.commit()
+    stale_ids: list[uuid.UUID] = [emp.empcode for emp in emps[:3]]
+    db.exec(update(Emp).where(col(Emp.empcode).in_(stale_ids)).values(dep_name="Old"))
+    db.commit()
+
+    assert backfill(db, batch_size=2) >= 3
+
+    for emp in emps:
+        db.refresh(emp)
+        assert emp.dep_name == "Current"
+    assert backfill(db, batch_size=2) == 0
@@ -0,0 +1,74 @@
+import argparse
+import asyncio
+import uuid
+
+import httpx
+from sqlmodel import Session, select
+
+from app.main import app
+from app.models import Emp, User
+from benchmarks.email_templates import run as run_email_templates
+from benchmarks.run import login, run_scenario, scenarios
+from benchmarks.search import run as run_search
+from benchmarks.seed import seed
+from benchmarks.serialization import run as run_serialization
+
+
+def test_seed_and_run_scenario(db: Session) -> None:
+    users = seed(
+        db,
+        users=1,
+        deps_per_user=2,
+        emps_per_user=3,
+        items_per_user=2,
+        run_id=uuid.uuid4().hex[:8],
+    )
+    user = db.exec(select(User).where(User.email == users[0].email)).one()
+    emps = db.exec(select(Emp).where(Emp.emp_id == user.id)).all()
+    assert len(emps) == 3
+    assert all(emp.dep_name for emp in emps)
+
+    async def run() -> None:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://test"
+        ) as client:
+            token = (await login(client, users[0])).json()["access_token"]
+            request = scenarios(users, [{"Authorization": f"Bearer {token}"}])["emps"]
+            result = await run_scenario(
+                client, request, requests=6, concurrency=2, count_statements=True
+            )
+        assert result.requests == 6
+        assert result.errors == 0
+        assert result.p50_ms <= result.p99_ms
+        assert result.statements_per_request is not None
+
+    asyncio.run(run())
+
+
+def test_serialization_benchmark() -> None:
+    args = argparse.Namespace(size=5, number=2, repeat=1)
+    results = run_serialization(args)
+    assert set(results["serializers"]) == {"items", "emps"}
+    for result in results["serializers"].values():
+        assert result["fast_json_ms"] > 0
+        assert result["response_model_ms"] > 0
+
+
+def test_email_templates_benchmark() -> None:
+    args = argparse.Namespace(number=2, repeat=1)
+    results = run_email_templates(args)
+    assert set(results["emails"]) == {"reset_password", "new_account"}
+    for result in results["emails"].values():
+        assert result["uncached_ms"] > 0
+        assert result["cached_ms"] > 0
+
+
+def test_search_benchmark() -> None:
+    args = argparse.Namespace(rows=50, users=2, limit=10, repeat=1)
+    results = run_search(args)
+    assert set(results["queries"]) >= {"common word (own)", "rare word (all)"}
+    common = results["queries"]["common word (all)"]
+    assert 0 < common["items_search"]["rows"] <= 10
+    assert 0 < common["emps_search"]["rows"] <= 10
+    assert results["queries"]["rare word (all)"]["items_search"]["rows"] >= 1
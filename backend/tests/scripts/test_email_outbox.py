@@ -0,0 +1,173 @@
+from collections.abc import Callable, Generator
+from datetime import datetime
+from email import message_from_bytes, policy
+from unittest.mock import patch
+
+import pytest
+from aiosmtpd.controller import Controller
+from fastapi.testclient import TestClient
+from sqlmodel import Session, delete, select
+
+from app import crud
+from app.core.config import settings
+from app.core.db import engine
+from app.email_outbox import claim_batch, dispatch_batch, main
+from app.models import EmailOutbox
+from tests.utils.smtp import Sink
+from tests.utils.utils import random_email, random_lower_string
+
+
+@pytest.fixture()
+def outbox(db: Session) -> Generator[None, None, None]:
+    """
+    An empty outbox, so the dispatcher only sees the emails of the test.
+    """
+    db.exec(delete(EmailOutbox))
+    db.commit()
+    yield
+    db.exec(delete(EmailOutbox))
+    db.commit()
+
+
+def _enqueue(db: Session, count: int = 1) -> list[EmailOutbox]:
+    emails = [
+        crud.enqueue_email(
+            session=db,
+            email_to=(email := random_email()),
+            template="test_email",
+            context={"email_to": email},
+        )
+        for _ in range(count)
+    ]
+    db.commit()
+    return emails
+
+
+@pytest.mark.usefixtures("outbox")
+def test_create_user_writes_outbox_in_transaction(
+    client: TestClient,
+    superuser_token_headers: dict[str, str],
+    db: Session,
+    smtp_server: Callable[[Sink], Controller],
+) -> None:
+    sink = Sink()
+    smtp_server(sink)
+    username = random_email()
+    r = client.post(
+        f"{settings.API_V1_STR}/users/",
+        headers=superuser_token_headers,
+        json={"email": username, "password": random_lower_string()},
+    )
+    assert r.status_code == 200
+    assert sink.received == []
+    email = db.exec(select(EmailOutbox).where(EmailOutbox.email_to == username)).one()
+    assert email.status == "pending"
+    assert email.template == "new_account"
+    assert "password" not in email.context
+
+    with Session(engine) as session:
+        assert dispatch_batch(session, batch_size=10) == 1
+    db.refresh(email)
+    assert email.status == "sent"
+    assert email.attempts == 1
+    assert isinstance(email.sent_at, datetime)
+    assert email.context == {}
+    [(_, envelope)] = sink.received
+    assert envelope.rcpt_tos == [username]
+    message = message_from_bytes(envelope.original_content, policy=policy.default)
+    assert message["Subject"].endswith(f"New account for user {username}")
+
+
+@pytest.mark.usefixtures("outbox")
+def test_recover_password_writes_outbox(
+    client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+) -> None:
+    r = client.post(
+        f"{settings.API_V1_STR}/password-recovery/{settings.EMAIL_TEST_USER}",
+        headers=normal_user_token_headers,
+    )
+    assert r.status_code == 200
+    email = db.exec(
+        select(EmailOutbox).where(EmailOutbox.email_to == settings.EMAIL_TEST_USER)
+    ).one()
+    assert email.template == "reset_password"
+    assert email.context["token"]
+
+
+@pytest.mark.usefixtures("outbox")
+def test_dispatch_sends_batch_on_one_connection(
+    db: Session, smtp_server: Callable[[Sink], Controller]
+) -> None:
+    sink = Sink()
+    smtp_server(sink)
+    emails = _enqueue(db, 5)
+    with Session(engine) as session:
+        assert dispatch_batch(session, batch_size=3) == 3
+        assert dispatch_batch(session, batch_size=3) == 2
+        assert dispatch_batch(session, batch_size=3) == 0
+    assert sorted(envelope.rcpt_tos[0] for _, envelope in sink.received) == sorted(
+        email.email_to for email in emails
+    )
+    peers = [peer for peer, _ in sink.received]
+    assert len(set(peers[:3])) == 1
+    assert len(set(peers)) == 2
+
+
+@pytest.mark.usefixtures("outbox")
+def test_dispatchers_skip_locked_rows(db: Session) -> None:
+    emails = _enqueue(db, 4)
+    with Session(engine) as first, Session(engine) as second:
+        claimed = {email.id for email in claim_batch(first, 2)}
+        others = {email.id for email in claim_batch(second, 10)}
+        assert len(claimed) == 2
+        assert others == {email.id for email in emails} - claimed
+        first.rollback()
+        second.rollback()
+
+
+@pytest.mark.usefixtures("outbox")
+def test_dispatch_retries_temporary_failures(
+    db: Session, smtp_server: Callable[[Sink], Controller]
+) -> None:
+    sink = Sink(replies=["451 Try again later", "550 No such user"])
+    smtp_server(sink)
+    retried, refused, sent = _enqueue(db, 3)
+    with Session(engine) as session:
+        assert dispatch_batch(session, batch_size=10) == 3
+        # The retried email is not due yet
+        assert dispatch_batch(session, batch_size=10) == 0
+    for email in (retried, refused, sent):
+        db.refresh(email)
+        assert email.attempts == 1
+    assert retried.status == "pending"
+    assert retried.available_at > retried.created_at
+    assert "451" in (retried.last_error or "")
+    assert refused.status == "failed"
+    assert refused.context == {}
+    assert retried.context
+    assert sent.status == "sent"
+
+
+@pytest.mark.usefixtures("outbox")
+def test_dispatch_keeps_emails_when_smtp_is_down(
+    db: Session, smtp_server: Callable[[Sink], Controller]
+) -> None:
+    smtp_server(Sink()).stop()
+    emails = _enqueue(db, 2)
+    with Session(engine) as session:
+        assert dispatch_batch(session, batch_size=10) == 2
+    for email in emails:
+        db.refresh(email)
+        assert email.status == "pending"
+        assert email.attempts == 1
+        assert email.context
+
+
+def test_dispatcher_without_smtp_exits_cleanly() -> None:
+    with (
+        patch.object(settings, "SMTP_HOST", None),
+        patch("sys.argv", ["email_outbox", "--once"]),
+        patch("app.email_outbox.dispatch_batch") as dispatch,
+    ):
+        main()
+    dispatch.assert_not_called()
@@ -0,0 +1,74 @@
+import asyncio
+import socket
+from collections.abc import Callable, Generator
+from contextlib import contextmanager
+from typing import Any
+from unittest.mock import patch
+
+from aiosmtpd.controller import Controller
+from aiosmtpd.smtp import SMTP, Envelope, Session
+
+from app.core.config import settings
+
+
+class Sink:
+    """
+    SMTP server handler keeping the emails it accepts, answering DATA with
+    the replies in `replies` first.
+    """
+
+    def __init__(self, replies: list[str] | None = None, delay: float = 0) -> None:
+        self.replies = replies or []
+        self.delay = delay
+        self.received: list[tuple[Any, Envelope]] = []
+
+    async def handle_DATA(
+        self, server: SMTP, session: Session, envelope: Envelope
+    ) -> str:
+        await asyncio.sleep(self.delay)
+        if self.replies:
+            return self.replies.pop(0)
+        self.received.append((session.peer, envelope))
+        return "250 OK"
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port: int = s.getsockname()[1]
+        return port
+
+
+@contextmanager
+def smtp_servers() -> Generator[Callable[[Sink], Controller], None, None]:
+    """
+    Starts an SMTP server on localhost for a handler and points the email
+    settings at it.
+    """
+    controllers: list[Controller] = []
+    patchers: list[Any] = []
+
+    def start(sink: Sink) -> Controller:
+        controller = Controller(sink, hostname="127.0.0.1", port=_free_port())
+        controller.start()
+        controllers.append(controller)
+        for name, value in {
+            "SMTP_HOST": "127.0.0.1",
+            "SMTP_PORT": controller.port,
+            "SMTP_TLS": False,
+            "SMTP_SSL": False,
+            "SMTP_USER": None,
+        }.items():
+            patcher = patch.object(settings, name, value)
+            patcher.start()
+            patchers.append(patcher)
+        return controller
+
+    try:
+        yield start
+    finally:
+        for patcher in patchers:
+            patcher.stop()
+        for controller in controllers:
+            if not controller.loop.is_closed():
+                controller.stop()
@@ -444,6 +444,18 @@ export const PrivateUserCreateSchema = {
     title: 'PrivateUserCreate'
 } as const;
 
+export const RefreshTokenRequestSchema = {
+    properties: {
+        refresh_token: {
+            type: 'string',
+            title: 'Refresh Token'
+        }
+    },
+    type: 'object',
+    required: ['refresh_token'],
+    title: 'RefreshTokenRequest'
+} as const;
+
 export const TokenSchema = {
     properties: {
         access_token: {
@@ -454,6 +466,17 @@ export const TokenSchema = {
             type: 'string',
             title: 'Token Type',
             default: 'bearer'
+        },
+        refresh_token: {
+            anyOf: [
+                {
+                    type: 'string'
+                },
+                {
+                    type: 'null'
+                }
+            ],
+            title: 'Refresh Token'
         }
     },
     type: 'object',
@@ -112,9 +112,14 @@ export type PrivateUserCreate = {
     is_verified?: boolean;
 };
 
+export type RefreshTokenRequest = {
+    refresh_token: string;
+};
+
 export type Token = {
     access_token: string;
     token_type?: string;
+    refresh_token?: (string | null);
 };
 
 export type UpdatePassword = {
@@ -276,6 +281,12 @@ export type LoginLoginAccessTokenData = {
 
 export type LoginLoginAccessTokenResponse = (Token);
 
+export type LoginRefreshAccessTokenData = {
+    requestBody: RefreshTokenRequest;
+};
+
+export type LoginRefreshAccessTokenResponse = (Token);
+
 export type LoginTestTokenResponse = (UserPublic);
 
 export type LoginRecoverPasswordData = {
@@ -329,7 +340,7 @@ export type UsersUpdatePasswordMeData = {
     requestBody: UpdatePassword;
 };
 
-export type UsersUpdatePasswordMeResponse = (Message);
+export type UsersUpdatePasswordMeResponse = (Token);
 
 export type UsersRegisterUserData = {
     requestBody: UserRegister;
@@ -54,7 +54,12 @@ const ChangePassword = () => {
   const mutation = useMutation({
     mutationFn: (data: UpdatePassword) =>
       UsersService.updatePasswordMe({ requestBody: data }),
-    onSuccess: () => {
+    onSuccess: (tokens) => {
+      // The tokens held so far were revoked with the old password
+      localStorage.setItem("access_token", tokens.access_token)
+      if (tokens.refresh_token) {
+        localStorage.setItem("refresh_token", tokens.refresh_token)
+      }
       showSuccessToast("Password updated successfully")
       form.reset()
     },
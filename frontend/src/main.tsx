@@ -7,20 +7,61 @@ import {
 import { createRouter, RouterProvider } from "@tanstack/react-router"
 import { StrictMode } from "react"
 import ReactDOM from "react-dom/client"
-import { ApiError, OpenAPI } from "./client"
+import { ApiError, OpenAPI, type Token } from "./client"
 import { ThemeProvider } from "./components/theme-provider"
 import { Toaster } from "./components/ui/sonner"
 import "./index.css"
 import { routeTree } from "./routeTree.gen"
 
 OpenAPI.BASE = import.meta.env.VITE_API_URL
+// Access tokens are short-lived, renew them with the refresh token shortly
+// before they expire
+let refreshing: Promise<string> | null = null
+
+const expiresSoon = (token: string) => {
+  try {
+    const payload = token.split(".")[1].replace(/-/g, "+").replace(/_/g, "/")
+    const { exp } = JSON.parse(atob(payload))
+    return exp * 1000 - Date.now() < 30_000
+  } catch {
+    return false
+  }
+}
+
+const refreshAccessToken = async (refreshToken: string) => {
+  // Plain fetch, requests made through the client would resolve the token again
+  const response = await fetch(`${OpenAPI.BASE}/api/v1/login/refresh-token`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({ refresh_token: refreshToken }),
+  })
+  if (!response.ok) {
+    return ""
+  }
+  const tokens: Token = await response.json()
+  localStorage.setItem("access_token", tokens.access_token)
+  if (tokens.refresh_token) {
+    localStorage.setItem("refresh_token", tokens.refresh_token)
+  }
+  return tokens.access_token
+}
+
 OpenAPI.TOKEN = async () => {
-  return localStorage.getItem("access_token") || ""
+  const token = localStorage.getItem("access_token") || ""
+  const refreshToken = localStorage.getItem("refresh_token")
+  if (!token || !refreshToken || !expiresSoon(token)) {
+    return token
+  }
+  refreshing ??= refreshAccessToken(refreshToken).finally(() => {
+    refreshing = null
+  })
+  return (await refreshing) || token
 }
 
 const handleApiError = (error: Error) => {
   if (error instanceof ApiError && [401, 403].includes(error.status)) {
     localStorage.removeItem("access_token")
+    localStorage.removeItem("refresh_token")
     window.location.href = "/login"
   }
 }